@@ -1,30 +1,135 @@
-from flask import Flask, jsonify, render_template, request
+import hmac
+from typing import List
+
+from flask import Flask, Response, g, jsonify, render_template, request, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+
+try:
+    from flask_sock import Sock
+except Exception:
+    Sock = None
 
 from config import config
-from services.orchestrator import Orchestrator
+from services.chat_channel import ChatChannel
+from services.context_store import CONTEXT_FIELDS, UnknownContextHash
+from services.document_store import DocumentTooLarge
+from services.orchestrator import VALID_MODES, Orchestrator
+from services.profiler import ProfileRecorder
+from services.response_utils import choose_encoding, compress_response, parse_fields, project_fields
+from services.serialization import DecodeError, JSONProvider, dumps, dumps_with, loads
 from services.sms_gateway import SMSGateway
+from services.static_assets import AssetManifest
 
 
 app = Flask(__name__)
+# Set before anything touches app.jinja_env, which captures the provider for the tojson filter.
+app.json = JSONProvider(app)
+app.config["MAX_CONTENT_LENGTH"] = config.upload_max_bytes
 orchestrator = Orchestrator()
 sms = SMSGateway()
 
-# phone_number -> session_id for simple SMS state
-sms_sessions = {}
+
+assets = AssetManifest(app.static_folder, auto_reload=config.assets_auto_reload)
+app.jinja_env.globals["asset_url"] = assets.url
+
+profiler = ProfileRecorder(
+    sample_rate=config.profile_sample_rate,
+    capacity=config.profile_buffer_size,
+    interval=config.profile_interval_ms / 1000,
+)
+
+
+def _context_hashes(payload):
+    return {name: payload.get(f"{name}_hash", "") for name in CONTEXT_FIELDS if payload.get(f"{name}_hash")}
+
+
+def _unknown_context(exc: UnknownContextHash):
+    return jsonify({"error": str(exc), "missing_context": exc.fields}), 409
+
+
+def _is_admin() -> bool:
+    """True when ``ADMIN_TOKEN`` is configured and the request carries it as a bearer token."""
+    if not config.admin_token:
+        return False
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(supplied.encode("utf-8"), config.admin_token.encode("utf-8"))
+
+
+def _admin_denied():
+    """Error response unless the request carries ``ADMIN_TOKEN`` as a bearer token; 404 while none is configured."""
+    if not config.admin_token:
+        return jsonify({"error": "not found"}), 404
+    if not _is_admin():
+        return jsonify({"error": "admin token required"}), 401
+    return None
+
+
+@app.before_request
+def start_profile():
+    if not config.profile_enabled or request.path.startswith("/api/admin/profiles"):
+        return
+    # Only operators may force a profile; the label uses the route pattern so session ids stay out of it.
+    forced = bool(request.headers.get("X-Debug-Profile")) and _is_admin()
+    if profiler.should_sample(forced=forced):
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        g.profile = profiler.start(f"{request.method} {rule}")
+
+
+@app.after_request
+def compress_json(response):
+    return compress_response(response, request.headers.get("Accept-Encoding", ""))
+
+
+@app.after_request
+def finish_profile(response):
+    handle = g.pop("profile", None)
+    if handle is not None:
+        # Stop when the body has been sent, so streamed finalize output and compression are included.
+        status = response.status_code
+        response.call_on_close(lambda: handle.stop(status))
+        response.headers["X-Profile-Id"] = str(handle.profile.profile_id)
+    return response
+
+
+@app.get("/assets/<path:fingerprinted>")
+def asset(fingerprinted: str):
+    try:
+        item = assets.lookup(fingerprinted)
+    except KeyError:
+        return "", 404
+    encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+    body = item.body
+    if encoding == "br" and item.br_body is not None:
+        body = item.br_body
+    elif encoding in {"br", "gzip"}:
+        encoding = "gzip"
+        body = item.gzip_body
+    else:
+        encoding = ""
+    response = app.response_class(body, mimetype=item.mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.set_etag(f"{item.etag}-{encoding}" if encoding else item.etag)
+    # The URL changes whenever the content does, so browsers never need to revalidate.
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response.make_conditional(request)
 
 
 @app.get("/")
 def index():
-    return render_template("index.html")
+    return render_template("index.html", panel=orchestrator.reviewers.panel)
 
 
 @app.get("/result/<session_id>")
 def result_page(session_id: str):
     try:
+        orchestrator.refresh_stale(session_id)
         data = orchestrator.result(session_id)
+        final_json = orchestrator.encoded_final(data, pretty=True).decode("utf-8")
     except KeyError:
         return jsonify({"error": "session not found"}), 404
-    return render_template("result.html", data=data)
+    return render_template("result.html", data=data, final_json=final_json)
 
 
 @app.post("/api/session/start")
@@ -36,6 +141,7 @@ def start_session():
     company_context = payload.get("company_context", "")
     projects_text = payload.get("projects_text", "")
     coding_experience_level = payload.get("coding_experience_level", "")
+    resume_doc_id = payload.get("resume_doc_id", "")
     try:
         session = orchestrator.start_session(
             mode=mode,
@@ -44,6 +150,8 @@ def start_session():
             company_context=company_context,
             projects_context=projects_text,
             coding_experience_level=coding_experience_level,
+            resume_doc_id=resume_doc_id,
+            context_hashes=_context_hashes(payload),
         )
         return jsonify(
             {
@@ -52,8 +160,11 @@ def start_session():
                 "submode": session.submode,
                 "selected_boss": session.selected_boss,
                 "coding_experience_level": session.coding_experience_level,
+                "context_hashes": session.context_hashes,
             }
         )
+    except UnknownContextHash as exc:
+        return _unknown_context(exc)
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
 
@@ -67,8 +178,9 @@ def add_message():
     company_context = payload.get("company_context", "")
     projects_text = payload.get("projects_text", "")
     coding_experience_level = payload.get("coding_experience_level", "")
-    if not any([message, resume_text, company_context, projects_text, coding_experience_level]):
-        return jsonify({"error": "Provide at least one of: message, resume_text, company_context, projects_text, coding_experience_level"}), 400
+    resume_doc_id = payload.get("resume_doc_id", "")
+    if not any([message, resume_text, resume_doc_id, company_context, projects_text, coding_experience_level, _context_hashes(payload)]):
+        return jsonify({"error": "Provide at least one of: message, resume_text, resume_doc_id, company_context, projects_text, coding_experience_level"}), 400
 
     try:
         session = orchestrator.add_message(
@@ -78,19 +190,26 @@ def add_message():
             company_context=company_context,
             projects_context=projects_text,
             coding_experience_level=coding_experience_level,
+            resume_doc_id=resume_doc_id,
+            context_hashes=_context_hashes(payload),
         )
         return jsonify(
             {
                 "ok": True,
-                "messages_count": len(session.messages),
+                "messages_count": len(session.transcript),
                 "company_context_set": bool(session.company_context),
                 "projects_context_set": bool(session.projects_context),
-                "resume_set": bool(session.resume_text),
+                "resume_set": bool(session.resume_text or session.resume_doc_id),
                 "coding_experience_level_set": bool(session.coding_experience_level),
+                "context_hashes": session.context_hashes,
             }
         )
+    except UnknownContextHash as exc:
+        return _unknown_context(exc)
     except KeyError:
         return jsonify({"error": "session not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
 
 @app.post("/api/session/message/respond")
@@ -102,37 +221,113 @@ def add_message_and_respond():
     company_context = payload.get("company_context", "")
     projects_text = payload.get("projects_text", "")
     coding_experience_level = payload.get("coding_experience_level", "")
+    resume_doc_id = payload.get("resume_doc_id", "")
+    message_id = payload.get("client_message_id", "")
     if not message:
         return jsonify({"error": "Message is required for live response"}), 400
 
     try:
-        orchestrator.add_message(
+        # An offline client replays queued messages; one that was already answered gets the same reply back.
+        delivered = orchestrator.delivered_reply(session_id, message_id)
+        if delivered is not None:
+            session = orchestrator.sessions[session_id]
+            return jsonify({"ok": True, **delivered, "replayed": True, "context_hashes": session.context_hashes})
+        session = orchestrator.add_message(
             session_id=session_id,
             message=message,
             resume_text=resume_text,
             company_context=company_context,
             projects_context=projects_text,
             coding_experience_level=coding_experience_level,
+            resume_doc_id=resume_doc_id,
+            context_hashes=_context_hashes(payload),
+            message_id=message_id,
         )
-        response_payload = orchestrator.respond_to_message(session_id=session_id, message=message)
-        return jsonify({"ok": True, **response_payload})
+        response_payload = orchestrator.respond_to_message(session_id=session_id, message=message, message_id=message_id)
+        return jsonify({"ok": True, **response_payload, "context_hashes": session.context_hashes})
+    except UnknownContextHash as exc:
+        return _unknown_context(exc)
     except KeyError:
         return jsonify({"error": "session not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     except Exception as exc:
         return jsonify({"error": f"message/respond failed: {exc}"}), 500
 
 
+@app.post("/api/documents")
+def upload_document():
+    # Raw request body, streamed to disk in chunks: POST /api/documents?filename=resume.pdf
+    filename = request.args.get("filename", "")
+    try:
+        document = orchestrator.documents.ingest(request.stream, filename, config.upload_max_bytes)
+    except (DocumentTooLarge, RequestEntityTooLarge):
+        return jsonify({"error": f"Document exceeds {config.upload_max_bytes} bytes"}), 413
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:
+        return jsonify({"error": f"document parsing failed: {exc}"}), 500
+    return jsonify({"ok": True, **document})
+
+
+def _finalize_modes():
+    """``?modes=a,b`` asks for several mode reports from one session; an empty list means the session's own mode."""
+    modes = parse_fields(request.args.get("modes", ""))
+    unknown = [mode for mode in modes if mode not in VALID_MODES]
+    return modes, (jsonify({"error": f"Invalid mode: {', '.join(unknown)}"}), 400) if unknown else None
+
+
 @app.post("/api/session/<session_id>/finalize")
 def finalize(session_id: str):
+    modes, error = _finalize_modes()
+    if error:
+        return error
+    if request.args.get("stream") == "1":
+        return _finalize_stream(session_id, modes)
     try:
-        result = orchestrator.finalize(session_id)
-        return jsonify(result)
+        budget = float(request.args["budget"]) if "budget" in request.args else None
+    except ValueError:
+        return jsonify({"error": "budget must be a number of seconds"}), 400
+    try:
+        result = orchestrator.finalize(session_id, budget_seconds=budget, modes=modes or None)
+        # 202 tells the client some stages are still running; poll /result for the rest.
+        status_code = 202 if result.get("pending") else 200
+        fields = parse_fields(request.args.get("fields", ""))
+        if status_code == 200:
+            # Complete payloads are encoded once per version and shared with /result.
+            return Response(orchestrator.encoded_final(orchestrator.result(session_id), fields), mimetype="application/json")
+        return jsonify(project_fields(result, fields)), status_code
     except KeyError:
         return jsonify({"error": "session not found"}), 404
     except Exception as exc:
         return jsonify({"error": f"finalize failed: {exc}"}), 500
 
 
+def _finalize_stream(session_id: str, modes: List[str]):
+    if session_id not in orchestrator.sessions:
+        return jsonify({"error": "session not found"}), 404
+    fields = parse_fields(request.args.get("fields", ""))
+    def events():
+        try:
+            for event in orchestrator.finalize_stream(session_id, modes=modes or None):
+                if event["type"] == "result":
+                    # The version lets an offline-capable client key its cached copy of the payload.
+                    data = orchestrator.result(session_id)
+                    head = {"type": "result", "version": data["version"]}
+                    yield dumps_with(head, {"payload": orchestrator.encoded_final(data, fields)}) + b"\n"
+                    continue
+                yield dumps(event) + b"\n"
+        except Exception as exc:
+            yield dumps({"type": "error", "error": f"finalize failed: {exc}"}) + b"\n"
+
+    # One JSON object per line; X-Accel-Buffering stops proxies from holding the stream back.
+    return Response(
+        stream_with_context(events()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/session/<session_id>/select-boss")
 def select_boss(session_id: str):
     payload = request.get_json(force=True)
@@ -148,10 +343,159 @@ def select_boss(session_id: str):
 
 @app.get("/api/session/<session_id>/result")
 def result(session_id: str):
+    fields = parse_fields(request.args.get("fields", ""))
+    try:
+        if not fields or any(name.partition(".")[0] == "mock_interview" for name in fields):
+            # A panel switch leaves the mock interview stale; it is only regenerated when asked for.
+            orchestrator.refresh_stale(session_id)
+        data = orchestrator.result(session_id)
+    except KeyError:
+        return jsonify({"error": "session not found"}), 404
+    except Exception as exc:
+        return jsonify({"error": f"mock interview refresh failed: {exc}"}), 500
+    # Session metadata is always returned; projection applies to the final payload, whose bytes are shared.
+    # Both come from the same result() so the ETag version and the body always match.
     try:
-        return jsonify(orchestrator.result(session_id))
+        final = orchestrator.encoded_final(data, fields)
     except KeyError:
         return jsonify({"error": "session not found"}), 404
+    meta = {key: value for key, value in data.items() if key != "final"}
+    # The session version changes with every update, so a client holding this version can revalidate with a 304.
+    response = Response(dumps_with(meta, {"final": final}), mimetype="application/json")
+    response.set_etag(f"{session_id}-{data['version']}-{','.join(fields)}", weak=True)
+    return response.make_conditional(request)
+
+
+@app.get("/api/sessions")
+def list_sessions():
+    # Lists every session id and phone number, which are otherwise only known to their owners.
+    denied = _admin_denied()
+    if denied:
+        return denied
+    args = request.args
+    try:
+        finalized = None
+        if "finalized" in args:
+            finalized = args["finalized"].lower() in {"1", "true", "yes"}
+        limit = int(args.get("limit", config.sessions_page_size))
+        data = orchestrator.list_sessions(
+            phone_number=args.get("phone") or None,
+            mode=args.get("mode") or None,
+            finalized=finalized,
+            created_after=float(args["created_after"]) if "created_after" in args else None,
+            created_before=float(args["created_before"]) if "created_before" in args else None,
+            cursor=int(args["cursor"]) if args.get("cursor") else None,
+            limit=max(1, min(limit, config.sessions_page_max)),
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(data)
+
+
+@app.get("/api/session/<session_id>/artifacts")
+def session_artifacts(session_id: str):
+    # Artifacts outlive in-memory sessions, so listing them by session id is an operator lookup.
+    denied = _admin_denied()
+    if denied:
+        return denied
+    store = orchestrator.writer.store
+    if store is None:
+        return jsonify({"error": "artifact store disabled"}), 404
+    return jsonify({"session_id": session_id, "artifacts": store.list_session(session_id)})
+
+
+@app.get("/api/artifacts/<key>")
+def artifact(key: str):
+    store = orchestrator.writer.store
+    if store is None:
+        return jsonify({"error": "artifact not found"}), 404
+    try:
+        data = store.read(key)
+    except (KeyError, FileNotFoundError):
+        return jsonify({"error": "artifact not found"}), 404
+    mimetype = "application/json" if data[:1] in (b"{", b"[") else "text/plain"
+    return app.response_class(data, mimetype=mimetype)
+
+
+@app.get("/api/analytics")
+def analytics():
+    # Aggregates free text from every user's sessions, so it is an operator endpoint.
+    denied = _admin_denied()
+    if denied:
+        return denied
+    try:
+        k = int(request.args.get("k", "10"))
+        percentiles = [float(p) for p in parse_fields(request.args.get("percentiles", "50,90"))]
+    except ValueError:
+        return jsonify({"error": "k must be an integer and percentiles a comma-separated list of numbers"}), 400
+    if any(p < 0 or p > 100 for p in percentiles):
+        return jsonify({"error": "percentiles must be between 0 and 100"}), 400
+    mode = request.args.get("mode", "all")
+    k = max(1, min(k, config.analytics_topk_max))
+    return jsonify(orchestrator.analytics.snapshot(k=k, mode=mode, percentiles=percentiles))
+
+
+@app.get("/api/admin/gemini-limits")
+def gemini_limits():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    return jsonify(
+        {
+            "models": orchestrator.gemini.limits_snapshot(),
+            "fallback": orchestrator.gemini.fallback_snapshot(),
+            "transport": orchestrator.gemini.transport_snapshot(),
+        }
+    )
+
+
+@app.get("/api/admin/profiles")
+def list_profiles():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    return jsonify({"enabled": config.profile_enabled, "profiles": profiler.list()})
+
+
+@app.get("/api/admin/profiles/<int:profile_id>")
+def get_profile(profile_id: int):
+    denied = _admin_denied()
+    if denied:
+        return denied
+    try:
+        profile = profiler.get(profile_id)
+    except KeyError:
+        return jsonify({"error": "profile not found"}), 404
+    fmt = request.args.get("format", "speedscope")
+    if fmt == "collapsed":
+        return app.response_class(profile.collapsed(request.args.get("kind", "wall")), mimetype="text/plain")
+    if fmt != "speedscope":
+        return jsonify({"error": "format must be speedscope or collapsed"}), 400
+    return jsonify(profile.speedscope())
+
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @sock.route("/ws/session/<session_id>")
+    def chat_socket(ws, session_id: str):
+        channel = ChatChannel(orchestrator, session_id, ws.send)
+        if session_id not in orchestrator.sessions:
+            channel.send({"type": "error", "status": 404, "error": "session not found"})
+            return
+        try:
+            while not channel.closed:
+                raw = ws.receive()
+                if raw is None:
+                    break
+                try:
+                    payload = loads(raw)
+                except DecodeError:
+                    channel.send({"type": "error", "status": 400, "error": "Messages must be JSON"})
+                    continue
+                channel.handle(payload)
+        finally:
+            channel.close()
 
 
 @app.post("/webhook/sms")
@@ -163,34 +507,39 @@ def webhook_sms():
         return "", 400
 
     response_message = ""
-    existing_session_id = sms_sessions.get(from_number)
+    # The newest session for this number, from the registry's phone index.
+    latest = orchestrator.sessions.latest_for_phone(from_number)
+    existing_session_id = latest.session_id if latest is not None else ""
 
     if body.upper() == "START":
         response_message = "Welcome to Chartroom. Reply 1 for Board, 2 for 1-on-1 Interview, 3 for Investor Pitch Prep."
     elif body == "1":
         session = orchestrator.start_session(mode="board_investors", phone_number=from_number)
-        sms_sessions[from_number] = session.session_id
         response_message = "Board mode started. Share your startup idea, problem, users, traction, and resume highlights. Send DONE when finished."
     elif body == "2":
         session = orchestrator.start_session(mode="interview_1on1", phone_number=from_number)
-        sms_sessions[from_number] = session.session_id
         response_message = "1-on-1 mode started. Describe your program. Optional: mention past work experience leverage. Send DONE when finished."
     elif body == "3":
         session = orchestrator.start_session(mode="investor_pitch_prep", phone_number=from_number)
-        sms_sessions[from_number] = session.session_id
         response_message = "Investor prep mode started. Share company context, traction, ask, and likely investor concerns. Send DONE when finished."
     elif body.upper() == "DONE" and existing_session_id:
         result_payload = orchestrator.finalize(existing_session_id)
-        files = result_payload.get("files", {})
+        talking_points = result_payload.get("files", {}).get("talking_points")
         response_message = (
             "Session finalized. "
-            f"Talking points file: {files.get('talking_points', 'n/a')} "
+            f"Talking points: {f'{config.base_url}/api/artifacts/{talking_points}' if talking_points else 'n/a'} "
             f"Result page: {config.base_url}/result/{existing_session_id}"
         )
-    elif body.upper() in {"BOSS 1", "BOSS 2", "BOSS 3"} and existing_session_id:
-        boss_id = f"boss_{body.strip()[-1]}"
-        orchestrator.select_boss(existing_session_id, boss_id)
-        response_message = f"Selected {boss_id}. Keep sharing details, then send DONE."
+    elif body.upper().startswith("BOSS ") and existing_session_id:
+        # BOSS <n> picks the nth reviewer of the configured panel.
+        boss_ids = orchestrator.reviewers.boss_ids
+        choice = body[5:].strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(boss_ids):
+            boss_id = boss_ids[int(choice) - 1]
+            orchestrator.select_boss(existing_session_id, boss_id)
+            response_message = f"Selected {boss_id}. Keep sharing details, then send DONE."
+        else:
+            response_message = f"Unknown panel. Reply BOSS 1-{len(boss_ids)}."
     elif existing_session_id:
         orchestrator.add_message(existing_session_id, body)
         response_message = "Saved. Keep going, or send DONE to finalize."
@@ -0,0 +1,177 @@
+"""Run finalize over a JSONL export of transcripts without the web server.
+
+Run from the ``final`` folder:
+
+    python batch_run.py transcripts.jsonl --output results.jsonl [--workers 8] [--llm-concurrency 6] [--processes]
+
+Each input line is a JSON object:
+
+    {"id": "...", "mode": "board_investors", "submode": "", "messages": ["..."],
+     "resume_text": "", "company_context": "", "projects_context": "",
+     "coding_experience_level": "", "selected_boss": "boss_1"}
+
+``transcript`` (a single string) may be given instead of ``messages``; ``id``
+defaults to the line number. ``modes`` (a list of modes) produces a combined
+multi-mode finalize for the record. Each finished session is appended to the output
+as one JSON line and its id to the checkpoint file (``<output>.done``), so a
+re-run skips ids that already completed. Failed ids are written with an
+``error`` field and are retried on the next run.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Set
+
+from config import config
+from services.serialization import dumps_text, loads
+
+
+_orchestrator = None
+
+
+def _init_worker(llm_concurrency: int) -> None:
+    """Build the per-process Orchestrator; every session in the process shares its LLM cap."""
+    global _orchestrator
+    from services.orchestrator import Orchestrator
+
+    config.gemini_global_concurrency = llm_concurrency
+    # Queueing behind the cap is expected here; only the per-session deadline should end a wait.
+    config.gemini_acquire_timeout_seconds = max(config.gemini_acquire_timeout_seconds, config.finalize_abandon_seconds)
+    # A provider outage should fail the record (and retry it next run), not store placeholder output.
+    config.degraded_fallback_enabled = False
+    _orchestrator = Orchestrator(persist_outputs=False)
+
+
+def run_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    orchestrator = _orchestrator
+    messages = record.get("messages")
+    if messages is None:
+        messages = [record["transcript"]] if record.get("transcript") else []
+    started = time.perf_counter()
+    session = orchestrator.start_session(
+        mode=record.get("mode", "board_investors"),
+        submode=record.get("submode", ""),
+        resume_text=record.get("resume_text", ""),
+        company_context=record.get("company_context", ""),
+        projects_context=record.get("projects_context", ""),
+        coding_experience_level=record.get("coding_experience_level", ""),
+    )
+    try:
+        for message in messages:
+            orchestrator.add_message(session.session_id, message)
+        if record.get("selected_boss"):
+            orchestrator.select_boss(session.session_id, record["selected_boss"])
+        modes = record.get("modes") or None
+        payload = orchestrator.finalize_blocking(session.session_id, modes=modes)
+        result = dict(payload)
+        result.pop("files", None)
+        result["talking_points"] = orchestrator.writer.render_talking_points(
+            "+".join(modes) if modes else session.mode, payload.get("consensus", {})
+        )
+        return {"id": record["id"], "elapsed_s": round(time.perf_counter() - started, 3), "result": result}
+    finally:
+        orchestrator.sessions.pop(session.session_id, None)
+
+
+def _read_records(path: str, done: Set[str]) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = loads(line)
+            record["id"] = str(record.get("id") or record.get("session_id") or f"line-{line_no}")
+            if record["id"] not in done:
+                yield record
+
+
+def _load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as fh:
+        return {line.strip() for line in fh if line.strip()}
+
+
+def _append_line(fh, text: str) -> None:
+    fh.write(text + "\n")
+    fh.flush()
+    os.fsync(fh.fileno())
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    checkpoint_path: str = "",
+    workers: int = 4,
+    llm_concurrency: int = 4,
+    processes: bool = False,
+) -> Dict[str, int]:
+    """Stream ``input_path`` through finalize with at most ``2 * workers`` records in memory."""
+    checkpoint_path = checkpoint_path or f"{output_path}.done"
+    done = _load_checkpoint(checkpoint_path)
+    stats = {"skipped": len(done), "completed": 0, "failed": 0}
+
+    if processes:
+        # Each process has its own limiter, so the cap is split between them: no more processes than
+        # llm_concurrency, and each gets the floor share, so all of them together stay within the cap.
+        if workers > llm_concurrency:
+            print(f"--workers {workers} exceeds --llm-concurrency; using {llm_concurrency} processes", file=sys.stderr)
+            workers = llm_concurrency
+        per_process = llm_concurrency // workers
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(per_process,))
+    else:
+        _init_worker(llm_concurrency)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+
+    in_flight: Dict[Future, str] = {}
+
+    def drain(out, ckpt, block_until: int) -> None:
+        while len(in_flight) > block_until:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in finished:
+                record_id = in_flight.pop(future)
+                try:
+                    line = future.result()
+                except Exception as exc:
+                    _append_line(out, dumps_text({"id": record_id, "error": str(exc)}))
+                    stats["failed"] += 1
+                    continue
+                # Result first, then checkpoint: a crash in between re-runs the id rather than losing it.
+                _append_line(out, dumps_text(line))
+                _append_line(ckpt, record_id)
+                stats["completed"] += 1
+                print(f"[{stats['completed'] + stats['failed']}] {record_id} {line['elapsed_s']}s", file=sys.stderr)
+
+    with executor, open(output_path, "a", encoding="utf-8") as out, open(checkpoint_path, "a", encoding="utf-8") as ckpt:
+        for record in _read_records(input_path, done):
+            in_flight[executor.submit(run_record, record)] = record["id"]
+            drain(out, ckpt, block_until=2 * workers - 1)
+        drain(out, ckpt, block_until=0)
+    return stats
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch finalize transcripts from a JSONL file.")
+    parser.add_argument("input", help="JSONL file of transcripts")
+    parser.add_argument("--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--checkpoint", default="", help="completed-id file (default: <output>.done)")
+    parser.add_argument("--workers", type=int, default=4, help="sessions processed concurrently")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="max Gemini calls in flight across all workers")
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    args = parser.parse_args(argv)
+    stats = run_batch(
+        args.input,
+        args.output,
+        checkpoint_path=args.checkpoint,
+        workers=max(1, args.workers),
+        llm_concurrency=max(1, args.llm_concurrency),
+        processes=args.processes,
+    )
+    print(dumps_text(stats), file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Call latency through different Gemini transports against a local stand-in server.
+
+Starts a gRPC server that implements ``GenerativeService.GenerateContent``
+with a fixed think time, behind a TCP proxy that charges a handshake delay on
+every new connection (standing in for TCP + TLS setup to the real endpoint).
+Then runs the same concurrent load through:
+
+- per-call:  a fresh channel per request (no connection reuse)
+- shared:    one channel for every thread (the SDK's default client)
+- pool:      ``GeminiTransport`` with warmed connections
+
+Run from the ``final`` folder:
+
+    python benchmarks/gemini_transport.py [--requests 400] [--concurrency 32] [--handshake-ms 60] [--think-ms 20]
+"""
+import argparse
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from google.ai import generativelanguage as glm  # noqa: E402
+from google.ai.generativelanguage_v1beta.services.generative_service.transports.grpc import (  # noqa: E402
+    GenerativeServiceGrpcTransport,
+)
+
+from services.gemini_transport import GeminiTransport, channel_options, pool_size_for  # noqa: E402
+
+
+SERVICE = "google.ai.generativelanguage.v1beta.GenerativeService"
+
+
+def start_server(think_s: float) -> tuple:
+    def generate_content(request, context):
+        time.sleep(think_s)
+        return glm.GenerateContentResponse(
+            candidates=[{"content": {"parts": [{"text": '{"ok": true}'}], "role": "model"}}]
+        )
+
+    handler = grpc.method_handlers_generic_handler(
+        SERVICE,
+        {
+            "GenerateContent": grpc.unary_unary_rpc_method_handler(
+                generate_content,
+                request_deserializer=glm.GenerateContentRequest.deserialize,
+                response_serializer=glm.GenerateContentResponse.serialize,
+            )
+        },
+    )
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=256))
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, port
+
+
+class HandshakeProxy:
+    """Forwards TCP to the server, sleeping ``handshake_s`` before each new connection starts flowing."""
+
+    def __init__(self, upstream_port: int, handshake_s: float) -> None:
+        self.upstream_port = upstream_port
+        self.handshake_s = handshake_s
+        self.connections = 0
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(512)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            client, _ = self._sock.accept()
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client: socket.socket) -> None:
+        time.sleep(self.handshake_s)
+        upstream = socket.create_connection(("127.0.0.1", self.upstream_port))
+        for src, dst in ((client, upstream), (upstream, client)):
+            threading.Thread(target=self._pipe, args=(src, dst), daemon=True).start()
+
+    @staticmethod
+    def _pipe(src: socket.socket, dst: socket.socket) -> None:
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def _request() -> glm.GenerateContentRequest:
+    return glm.GenerateContentRequest(model="models/stand-in", contents=[{"role": "user", "parts": [{"text": "hi"}]}])
+
+
+def _client(channel: grpc.Channel) -> glm.GenerativeServiceClient:
+    return glm.GenerativeServiceClient(transport=GenerativeServiceGrpcTransport(channel=channel))
+
+
+def run(name: str, call, requests: int, concurrency: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def one(_):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    total = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "name": name,
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "throughput_rps": round(requests / total, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--handshake-ms", type=float, default=60)
+    parser.add_argument("--think-ms", type=float, default=20)
+    parser.add_argument("--streams-per-connection", type=int, default=8)
+    args = parser.parse_args()
+
+    server, port = start_server(args.think_ms / 1000)
+    proxy = HandshakeProxy(port, args.handshake_ms / 1000)
+    target = f"127.0.0.1:{proxy.port}"
+    options = channel_options(args.streams_per_connection)
+    results = []
+
+    def per_call():
+        channel = grpc.insecure_channel(target, options=options)
+        try:
+            _client(channel).generate_content(_request())
+        finally:
+            channel.close()
+
+    before = proxy.connections
+    results.append({**run("per-call", per_call, args.requests, args.concurrency), "connections": proxy.connections - before})
+
+    before = proxy.connections
+    shared = _client(grpc.insecure_channel(target, options=options))
+    results.append(
+        {**run("shared", lambda: shared.generate_content(_request()), args.requests, args.concurrency),
+         "connections": proxy.connections - before}
+    )
+
+    before = proxy.connections
+    transport = GeminiTransport(
+        pool_size_for(args.concurrency, args.streams_per_connection),
+        target=target,
+        insecure=True,
+        streams_per_connection=args.streams_per_connection,
+    )
+    transport.warm(timeout=10)
+
+    def pooled():
+        lease = transport.lease()
+        try:
+            lease.client.generate_content(_request())
+        except Exception:
+            lease.release(error=True)
+            raise
+        lease.release()
+
+    results.append({**run("pool", pooled, args.requests, args.concurrency), "connections": proxy.connections - before})
+    snapshot = transport.snapshot()
+
+    print(f"{'transport':<10} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8} {'conns':>6}")
+    for row in results:
+        print(f"{row['name']:<10} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['throughput_rps']:>8} {row['connections']:>6}")
+    print(f"pool: size={snapshot['size']} reuse_ratio={snapshot['reuse_ratio']}")
+    transport.close()
+    server.stop(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Size of the stage outputs embedded in prompts: Python repr dumps vs compact projected JSON.
+
+Uses a representative pitch outline and merged consensus, or the ``deck`` and
+``consensus`` of a saved final payload (e.g. ``GET /api/result/<id>`` output).
+
+Run from the ``final`` folder:  python benchmarks/prompt_size.py [final_payload.json]
+"""
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.prompt_json import SIMULATOR_CONSENSUS_FIELDS, compact_json  # noqa: E402
+from services.transcript import estimate_tokens  # noqa: E402
+
+
+def _sentence(topic: str, words: int = 45) -> str:
+    return f"{topic}: " + " ".join(f"detail{i}" for i in range(words)) + "."
+
+
+def sample() -> tuple:
+    deck = {key: _sentence(key) for key in (
+        "problem", "solution", "target_customer", "market_size", "competition", "business_model",
+        "go_to_market", "traction", "risks", "ask", "investor_narrative_60s", "interview_narrative_60s",
+    )}
+    for key in ("past_work_leverage", "customer_requested_changes", "website_change_recommendations"):
+        deck[key] = [_sentence(f"{key} {i}", 25) for i in range(4)]
+    lists = ("top_strengths", "top_gaps", "highest_roi_next_steps_30d", "customer_requested_changes", "website_change_recommendations")
+    consensus = {key: [_sentence(f"{key} {i}", 25) for i in range(5)] for key in lists}
+    consensus.update(
+        investor_narrative_60s=deck["investor_narrative_60s"],
+        interview_narrative_60s=deck["interview_narrative_60s"],
+        past_work_leverage=deck["past_work_leverage"],
+        selected_boss_path={"boss_id": "boss_1", "label": "Customer Panel 1", "focus": "Customer Value and Problem Fit",
+                            **{key: consensus[key] for key in lists}, "key_questions": [_sentence("question", 15)] * 3},
+        agreement={key: [{"text": item, "agreement": 2, "reviewers": ["boss_1", "boss_2"]} for item in consensus[key]] for key in lists},
+    )
+    return deck, consensus
+
+
+def report(label: str, before: str, after: str) -> None:
+    saved = 1 - len(after) / len(before) if before else 0.0
+    print(f"{label:<28} {len(before):>8} {len(after):>8} {estimate_tokens(before):>8} {estimate_tokens(after):>8} {saved:>7.0%}")
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        final = json.loads(Path(sys.argv[1]).read_text(encoding="utf-8"))
+        final = final.get("final", final)
+        deck, consensus = final.get("deck", {}), final.get("consensus", {})
+    else:
+        deck, consensus = sample()
+    panel = json.loads(Path("prompts/reviewer_panel.json").read_text(encoding="utf-8"))
+
+    print(f"{'embedded value':<28} {'chars':>8} {'chars':>8} {'tokens':>8} {'tokens':>8} {'saved':>7}")
+    print(f"{'':<28} {'before':>8} {'after':>8} {'before':>8} {'after':>8}")
+    for entry in panel:
+        report(f"outline -> {entry['boss_id']}", f"{deck}", compact_json(deck, entry.get("outline_fields", ())))
+    report("consensus -> simulator", f"{consensus}", compact_json(consensus, SIMULATOR_CONSENSUS_FIELDS))
+    # The same value always renders to the same text, whatever order its keys were built in.
+    shuffled = dict(reversed(list(consensus.items())))
+    print("deterministic:", compact_json(consensus, SIMULATOR_CONSENSUS_FIELDS) == compact_json(shuffled, SIMULATOR_CONSENSUS_FIELDS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Encode/decode cost of a board final payload: stdlib ``json`` vs ``services.serialization``.
+
+Uses a representative board payload (deck, three reviewers, consensus with
+agreement, mock interview, investor prep), or a saved final payload (e.g.
+``GET /api/session/<id>/result`` output). Rows:
+
+- compact:   ``jsonify`` / result bodies
+- pretty:    artifacts and the result page (``indent=2``)
+- decode:    ``generate_json`` parsing a model response
+- result:    a result body encoded from scratch vs spliced around cached final-payload bytes
+
+Run from the ``final`` folder:  python benchmarks/serialization.py [final_payload.json] [--number 200]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services import serialization  # noqa: E402
+
+
+def _sentence(topic: str, words: int = 30) -> str:
+    return f"{topic}: " + " ".join(f"détail{i}" for i in range(words)) + "."
+
+
+def sample() -> dict:
+    lists = ("top_strengths", "top_gaps", "highest_roi_next_steps_30d", "customer_requested_changes", "website_change_recommendations")
+    deck = {key: _sentence(key, 45) for key in ("problem", "solution", "target_customer", "market_size", "traction", "ask")}
+    reviewers = {
+        f"boss_{i}": {
+            "boss_id": f"boss_{i}",
+            "score_10": 6 + i,
+            **{key: [_sentence(f"{key} {n}") for n in range(5)] for key in lists},
+            "key_questions": [_sentence("question", 15) for _ in range(5)],
+        }
+        for i in range(1, 4)
+    }
+    consensus = {key: [_sentence(f"{key} {n}") for n in range(5)] for key in lists}
+    consensus["agreement"] = {
+        key: [{"text": item, "agreement": 2, "reviewers": ["boss_1", "boss_2"]} for item in consensus[key]] for key in lists
+    }
+    turns = [
+        {"question": _sentence(f"question {n}", 20), "ideal_answer": _sentence(f"answer {n}", 60), "follow_up": _sentence("follow up", 15)}
+        for n in range(12)
+    ]
+    return {
+        "status": "complete",
+        "mode": "board_investors",
+        "pending": [],
+        "deck": deck,
+        "reviewers": reviewers,
+        "consensus": consensus,
+        "mock_interview": {"turns": turns, "bank_questions": []},
+        "investor_prep": {key: [_sentence(f"{key} {n}") for n in range(6)] for key in ("realistic_investor_questions", "suggested_strong_answers")},
+        "files": {f"stage_{n}": f"outputs/session/board_investors/stage_{n}.json" for n in range(6)},
+    }
+
+
+def per_call(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def row(label: str, before: float, after: float) -> None:
+    print(f"{label:<24} {before:>10.1f} {after:>10.1f} {before / after:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("payload", nargs="?")
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    if args.payload:
+        final = json.loads(Path(args.payload).read_text(encoding="utf-8"))
+        final = final.get("final", final)
+    else:
+        final = sample()
+    text = json.dumps(final)
+    meta = {"session_id": "0" * 36, "mode": final.get("mode", ""), "version": 12, "has_final": True}
+    cached = serialization.dumps(final)
+
+    print(f"backend: {serialization.BACKEND}, payload: {len(text) / 1024:.1f} KiB, {args.number} calls per timing")
+    print(f"{'per call (us)':<24} {'stdlib':>10} {'now':>10} {'speedup':>9}")
+    n = args.number
+    # Baselines include the UTF-8 encode: response bodies and artifacts are written as bytes either way.
+    row("compact", per_call(lambda: json.dumps(final, separators=(",", ":")).encode("utf-8"), n), per_call(lambda: serialization.dumps(final), n))
+    row("pretty", per_call(lambda: json.dumps(final, indent=2).encode("utf-8"), n), per_call(lambda: serialization.dumps(final, pretty=True), n))
+    row("decode", per_call(lambda: json.loads(text), n), per_call(lambda: serialization.loads(text), n))
+    row(
+        "result (cached final)",
+        per_call(lambda: json.dumps({**meta, "final": final}, separators=(",", ":")).encode("utf-8"), n),
+        per_call(lambda: serialization.dumps_with(meta, {"final": cached}), n),
+    )
+    same = json.loads(serialization.dumps_with(meta, {"final": cached})) == {**meta, "final": final}
+    print("spliced body matches:", same)
+
+
+if __name__ == "__main__":
+    main()
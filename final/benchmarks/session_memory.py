@@ -0,0 +1,110 @@
+"""Bytes per active session: legacy layout vs slotted sessions with interned context.
+
+Run from the ``final`` folder:  python benchmarks/session_memory.py [sessions]
+"""
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.context_store import ContextStore  # noqa: E402
+from services.orchestrator import Session  # noqa: E402
+
+
+@dataclass
+class LegacySession:
+    """Session layout before the compact representation, kept here for comparison."""
+
+    session_id: str
+    mode: str
+    submode: str = ""
+    messages: List[str] = field(default_factory=list)
+    resume_text: str = ""
+    company_context: str = ""
+    projects_context: str = ""
+    coding_experience_level: str = ""
+    phone_number: str = ""
+    selected_boss: str = "boss_1"
+    final_payload: Dict[str, Any] = field(default_factory=dict)
+
+
+COMPANIES = [f"Company {i}: " + ("pitch memo paragraph about traction and customers. " * 400) for i in range(20)]
+PROJECTS = [f"Project {i}: " + ("README section describing architecture. " * 120) for i in range(20)]
+MESSAGES = [f"Turn {i}: we grew revenue and onboarded pilot customers in the northeast region." * 3 for i in range(20)]
+
+
+def _fresh(text: str) -> str:
+    # Every request body is parsed into a brand-new string object.
+    return text.encode("utf-8").decode("utf-8")
+
+
+def _consensus() -> Dict[str, Any]:
+    return {"top_gaps": [_fresh("Unclear pricing model")] * 5, "top_strengths": [_fresh("Strong team")] * 5}
+
+
+def build_legacy(count: int) -> List[LegacySession]:
+    sessions = []
+    for idx in range(count):
+        session = LegacySession(session_id=f"s{idx}", mode="board_investors")
+        for message in MESSAGES:
+            session.messages.append(_fresh(message))
+            # The old client re-sent the full context every turn and the server reassigned it.
+            session.company_context = _fresh(COMPANIES[idx % len(COMPANIES)])
+            session.projects_context = _fresh(PROJECTS[idx % len(PROJECTS)])
+        consensus = _consensus()
+        session.final_payload = {
+            "company_context": session.company_context,
+            "projects_context": session.projects_context,
+            "reviewers": {"boss_1": {"response": dict(consensus)}},
+            "consensus": consensus,
+        }
+        sessions.append(session)
+    return sessions
+
+
+def build_compact(count: int) -> List[Session]:
+    store = ContextStore(max_items=len(COMPANIES) + len(PROJECTS))
+    sessions = []
+    for idx in range(count):
+        session = Session(session_id=f"s{idx}", mode="board_investors")
+        for message in MESSAGES:
+            session.transcript.append(_fresh(message))
+        company_hash, session.company_context = store.intern(_fresh(COMPANIES[idx % len(COMPANIES)]))
+        projects_hash, session.projects_context = store.intern(_fresh(PROJECTS[idx % len(PROJECTS)]))
+        session.context_hashes = {"company_context": company_hash, "projects_text": projects_hash}
+        consensus = _consensus()
+        session.final_payload = {
+            "context_refs": dict(session.context_hashes),
+            "reviewers": {"boss_1": {"response": consensus}},
+            "consensus": consensus,
+        }
+        _ = session.transcript.text
+        sessions.append(session)
+    sessions.append(store)  # keep the shared blobs alive and counted
+    return sessions
+
+
+def measure(builder, count: int) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessions = builder(count)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del sessions
+    return used / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    legacy = measure(build_legacy, count)
+    compact = measure(build_compact, count)
+    print(f"sessions: {count}")
+    print(f"legacy:  {legacy:,.0f} bytes/session")
+    print(f"compact: {compact:,.0f} bytes/session ({compact / legacy:.1%} of legacy)")
+
+
+if __name__ == "__main__":
+    main()
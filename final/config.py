@@ -25,10 +25,76 @@ class Config:
     gemini_model_reviewer_a: str = os.getenv("GEMINI_MODEL_REVIEWER_A", "gemini-3-flash-preview")
     gemini_model_reviewer_b: str = os.getenv("GEMINI_MODEL_REVIEWER_B", "gemini-3-flash-preview")
     gemini_model_reviewer_c: str = os.getenv("GEMINI_MODEL_REVIEWER_C", "gemini-3-flash-preview")
+    reviewer_panel_path: str = os.getenv("REVIEWER_PANEL_PATH", "prompts/reviewer_panel.json")
+    reviewer_max_workers: int = int(os.getenv("REVIEWER_MAX_WORKERS", "8"))
+    consensus_similarity_threshold: float = float(os.getenv("CONSENSUS_SIMILARITY_THRESHOLD", "0.5"))
+    outputs_dir: str = os.getenv("OUTPUTS_DIR", "outputs")
+    output_retention_days: float = float(os.getenv("OUTPUT_RETENTION_DAYS", "0"))
+    output_compact_after_hours: float = float(os.getenv("OUTPUT_COMPACT_AFTER_HOURS", "24"))
+    output_compact_interval_seconds: float = float(os.getenv("OUTPUT_COMPACT_INTERVAL_SECONDS", "3600"))
+    documents_dir: str = os.getenv("DOCUMENTS_DIR", "documents")
+    document_workers: int = int(os.getenv("DOCUMENT_WORKERS", "2"))
+    document_parse_timeout_seconds: float = float(os.getenv("DOCUMENT_PARSE_TIMEOUT_SECONDS", "30"))
+    upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+    context_store_max_items: int = int(os.getenv("CONTEXT_STORE_MAX_ITEMS", "1024"))
+    context_token_budget: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+    context_chunk_tokens: int = int(os.getenv("CONTEXT_CHUNK_TOKENS", "160"))
+    prompt_json_max_chars: int = int(os.getenv("PROMPT_JSON_MAX_CHARS", "1200"))
+    # "auto" uses orjson when it is installed; "stdlib" forces the json module. See services/serialization.py.
+    json_backend: str = os.getenv("JSON_BACKEND", "auto").strip().lower()
+    gemini_request_timeout_seconds: float = float(os.getenv("GEMINI_REQUEST_TIMEOUT_SECONDS", "120"))
+    gemini_initial_concurrency: float = float(os.getenv("GEMINI_INITIAL_CONCURRENCY", "4"))
+    gemini_min_concurrency: float = float(os.getenv("GEMINI_MIN_CONCURRENCY", "1"))
+    gemini_max_concurrency: float = float(os.getenv("GEMINI_MAX_CONCURRENCY", "64"))
+    gemini_global_concurrency: int = int(os.getenv("GEMINI_GLOBAL_CONCURRENCY", "0"))
+    gemini_transport: str = os.getenv("GEMINI_TRANSPORT", "sdk").strip().lower()
+    gemini_pool_size: int = int(os.getenv("GEMINI_POOL_SIZE", "0"))
+    gemini_streams_per_connection: int = int(os.getenv("GEMINI_STREAMS_PER_CONNECTION", "8"))
+    gemini_warm_timeout_seconds: float = float(os.getenv("GEMINI_WARM_TIMEOUT_SECONDS", "5"))
+    gemini_target: str = os.getenv("GEMINI_TARGET", "")
+    gemini_target_insecure: bool = os.getenv("GEMINI_TARGET_INSECURE", "").lower() in {"1", "true", "yes"}
+    gemini_acquire_timeout_seconds: float = float(os.getenv("GEMINI_ACQUIRE_TIMEOUT_SECONDS", "30"))
+    gemini_max_retries: int = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+    gemini_backoff_base_seconds: float = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "0.5"))
+    gemini_backoff_cap_seconds: float = float(os.getenv("GEMINI_BACKOFF_CAP_SECONDS", "8"))
+    # Cassette mode: "" (live), "record" or "replay". See services/cassette.py.
+    gemini_cassette_mode: str = os.getenv("GEMINI_CASSETTE_MODE", "").strip().lower()
+    gemini_cassette_dir: str = os.getenv("GEMINI_CASSETTE_DIR", "cassettes")
+    gemini_cassette_latency_scale: float = float(os.getenv("GEMINI_CASSETTE_LATENCY_SCALE", "0"))
+    gemini_cassette_on_miss: str = os.getenv("GEMINI_CASSETTE_ON_MISS", "system")
+    analytics_topk_capacity: int = int(os.getenv("ANALYTICS_TOPK_CAPACITY", "512"))
+    analytics_topk_max: int = int(os.getenv("ANALYTICS_TOPK_MAX", "50"))
+    # Sessions whose analytics contribution can still be replaced by a later finalize.
+    analytics_replace_max_sessions: int = int(os.getenv("ANALYTICS_REPLACE_MAX_SESSIONS", "10000"))
+    analytics_replace_window_seconds: float = float(os.getenv("ANALYTICS_REPLACE_WINDOW_SECONDS", "86400"))
+    finalize_budget_seconds: float = float(os.getenv("FINALIZE_BUDGET_SECONDS", "45"))
+    finalize_abandon_seconds: float = float(os.getenv("FINALIZE_ABANDON_SECONDS", "300"))
+    finalize_workers: int = int(os.getenv("FINALIZE_WORKERS", "8"))
+    chat_workers: int = int(os.getenv("CHAT_WORKERS", "16"))
+    chat_budget_seconds: float = float(os.getenv("CHAT_BUDGET_SECONDS", "60"))
+    chat_replay_window: int = int(os.getenv("CHAT_REPLAY_WINDOW", "32"))
+    sessions_page_size: int = int(os.getenv("SESSIONS_PAGE_SIZE", "50"))
+    sessions_page_max: int = int(os.getenv("SESSIONS_PAGE_MAX", "200"))
+    assets_auto_reload: bool = os.getenv("ASSETS_AUTO_RELOAD", "").lower() in {"1", "true", "yes"}
+    question_bank_path: str = os.getenv("QUESTION_BANK_PATH", "")
+    question_bank_min_seen: int = int(os.getenv("QUESTION_BANK_MIN_SEEN", "2"))
+    question_bank_generic_count: int = int(os.getenv("QUESTION_BANK_GENERIC_COUNT", "5"))
+    degraded_fallback_enabled: bool = os.getenv("DEGRADED_FALLBACK_ENABLED", "1").lower() in {"1", "true", "yes"}
+    degraded_upgrade_attempts: int = int(os.getenv("DEGRADED_UPGRADE_ATTEMPTS", "6"))
+    degraded_upgrade_interval_seconds: float = float(os.getenv("DEGRADED_UPGRADE_INTERVAL_SECONDS", "30"))
+    profile_enabled: bool = os.getenv("PROFILE_ENABLED", "").lower() in {"1", "true", "yes"}
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_buffer_size: int = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    # Bearer token for operator endpoints that expose other users' data (GET /api/sessions); unset disables them.
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
     twilio_account_sid: str = os.getenv("TWILIO_ACCOUNT_SID", "")
     twilio_auth_token: str = os.getenv("TWILIO_AUTH_TOKEN", "")
     twilio_from_number: str = os.getenv("TWILIO_FROM_NUMBER", "")
     base_url: str = os.getenv("BASE_URL", "http://127.0.0.1:5000")
+    compression_min_bytes: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+    brotli_quality: int = int(os.getenv("BROTLI_QUALITY", "5"))
 
 
-config = Config()
+config = Config()
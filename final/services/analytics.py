@@ -0,0 +1,182 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+TRACKED_LISTS = ("top_gaps", "diligence_red_flags", "realistic_investor_questions")
+_NORMALIZE_RE = re.compile(r"[^a-z0-9 ]+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NORMALIZE_RE.sub(" ", text.lower()).split())
+
+
+class SpaceSavingCounter:
+    """Approximate heavy-hitters counter with bounded memory (Metwally et al. Space-Saving).
+
+    Keeps at most ``capacity`` keys. Any item whose true frequency exceeds
+    ``total / capacity`` is guaranteed to be tracked; ``error`` bounds how much
+    a reported count may overestimate.
+    """
+
+    def __init__(self, capacity: int = 512) -> None:
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[str, List[Any]] = {}
+
+    def add(self, key: str, label: str) -> None:
+        self.total += 1
+        entry = self._counts.get(key)
+        if entry is not None:
+            entry[0] += 1
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[key] = [1, 0, label]
+            return
+        victim = min(self._counts, key=lambda k: self._counts[k][0])
+        floor = self._counts.pop(victim)[0]
+        self._counts[key] = [floor + 1, floor, label]
+
+    def remove(self, key: str) -> None:
+        """Take back one ``add`` of ``key``; a key evicted since then only lowers the total."""
+        self.total = max(0, self.total - 1)
+        entry = self._counts.get(key)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] <= entry[1]:
+            del self._counts[key]
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self._counts.values(), key=lambda entry: -entry[0])[:k]
+        return [{"text": label, "count": count, "error": error} for count, error, label in ranked]
+
+
+class ScoreSeries:
+    """Float series in a growable NumPy buffer; discarded values become NaN and are left out of summaries."""
+
+    def __init__(self, initial: int = 256) -> None:
+        self._data = np.empty(initial, dtype=np.float32)
+        self._size = 0
+
+    def append(self, value: float) -> int:
+        if self._size == len(self._data):
+            self._data = np.resize(self._data, len(self._data) * 2)
+        self._data[self._size] = value
+        self._size += 1
+        return self._size - 1
+
+    def discard(self, index: int) -> None:
+        self._data[index] = np.nan
+
+    def __len__(self) -> int:
+        return self._size
+
+    def summary(self, percentiles: Iterable[float]) -> Dict[str, Any]:
+        values = self._data[: self._size]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {"count": 0}
+        percentiles = list(percentiles)
+        points = np.percentile(values, percentiles)
+        return {
+            "count": int(len(values)),
+            "mean": round(float(values.mean()), 3),
+            "percentiles": {f"p{p:g}": round(float(v), 3) for p, v in zip(percentiles, points)},
+        }
+
+
+class CohortAnalytics:
+    """Incremental aggregates over finalized sessions, updated once per finalize.
+
+    A session that is finalized again replaces its earlier contribution rather
+    than adding a second one. Contributions stay replaceable for
+    ``session_ttl_seconds`` after their last finalize, for at most the
+    ``max_sessions`` most recent sessions; older ones remain counted but are
+    no longer tracked per session.
+    """
+
+    def __init__(self, capacity: int = 512, max_sessions: int = 10000, session_ttl_seconds: float = 86400) -> None:
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self.session_ttl_seconds = session_ttl_seconds
+        self.sessions_by_mode: Dict[str, int] = {}
+        self._counters: Dict[tuple, SpaceSavingCounter] = {}
+        self._scores: Dict[str, ScoreSeries] = {}
+        # session_id -> (observed at, mode, counted (field, counter mode, key) items, (series key, index) scores),
+        # least recently finalized first.
+        self._observed: "OrderedDict[str, Tuple[float, str, List[Tuple[str, str, str]], List[Tuple[str, int]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _counter(self, field: str, mode: str) -> SpaceSavingCounter:
+        counter = self._counters.get((field, mode))
+        if counter is None:
+            counter = self._counters[(field, mode)] = SpaceSavingCounter(self.capacity)
+        return counter
+
+    def _forget(self, session_id: str) -> None:
+        previous = self._observed.pop(session_id, None)
+        if previous is None:
+            return
+        _, mode, counted, scored = previous
+        self.sessions_by_mode[mode] -= 1
+        for field, counter_mode, key in counted:
+            self._counter(field, counter_mode).remove(key)
+        for series_key, index in scored:
+            self._scores[series_key].discard(index)
+
+    def observe(self, mode: str, payload: Dict[str, Any], session_id: str = "") -> None:
+        consensus = payload.get("consensus", {}) or {}
+        investor_prep = payload.get("investor_prep", {}) or {}
+        counted: List[Tuple[str, str, str]] = []
+        scored: List[Tuple[str, int]] = []
+        with self._lock:
+            if session_id:
+                self._forget(session_id)
+            self.sessions_by_mode[mode] = self.sessions_by_mode.get(mode, 0) + 1
+            for field in TRACKED_LISTS:
+                items = consensus.get(field) or investor_prep.get(field) or []
+                for item in items:
+                    label = str(item).strip()
+                    key = _normalize(label)
+                    if not key:
+                        continue
+                    for counter_mode in (mode, "all"):
+                        self._counter(field, counter_mode).add(key, label)
+                        counted.append((field, counter_mode, key))
+            for boss_id, reviewer in (payload.get("reviewers") or {}).items():
+                score = (reviewer.get("response") or {}).get("score_10")
+                try:
+                    value = float(score)
+                except (TypeError, ValueError):
+                    continue
+                for series_key in (boss_id, "all"):
+                    scored.append((series_key, self._scores.setdefault(series_key, ScoreSeries()).append(value)))
+            if session_id:
+                now = time.monotonic()
+                self._observed[session_id] = (now, mode, counted, scored)
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        while self._observed:
+            session_id, (observed_at, *_) = next(iter(self._observed.items()))
+            if len(self._observed) <= self.max_sessions and now - observed_at < self.session_ttl_seconds:
+                return
+            del self._observed[session_id]
+
+    def snapshot(self, k: int = 10, mode: str = "all", percentiles: Iterable[float] = (50, 90)) -> Dict[str, Any]:
+        percentiles = list(percentiles)
+        with self._lock:
+            return {
+                "sessions": dict(self.sessions_by_mode),
+                "mode": mode,
+                "top": {
+                    field: self._counters[(field, mode)].top(k) if (field, mode) in self._counters else []
+                    for field in TRACKED_LISTS
+                },
+                "reviewer_scores": {key: series.summary(percentiles) for key, series in self._scores.items()},
+            }
@@ -1,14 +1,27 @@
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
+from services.reviewer_agents import ReviewerSpec
 
 
 class BoardLiveChat:
-    def __init__(self, gemini: GeminiClient) -> None:
+    """One reply per reviewer in the configured panel, keyed by ``boss_id``."""
+
+    def __init__(self, gemini: GeminiClient, panel: List[ReviewerSpec]) -> None:
         self.gemini = gemini
-        self.prompt = Path("prompts/system_board_live_chat.txt").read_text(encoding="utf-8")
+        self.panel = panel
+        schema = "{\n" + ",\n".join(f'  "{spec.boss_id}": "string"' for spec in panel) + "\n}"
+        focus = "\n".join(f"- {spec.boss_id} ({spec.label}) focus: {spec.focus}." for spec in panel)
+        self.prompt = (
+            Path("prompts/system_board_live_chat.txt")
+            .read_text(encoding="utf-8")
+            .replace("{{panel_size}}", str(len(panel)))
+            .replace("{{schema}}", schema)
+            .replace("{{focus}}", focus)
+        )
 
     def respond(
         self,
@@ -18,7 +31,8 @@ class BoardLiveChat:
         company_context: str = "",
         projects_context: str = "",
         resume_text: str = "",
-    ) -> Dict[str, str]:
+        deadline: Deadline | None = None,
+    ) -> Dict[str, object]:
         user_prompt = (
             "Latest founder message:\n"
             f"{latest_message}\n\n"
@@ -33,9 +47,6 @@ class BoardLiveChat:
             "Resume context:\n"
             f"{resume_text}\n"
         )
-        raw = self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt)
-        return {
-            "boss_1": str(raw.get("boss_1", "")).strip(),
-            "boss_2": str(raw.get("boss_2", "")).strip(),
-            "boss_3": str(raw.get("boss_3", "")).strip(),
-        }
+        raw = self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline)
+        replies = {spec.boss_id: str(raw.get(spec.boss_id, "")).strip() for spec in self.panel}
+        return {**replies, "degraded": bool(raw.get("degraded"))}
@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import itertools
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from services.serialization import dumps_text, loads
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()[:32]
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+class Cassette:
+    """Record/replay store for Gemini traffic.
+
+    Cassettes are gzip'd JSONL files. Each file stores every distinct system
+    prompt once (``{"sys": hash, "text": ...}``) and one line per call
+    (``{"k", "m", "s", "u", "r", "l", "t"}``: key, model, system prompt hash,
+    user prompt, response text, latency in ms, unix time). Recording appends
+    a gzip member per call, so a crashed process still leaves a readable file.
+    """
+
+    def __init__(self, directory: str, mode: str, latency_scale: float = 0.0, on_miss: str = "system") -> None:
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.on_miss = on_miss
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_system: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[Any, Iterator[Dict[str, Any]]] = {}
+        self._written_systems: set = set()
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = self.directory / f"cassette_{stamp}_{os.getpid()}.jsonl.gz"
+        if mode == "replay":
+            self._load()
+
+    @staticmethod
+    def key(model_name: str, system_prompt: str, user_prompt: str) -> str:
+        return _digest(model_name, system_prompt, user_prompt)
+
+    def _load(self) -> None:
+        for path in sorted(self.directory.glob("cassette_*.jsonl.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = loads(line)
+                    if "sys" in entry:
+                        continue
+                    self._by_key.setdefault(entry["k"], []).append(entry)
+                    self._by_system.setdefault((entry["m"], entry["s"]), []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._by_key.values())
+
+    def record(self, model_name: str, system_prompt: str, user_prompt: str, response_text: str, latency_s: float) -> None:
+        system_hash = _digest(system_prompt)
+        lines = []
+        with self._lock:
+            if system_hash not in self._written_systems:
+                self._written_systems.add(system_hash)
+                lines.append({"sys": system_hash, "text": system_prompt})
+            lines.append(
+                {
+                    "k": self.key(model_name, system_prompt, user_prompt),
+                    "m": model_name,
+                    "s": system_hash,
+                    "u": user_prompt,
+                    "r": response_text,
+                    "l": round(latency_s * 1000, 1),
+                    "t": round(time.time(), 3),
+                }
+            )
+            data = "".join(dumps_text(line) + "\n" for line in lines)
+            with gzip.open(self.path, "at", encoding="utf-8") as handle:
+                handle.write(data)
+
+    def _next(self, bucket_key: Any, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Cycle through repeated recordings so replays keep their natural variety.
+        with self._lock:
+            cursor = self._cursors.get(bucket_key)
+            if cursor is None:
+                cursor = self._cursors[bucket_key] = itertools.cycle(entries)
+            return next(cursor)
+
+    def lookup(self, model_name: str, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        key = self.key(model_name, system_prompt, user_prompt)
+        if key in self._by_key:
+            return self._next(key, self._by_key[key])
+        system_key = (model_name, _digest(system_prompt))
+        if self.on_miss == "system" and system_key in self._by_system:
+            return self._next(system_key, self._by_system[system_key])
+        raise CassetteMiss(f"No cassette entry for model={model_name} key={key}")
+
+    def replay_text(self, model_name: str, system_prompt: str, user_prompt: str) -> str:
+        entry = self.lookup(model_name, system_prompt, user_prompt)
+        if self.latency_scale > 0:
+            time.sleep(entry.get("l", 0) / 1000 * self.latency_scale)
+        return entry["r"]
+
+    def replay_stream(self, model_name: str, system_prompt: str, user_prompt: str, chunk_chars: int = 256) -> Iterator[str]:
+        entry = self.lookup(model_name, system_prompt, user_prompt)
+        text = entry["r"]
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+        delay = entry.get("l", 0) / 1000 * self.latency_scale / len(chunks)
+        for chunk in chunks:
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+
+
+def cassette_from_config(cfg) -> Optional[Cassette]:
+    if not cfg.gemini_cassette_mode:
+        return None
+    return Cassette(
+        cfg.gemini_cassette_dir,
+        cfg.gemini_cassette_mode,
+        latency_scale=cfg.gemini_cassette_latency_scale,
+        on_miss=cfg.gemini_cassette_on_miss,
+    )
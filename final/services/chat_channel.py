@@ -0,0 +1,105 @@
+import threading
+from typing import Any, Callable, Dict
+
+from config import config
+from services.context_store import CONTEXT_FIELDS, UnknownContextHash
+from services.deadline import Cancelled, Deadline
+from services.serialization import dumps_text
+
+
+class ChatChannel:
+    """Per-connection live chat over a WebSocket.
+
+    Each incoming message is numbered. Starting a new generation cancels the
+    previous one: calls that have not reached Gemini yet are skipped, and any
+    reply that finishes after being superseded is dropped instead of sent.
+    """
+
+    def __init__(self, orchestrator, session_id: str, send: Callable[[str], Any]) -> None:
+        self.orchestrator = orchestrator
+        self.session_id = session_id
+        self._send = send
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._current: Deadline | None = None
+        self.closed = False
+
+    def send(self, event: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        with self._send_lock:
+            try:
+                self._send(dumps_text(event))
+            except Exception:
+                # The socket went away; the receive loop will notice and close.
+                self.closed = True
+
+    def handle(self, payload: Dict[str, Any]) -> None:
+        message = (payload.get("message", "") or "").strip()
+        client_seq = payload.get("client_seq")
+        if not message:
+            self.send({"type": "error", "status": 400, "client_seq": client_seq, "error": "Message is required for live response"})
+            return
+        message_id = payload.get("client_message_id", "")
+        try:
+            delivered = self.orchestrator.delivered_reply(self.session_id, message_id)
+            if delivered is not None:
+                self.send({"type": "responses", "client_seq": client_seq, "replayed": True, **delivered})
+                return
+            session = self.orchestrator.add_message(
+                session_id=self.session_id,
+                message=message,
+                resume_text=payload.get("resume_text", ""),
+                company_context=payload.get("company_context", ""),
+                projects_context=payload.get("projects_text", ""),
+                coding_experience_level=payload.get("coding_experience_level", ""),
+                resume_doc_id=payload.get("resume_doc_id", ""),
+                context_hashes={
+                    name: payload[f"{name}_hash"] for name in CONTEXT_FIELDS if payload.get(f"{name}_hash")
+                },
+                message_id=message_id,
+            )
+        except UnknownContextHash as exc:
+            self.send({"type": "error", "status": 409, "client_seq": client_seq, "error": str(exc), "missing_context": exc.fields})
+            return
+        except KeyError:
+            self.send({"type": "error", "status": 404, "client_seq": client_seq, "error": "session not found"})
+            return
+        except ValueError as exc:
+            self.send({"type": "error", "status": 400, "client_seq": client_seq, "error": str(exc)})
+            return
+
+        deadline = Deadline(config.chat_budget_seconds)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            previous, self._current = self._current, deadline
+        if previous is not None:
+            previous.cancel()
+        self.send({"type": "accepted", "seq": seq, "client_seq": client_seq, "context_hashes": session.context_hashes})
+        self.orchestrator.chat_pool.submit(self._generate, seq, client_seq, message, deadline, message_id)
+
+    def _generate(self, seq: int, client_seq: Any, message: str, deadline: Deadline, message_id: str = "") -> None:
+        try:
+            response_payload = self.orchestrator.respond_to_message(
+                self.session_id, message, deadline=deadline, message_id=message_id
+            )
+        except Cancelled:
+            self.send({"type": "superseded", "seq": seq, "client_seq": client_seq})
+            return
+        except Exception as exc:
+            if seq == self._seq:
+                self.send({"type": "error", "status": 500, "seq": seq, "client_seq": client_seq, "error": f"message/respond failed: {exc}"})
+            return
+        if seq != self._seq or deadline.cancelled:
+            self.send({"type": "superseded", "seq": seq, "client_seq": client_seq})
+            return
+        self.send({"type": "responses", "seq": seq, "client_seq": client_seq, **response_payload})
+
+    def close(self) -> None:
+        self.closed = True
+        with self._lock:
+            current, self._current = self._current, None
+        if current is not None:
+            current.cancel()
@@ -0,0 +1,123 @@
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "into",
+    "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "with", "your",
+}
+
+
+def _shingles(text: str) -> Set[str]:
+    tokens = [tok for tok in _TOKEN_RE.findall(text.lower()) if tok not in _STOPWORDS]
+    # Crude suffix folding so "risk"/"risks" and "onboard"/"onboarding" share shingles.
+    tokens = [tok[:-1] if len(tok) > 3 and tok.endswith("s") else tok for tok in tokens]
+    tokens = [tok[:-3] if len(tok) > 5 and tok.endswith("ing") else tok for tok in tokens]
+    shingles = set(tokens)
+    shingles.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return shingles
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        self.num_perm = num_perm
+        self._params = []
+        state = seed
+        for _ in range(num_perm):
+            # Small LCG so the permutations are stable across processes.
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = (state >> 3) % _MERSENNE_PRIME or 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            b = (state >> 3) % _MERSENNE_PRIME
+            self._params.append((a, b))
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+    @staticmethod
+    def similarity(left: Sequence[int], right: Sequence[int]) -> float:
+        if not left:
+            return 0.0
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+@dataclass
+class ItemCluster:
+    text: str
+    reviewers: List[str] = field(default_factory=list)
+    variants: List[str] = field(default_factory=list)
+    first_seen: int = 0
+
+    @property
+    def agreement(self) -> int:
+        return len(self.reviewers)
+
+
+class SimilarityIndex:
+    """MinHash + LSH banding index that groups near-duplicate feedback items."""
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 64, bands: int = 32) -> None:
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+
+    def cluster(self, items: Sequence[Tuple[str, str]], preferred_reviewer: str = "") -> List[ItemCluster]:
+        """Cluster ``(reviewer_id, text)`` pairs and rank clusters by reviewer agreement."""
+        texts = [str(text).strip() for _, text in items]
+        signatures = [self.hasher.signature(_shingles(text)) for text in texts]
+        parent = list(range(len(items)))
+
+        def find(idx: int) -> int:
+            while parent[idx] != idx:
+                parent[idx] = parent[parent[idx]]
+                idx = parent[idx]
+            return idx
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        for idx, sig in enumerate(signatures):
+            if not texts[idx]:
+                continue
+            for band in range(self.bands):
+                key = (band, sig[band * self.rows:(band + 1) * self.rows])
+                buckets.setdefault(key, []).append(idx)
+
+        for members in buckets.values():
+            head = members[0]
+            for other in members[1:]:
+                root_a, root_b = find(head), find(other)
+                if root_a == root_b:
+                    continue
+                if MinHasher.similarity(signatures[head], signatures[other]) >= self.threshold:
+                    parent[root_b] = root_a
+
+        grouped: Dict[int, ItemCluster] = {}
+        for idx, (reviewer_id, _) in enumerate(items):
+            text = texts[idx]
+            if not text:
+                continue
+            root = find(idx)
+            cluster = grouped.get(root)
+            if cluster is None:
+                cluster = grouped[root] = ItemCluster(text=text, first_seen=idx)
+            elif reviewer_id == preferred_reviewer and preferred_reviewer not in cluster.reviewers:
+                cluster.text = text
+            if reviewer_id not in cluster.reviewers:
+                cluster.reviewers.append(reviewer_id)
+            cluster.variants.append(text)
+
+        return sorted(
+            grouped.values(),
+            key=lambda c: (-c.agreement, preferred_reviewer not in c.reviewers, c.first_seen),
+        )
@@ -0,0 +1,159 @@
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List
+
+from services.context_store import content_hash
+from services.transcript import estimate_tokens
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_LINE_RE = re.compile(r"\n+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "i", "in", "is", "it",
+    "its", "of", "on", "or", "our", "that", "the", "their", "this", "to", "was", "we", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [tok for tok in _TOKEN_RE.findall(text.lower()) if tok not in _STOPWORDS]
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens``, at a word boundary when there is one."""
+    limit = max(1, max_tokens) * 4
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[: cut if cut > limit // 2 else limit].rstrip()
+
+
+def _split_oversized(text: str, chunk_tokens: int) -> List[str]:
+    """Split ``text`` on sentences, then lines, then a fixed window, until every piece fits ``chunk_tokens``."""
+    text = text.strip()
+    if not text:
+        return []
+    if estimate_tokens(text) <= chunk_tokens:
+        return [text]
+    for pattern in (_SENTENCE_RE, _LINE_RE):
+        parts = [part for part in pattern.split(text) if part.strip()]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _split_oversized(part, chunk_tokens)]
+    # No sentence or line breaks left (e.g. a minified blob): fall back to fixed windows.
+    pieces = []
+    while text:
+        piece = _truncate(text, chunk_tokens)
+        pieces.append(piece)
+        text = text[len(piece):].strip()
+    return pieces
+
+
+def chunk_text(text: str, chunk_tokens: int = 160) -> List[str]:
+    """Split on paragraphs, packing them into ~``chunk_tokens`` pieces.
+
+    Long paragraphs are split on sentences, then on lines (bullet lists,
+    READMEs), then on a fixed window, so no piece exceeds ``chunk_tokens``.
+    """
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        pieces.extend(_split_oversized(paragraph, chunk_tokens))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and size + piece_tokens > chunk_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += piece_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75) -> None:
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._tf: List[Counter] = [Counter(tokenize(chunk)) for chunk in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._tf]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        df: Counter = Counter()
+        for tf in self._tf:
+            df.update(tf.keys())
+        total = len(chunks)
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self._idf]
+        results = []
+        for tf, length in zip(self._tf, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term, 0)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+    def select(self, query: str, token_budget: int) -> str:
+        """Best-scoring chunks that fit in ``token_budget``, joined in document order."""
+        scores = self.scores(query)
+        ranked = sorted(range(len(self.chunks)), key=lambda idx: (-scores[idx], idx))
+        chosen = []
+        used = 0
+        for idx in ranked:
+            if scores[idx] <= 0 and chosen:
+                break
+            cost = estimate_tokens(self.chunks[idx])
+            if used + cost > token_budget:
+                continue
+            chosen.append(idx)
+            used += cost
+        if not chosen and ranked:
+            # Every chunk is over budget (a budget below the chunk size): keep the start of the best one.
+            return _truncate(self.chunks[ranked[0]], token_budget)
+        return "\n...\n".join(self.chunks[idx] for idx in sorted(chosen))
+
+
+class ContextRetriever:
+    """Builds one BM25 index per distinct context blob and trims it per query.
+
+    Text that already fits the budget is returned unchanged, so short
+    contexts behave exactly as before.
+    """
+
+    def __init__(self, token_budget: int = 1500, chunk_tokens: int = 160, max_indexes: int = 256) -> None:
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index_for(self, text: str, digest: str = "") -> BM25Index:
+        digest = digest or content_hash(text)
+        with self._lock:
+            index = self._indexes.get(digest)
+            if index is not None:
+                self._indexes.move_to_end(digest)
+                return index
+        index = BM25Index(chunk_text(text, self.chunk_tokens))
+        with self._lock:
+            self._indexes[digest] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def select(self, text: str, query: str, digest: str = "", token_budget: int = 0) -> str:
+        budget = token_budget or self.token_budget
+        if not text or estimate_tokens(text) <= budget:
+            return text
+        return self.index_for(text, digest).select(query, budget)
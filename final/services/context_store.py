@@ -0,0 +1,58 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Tuple
+
+
+CONTEXT_FIELDS = {
+    "resume_text": "resume_text",
+    "company_context": "company_context",
+    "projects_text": "projects_context",
+}
+
+
+class UnknownContextHash(LookupError):
+    def __init__(self, fields: Iterable[str]) -> None:
+        self.fields: List[str] = list(fields)
+        super().__init__(f"Unknown context hash for: {', '.join(self.fields)}")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContextStore:
+    """Content-addressed store for large context blobs, shared across sessions.
+
+    Clients send a blob once and then refer to it by hash. Entries are evicted
+    least-recently-used; an evicted hash surfaces as ``UnknownContextHash`` and
+    the client re-uploads the body.
+    """
+
+    def __init__(self, max_items: int = 1024) -> None:
+        self.max_items = max_items
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> str:
+        return self.intern(text)[0]
+
+    def intern(self, text: str) -> Tuple[str, str]:
+        """Return ``(hash, canonical_text)``; identical blobs from different sessions share one string."""
+        digest = content_hash(text)
+        with self._lock:
+            canonical = self._items.setdefault(digest, text)
+            self._items.move_to_end(digest)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return digest, canonical
+
+    def get(self, digest: str) -> str:
+        with self._lock:
+            text = self._items[digest]
+            self._items.move_to_end(digest)
+            return text
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._items
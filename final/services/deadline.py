@@ -0,0 +1,49 @@
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Cancelled(DeadlineExceeded):
+    """The work was superseded; treated like an expired deadline by every stage."""
+
+
+class Deadline:
+    """Time budget for one request, shared by every stage and Gemini call it makes.
+
+    ``respond_remaining()`` is how long the caller is willing to wait for an
+    answer. ``remaining()`` is how long work may keep running at all: stages
+    that miss the response budget carry on in the background until then.
+    """
+
+    def __init__(self, respond_in: float, abandon_in: Optional[float] = None) -> None:
+        now = time.monotonic()
+        self.respond_at = now + respond_in
+        self.abandon_at = now + max(respond_in, abandon_in if abandon_in is not None else respond_in)
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def respond_remaining(self) -> float:
+        return max(0.0, self.respond_at - time.monotonic())
+
+    def remaining(self) -> float:
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self.abandon_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() >= self.abandon_at
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise Cancelled("Superseded by a newer request")
+        if self.expired():
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def cap(self, seconds: float) -> float:
+        """Clamp a timeout so it never outlives the deadline."""
+        return min(seconds, self.remaining())
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+except Exception:
+    PdfReader = None
+
+from config import config
+from services.serialization import dumps_text, loads
+
+
+SUPPORTED_SUFFIXES = {".txt", ".md", ".pdf", ".docx"}
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_CHUNK_SIZE = 64 * 1024
+
+
+class DocumentTooLarge(ValueError):
+    pass
+
+
+def extract_text(path: str, suffix: str) -> str:
+    """Runs in a worker process, so it only takes picklable arguments."""
+    if suffix in {".txt", ".md"}:
+        return Path(path).read_text(encoding="utf-8", errors="replace")
+    if suffix == ".pdf":
+        if PdfReader is None:
+            raise ValueError("PDF support requires the pypdf package")
+        reader = PdfReader(path)
+        return "\n".join((page.extract_text() or "") for page in reader.pages)
+    if suffix == ".docx":
+        with zipfile.ZipFile(path) as archive:
+            root = ElementTree.fromstring(archive.read("word/document.xml"))
+        paragraphs = []
+        for para in root.iter(f"{_WORD_NS}p"):
+            text = "".join(node.text or "" for node in para.iter(f"{_WORD_NS}t"))
+            if text:
+                paragraphs.append(text)
+        return "\n".join(paragraphs)
+    raise ValueError(f"Unsupported document type: {suffix}")
+
+
+def _normalize(text: str) -> str:
+    text = text.replace("\r\n", "\n").replace("\x00", "")
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+class DocumentStore:
+    """Content-addressed cache of extracted document text.
+
+    Uploads are streamed to disk while hashing, so the same bytes are only
+    parsed once. Parsing happens in a process pool to keep large PDFs off the
+    request threads.
+    """
+
+    def __init__(self, root: str = "", max_workers: int = 0, memory_items: int = 64) -> None:
+        self.root = Path(root or config.documents_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or config.document_workers
+        self.memory_items = memory_items
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _text_path(self, doc_id: str) -> Path:
+        return self.root / doc_id[:2] / f"{doc_id}.txt"
+
+    def _meta_path(self, doc_id: str) -> Path:
+        return self.root / doc_id[:2] / f"{doc_id}.json"
+
+    def _write_atomic(self, path: Path, text: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            tmp.write(text)
+        os.replace(tmp.name, path)
+
+    def ingest(self, stream: BinaryIO, filename: str, max_bytes: int = 0) -> Dict[str, object]:
+        suffix = Path(filename or "").suffix.lower()
+        if suffix not in SUPPORTED_SUFFIXES:
+            raise ValueError(f"Unsupported document type. Use one of: {', '.join(sorted(SUPPORTED_SUFFIXES))}")
+        max_bytes = max_bytes or config.upload_max_bytes
+
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self.root, suffix=suffix, delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+            try:
+                while True:
+                    chunk = stream.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise DocumentTooLarge(f"Document exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            except Exception:
+                tmp.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+        try:
+            doc_id = digest.hexdigest()
+            if self.exists(doc_id):
+                return {**self.describe(doc_id), "cached": True}
+            future = self._executor().submit(extract_text, str(tmp_path), suffix)
+            text = _normalize(future.result(timeout=config.document_parse_timeout_seconds))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        meta = {"doc_id": doc_id, "filename": Path(filename).name, "bytes": size, "chars": len(text)}
+        # Both files appear whole; the meta file goes last and is what exists() checks, so a concurrent
+        # upload of the same document never sees one without the other.
+        self._write_atomic(self._text_path(doc_id), text)
+        self._write_atomic(self._meta_path(doc_id), dumps_text(meta))
+        self._remember(doc_id, text)
+        return {**meta, "cached": False}
+
+    def exists(self, doc_id: str) -> bool:
+        return bool(doc_id) and self._meta_path(doc_id).exists()
+
+    def describe(self, doc_id: str) -> Dict[str, object]:
+        if not self.exists(doc_id):
+            raise KeyError(doc_id)
+        return loads(self._meta_path(doc_id).read_text(encoding="utf-8"))
+
+    def get_text(self, doc_id: str) -> str:
+        with self._lock:
+            if doc_id in self._memory:
+                self._memory.move_to_end(doc_id)
+                return self._memory[doc_id]
+        if not self.exists(doc_id):
+            raise KeyError(doc_id)
+        text = self._text_path(doc_id).read_text(encoding="utf-8")
+        self._remember(doc_id, text)
+        return text
+
+    def _remember(self, doc_id: str, text: str) -> None:
+        with self._lock:
+            self._memory[doc_id] = text
+            self._memory.move_to_end(doc_id)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+_MODE_RE = re.compile(r"^(?:Session mode|Mode):\s*(\S+)", re.MULTILINE)
+_SUBMODE_RE = re.compile(r"^Submode:\s*(\S+)", re.MULTILINE)
+_LIST_KEY_RE = re.compile(r"^-\s*([a-z0-9_]+)(\s*\(array\))?\s*$", re.MULTILINE)
+_JSON_KEY_RE = re.compile(r'"([a-z0-9_]+)"\s*:\s*(\[|"|\{)')
+_MISSING = "Not available in offline mode."
+
+
+def parse_schema(system_prompt: str) -> Dict[str, str]:
+    """Top-level output keys and their kind ("array" or "string") as described by a system prompt."""
+    schema: Dict[str, str] = {}
+    for name, array in _LIST_KEY_RE.findall(system_prompt):
+        schema[name] = "array" if array else "string"
+    if not schema:
+        start = system_prompt.find("{")
+        end = system_prompt.rfind("}")
+        if start != -1 and end > start:
+            depth = 0
+            # Only keys at depth 1 of the example object are output fields.
+            for idx, char in enumerate(system_prompt[start : end + 1], start=start):
+                if char in "{[":
+                    depth += 1
+                elif char in "}]":
+                    depth -= 1
+                elif char == '"' and depth == 1:
+                    match = _JSON_KEY_RE.match(system_prompt, idx)
+                    if match and match.group(1) not in schema:
+                        schema[match.group(1)] = "array" if match.group(2) == "[" else "string"
+    return schema
+
+
+class FallbackResponder:
+    """Deterministic stand-in for the model when every provider call fails.
+
+    Fills the keys each system prompt asks for from a curated bank keyed by
+    mode and submode, so callers get schema-shaped output in well under a
+    millisecond. Every response carries ``"degraded": true``.
+    """
+
+    def __init__(self, bank_path: str = "prompts/fallback_bank.json") -> None:
+        self.bank: Dict[str, Dict[str, Any]] = json.loads(Path(bank_path).read_text(encoding="utf-8"))
+        self._schemas: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _schema(self, system_prompt: str) -> Dict[str, str]:
+        digest = hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()
+        schema = self._schemas.get(digest)
+        if schema is None:
+            schema = parse_schema(system_prompt)
+            with self._lock:
+                self._schemas[digest] = schema
+        return schema
+
+    def _lookup(self, key: str, sections: List[Dict[str, Any]]) -> Any:
+        for section in sections:
+            if key in section:
+                return section[key]
+        return None
+
+    def respond(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        mode_match = _MODE_RE.search(user_prompt)
+        submode_match = _SUBMODE_RE.search(user_prompt)
+        # Only board-mode prompts omit the mode line.
+        mode = mode_match.group(1) if mode_match else "board_investors"
+        submode = submode_match.group(1) if submode_match else ""
+        sections = [
+            self.bank.get(f"{mode}/{submode}", {}),
+            self.bank.get(mode, {}),
+            self.bank.get("default", {}),
+        ]
+        # Vary the picks by input so repeated chat turns don't all get the same line, but stay deterministic.
+        seed = int(hashlib.sha1(user_prompt.encode("utf-8")).hexdigest()[:8], 16)
+
+        output: Dict[str, Any] = {}
+        for key, kind in self._schema(system_prompt).items():
+            if key == "turns":
+                output[key] = self._turns(sections)
+            elif key == "coach_reply":
+                replies = self._lookup("chat_replies", sections) or [_MISSING]
+                output[key] = replies[seed % len(replies)]
+            elif key.startswith("boss_"):
+                replies = self._lookup("board_replies", sections) or {}
+                output[key] = replies.get(key, _MISSING)
+            elif key == "interview_title":
+                output[key] = f"Practice interview ({mode.replace('_', ' ')}, offline)"
+            elif key == "scenario":
+                output[key] = "Offline practice round with standard questions while live feedback is unavailable."
+            else:
+                value = self._lookup(key, sections)
+                if kind == "array":
+                    output[key] = list(value) if isinstance(value, list) else []
+                else:
+                    output[key] = value if value is not None else _MISSING
+        output["degraded"] = True
+        return output
+
+    def _turns(self, sections: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        questions = self._lookup("interview_questions", sections) or []
+        answers = self._lookup("candidate_answers", sections) or []
+        turns = []
+        for idx, question in enumerate(questions[:6]):
+            turns.append({"speaker": "Interviewer", "message": question})
+            hint = answers[idx % len(answers)] if answers else "Practice your answer out loud."
+            turns.append({"speaker": "Candidate", "message": f"[Your answer] Tip: {hint}"})
+        return turns
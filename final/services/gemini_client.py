@@ -1,19 +1,45 @@
-import json
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Dict, Iterator, List
 
 import google.generativeai as genai
 
 from config import config
+from services.cassette import cassette_from_config
+from services.deadline import Deadline, DeadlineExceeded
+from services.fallback import FallbackResponder
+from services.gemini_transport import transport_from_config
+from services.rate_limiter import (
+    SUCCESS,
+    THROTTLED,
+    TIMEOUT,
+    LimiterRegistry,
+    LimiterTimeout,
+    backoff_delay,
+    classify_error,
+    retry_after_seconds,
+)
+from services.serialization import DecodeError, dumps_text, loads
 
 
 class GeminiClient:
     def __init__(self) -> None:
-        if not config.gemini_api_key:
-            raise ValueError(
-                "Missing Gemini API key. Set one of: GEMINI_API_KEY, GOOGLE_API_KEY, or key in final/.env"
-            )
-        genai.configure(api_key=config.gemini_api_key)
-        self._available_models = self._load_available_models()
+        self.cassette = cassette_from_config(config)
+        self.fallback = FallbackResponder() if config.degraded_fallback_enabled else None
+        # Counts fallback answers for the admin view. Whether one call was degraded travels with its result
+        # ("degraded": true), never through shared state, since the client serves every session at once.
+        self._fallback_lock = threading.Lock()
+        self._fallback_count = 0
+        self._last_fallback_at: float | None = None
+        self.limits = LimiterRegistry(
+            config.gemini_initial_concurrency,
+            config.gemini_min_concurrency,
+            config.gemini_max_concurrency,
+        )
+        # Optional cap on calls in flight across every model (batch runs set it).
+        self.global_slots = (
+            threading.BoundedSemaphore(config.gemini_global_concurrency) if config.gemini_global_concurrency > 0 else None
+        )
         self._preferred_fallbacks = [
             "gemini-3-flash-preview",
             "gemini-2.5-flash",
@@ -24,6 +50,20 @@ class GeminiClient:
             "gemini-1.5-flash": "gemini-3-flash-preview",
             "gemini-1.5-pro": "gemini-3-flash-preview",
         }
+        self.transport = None
+        if self.cassette is not None and self.cassette.mode == "replay":
+            # Replay never talks to the provider, so it runs without a key or network.
+            self._available_models: List[str] = []
+            return
+        if not config.gemini_api_key:
+            raise ValueError(
+                "Missing Gemini API key. Set one of: GEMINI_API_KEY, GOOGLE_API_KEY, or key in final/.env"
+            )
+        genai.configure(api_key=config.gemini_api_key)
+        self.transport = transport_from_config(config, config.gemini_api_key)
+        if self.transport is not None:
+            self.transport.warm_in_background(config.gemini_warm_timeout_seconds)
+        self._available_models = self._load_available_models()
 
     def _load_available_models(self) -> List[str]:
         try:
@@ -50,35 +90,216 @@ class GeminiClient:
                 return candidate
         return self._available_models[0]
 
-    def generate_json(self, model_name: str, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    def _candidates(self, model_name: str) -> List[str]:
         candidates = [self._choose_model(model_name), *self._preferred_fallbacks]
         deduped_candidates: List[str] = []
         for candidate in candidates:
             if candidate and candidate not in deduped_candidates:
                 deduped_candidates.append(candidate)
+        return deduped_candidates
+
+    def _generate_text(self, model_name: str, system_prompt: str, user_prompt: str, deadline: Deadline | None = None) -> str:
+        if self.cassette is not None and self.cassette.mode == "replay":
+            return self.cassette.replay_text(model_name, system_prompt, user_prompt)
 
+        started = time.perf_counter()
         response = None
         last_exc: Exception | None = None
-        for candidate in deduped_candidates:
+        for candidate in self._candidates(model_name):
+            if deadline is not None:
+                deadline.check()
+            try:
+                response = self._call_with_backoff(candidate, system_prompt, user_prompt, deadline=deadline)
+                break
+            except DeadlineExceeded:
+                raise
+            except Exception as exc:
+                last_exc = exc
+
+        if response is None and last_exc is not None:
+            raise last_exc
+        text = (response.text or "").strip()
+        if self.cassette is not None:
+            self.cassette.record(model_name, system_prompt, user_prompt, text, time.perf_counter() - started)
+        return text
+
+    def _call_with_backoff(
+        self,
+        candidate: str,
+        system_prompt: str,
+        user_prompt: str,
+        stream: bool = False,
+        deadline: Deadline | None = None,
+    ):
+        """Call one model under its adaptive concurrency limit.
+
+        429s and timeouts shrink the model's limit and are retried with jittered
+        exponential backoff (honouring Retry-After) before the caller falls back
+        to the next model. With ``stream=True`` the slot is held until the
+        returned iterator is exhausted. Every wait is clamped to ``deadline``.
+        """
+        limiter = self.limits.get(candidate)
+        attempt = 0
+        while True:
+            acquire_timeout = config.gemini_acquire_timeout_seconds
+            request_timeout = config.gemini_request_timeout_seconds
+            if deadline is not None:
+                deadline.check()
+                acquire_timeout = deadline.cap(acquire_timeout)
+                request_timeout = deadline.cap(request_timeout)
+            self._acquire_global(acquire_timeout)
+            try:
+                admitted_at = limiter.acquire(acquire_timeout)
+            except LimiterTimeout:
+                self._release_global()
+                raise
+            lease = self.transport.lease() if self.transport is not None else None
             try:
                 model = genai.GenerativeModel(
                     model_name=candidate,
                     system_instruction=system_prompt,
                 )
+                if lease is not None:
+                    # The SDK would lazily build its own default client; hand it a pooled connection instead.
+                    model._client = lease.client
                 response = model.generate_content(
                     user_prompt,
                     generation_config={"response_mime_type": "application/json"},
+                    request_options={"timeout": request_timeout},
+                    stream=stream,
                 )
-                break
             except Exception as exc:
-                last_exc = exc
+                outcome = classify_error(exc)
+                retry_after = retry_after_seconds(exc)
+                if lease is not None:
+                    lease.release(error=True)
+                limiter.release(outcome, retry_after, admitted_at)
+                self._release_global()
+                if outcome not in {THROTTLED, TIMEOUT} or attempt >= config.gemini_max_retries:
+                    raise
+                delay = backoff_delay(
+                    attempt,
+                    config.gemini_backoff_base_seconds,
+                    config.gemini_backoff_cap_seconds,
+                    retry_after,
+                )
+                if deadline is not None and delay >= deadline.remaining():
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if not stream:
+                if lease is not None:
+                    lease.release()
+                limiter.release(SUCCESS)
+                self._release_global()
+                return response
+            return self._held_stream(limiter, response, lease, admitted_at)
 
-        if response is None and last_exc is not None:
-            raise last_exc
-        text = (response.text or "").strip()
+    def _held_stream(self, limiter, response, lease=None, admitted_at: float | None = None) -> Iterator[Any]:
+        outcome = SUCCESS
+        retry_after = None
+        try:
+            for chunk in response:
+                yield chunk
+        except Exception as exc:
+            outcome = classify_error(exc)
+            retry_after = retry_after_seconds(exc)
+            raise
+        finally:
+            if lease is not None:
+                lease.release(error=outcome != SUCCESS)
+            limiter.release(outcome, retry_after, admitted_at)
+            self._release_global()
+
+    def _acquire_global(self, timeout: float) -> None:
+        if self.global_slots is not None and not self.global_slots.acquire(timeout=timeout):
+            raise LimiterTimeout("Timed out waiting for a global Gemini concurrency slot")
+
+    def _release_global(self) -> None:
+        if self.global_slots is not None:
+            self.global_slots.release()
+
+    def _can_fall_back(self) -> bool:
+        # A cassette replay miss is a test failure, not an outage.
+        return self.fallback is not None and not (self.cassette is not None and self.cassette.mode == "replay")
+
+    def limits_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return self.limits.snapshot()
+
+    def transport_snapshot(self) -> Dict[str, Any]:
+        return self.transport.snapshot() if self.transport is not None else {}
+
+    def fallback_snapshot(self) -> Dict[str, Any]:
+        with self._fallback_lock:
+            return {"responses": self._fallback_count, "last_at": self._last_fallback_at}
+
+    def _fall_back(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        with self._fallback_lock:
+            self._fallback_count += 1
+            self._last_fallback_at = time.time()
+        return self.fallback.respond(system_prompt, user_prompt)
+
+    def generate_json(
+        self,
+        model_name: str,
+        system_prompt: str,
+        user_prompt: str,
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
+        try:
+            text = self._generate_text(model_name, system_prompt, user_prompt, deadline=deadline)
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            if not self._can_fall_back():
+                raise
+            return self._fall_back(system_prompt, user_prompt)
         if not text:
             return {"raw": "", "error": "Empty response"}
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            return {"raw": text, "error": "Invalid JSON from model"}
+            return loads(text)
+        except DecodeError:
+            return {"raw": text, "error": "Invalid JSON from model"}
+
+    def stream_text(
+        self,
+        model_name: str,
+        system_prompt: str,
+        user_prompt: str,
+        deadline: Deadline | None = None,
+    ) -> Iterator[str]:
+        """Yield raw JSON text chunks as the model produces them.
+
+        Falls back to the next model only if a candidate fails before its first
+        chunk; once text has been yielded a failure is raised to the caller.
+        """
+        if self.cassette is not None and self.cassette.mode == "replay":
+            yield from self.cassette.replay_stream(model_name, system_prompt, user_prompt)
+            return
+
+        started = time.perf_counter()
+        last_exc: Exception | None = None
+        for candidate in self._candidates(model_name):
+            chunks: List[str] = []
+            try:
+                response = self._call_with_backoff(candidate, system_prompt, user_prompt, stream=True, deadline=deadline)
+                for chunk in response:
+                    text = getattr(chunk, "text", "") or ""
+                    if text:
+                        chunks.append(text)
+                        yield text
+            except Exception as exc:
+                if chunks or isinstance(exc, DeadlineExceeded):
+                    raise
+                last_exc = exc
+                continue
+            if self.cassette is not None:
+                self.cassette.record(
+                    model_name, system_prompt, user_prompt, "".join(chunks).strip(), time.perf_counter() - started
+                )
+            return
+        if last_exc is not None:
+            if not self._can_fall_back():
+                raise last_exc
+            yield dumps_text(self._fall_back(system_prompt, user_prompt))
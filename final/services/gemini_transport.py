@@ -0,0 +1,180 @@
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import grpc
+from google.ai import generativelanguage as glm
+from google.ai.generativelanguage_v1beta.services.generative_service.transports.grpc import (
+    GenerativeServiceGrpcTransport,
+)
+
+try:
+    from google.auth import api_key as api_key_credentials
+except Exception:
+    api_key_credentials = None
+
+
+DEFAULT_TARGET = "generativelanguage.googleapis.com:443"
+
+
+def channel_options(streams_per_connection: int) -> List[tuple]:
+    return [
+        # Without a local subchannel pool, gRPC would collapse channels with equal args onto one TCP connection.
+        ("grpc.use_local_subchannel_pool", 1),
+        ("grpc.keepalive_time_ms", 30000),
+        ("grpc.keepalive_timeout_ms", 10000),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.max_concurrent_streams", streams_per_connection),
+        ("grpc.max_receive_message_length", -1),
+    ]
+
+
+def pool_size_for(admission_limit: int, streams_per_connection: int) -> int:
+    """Connections needed so ``admission_limit`` concurrent calls fit in ``streams_per_connection`` HTTP/2 streams each."""
+    return max(1, math.ceil(admission_limit / max(1, streams_per_connection)))
+
+
+class PooledConnection:
+    def __init__(self, index: int, channel: grpc.Channel) -> None:
+        self.index = index
+        self.channel = channel
+        self.client = glm.GenerativeServiceClient(transport=GenerativeServiceGrpcTransport(channel=channel))
+        self.created_at = time.time()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.ready = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "ready": self.ready,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests": self.requests,
+            # Every request after the first rides an already-open connection.
+            "reused": max(0, self.requests - 1),
+            "errors": self.errors,
+            "age_s": round(time.time() - self.created_at, 1),
+        }
+
+
+class Lease:
+    def __init__(self, pool: "GeminiTransport", connection: PooledConnection) -> None:
+        self._pool = pool
+        self.connection = connection
+        self.client = connection.client
+        self._released = False
+
+    def release(self, error: bool = False) -> None:
+        if not self._released:
+            self._released = True
+            self._pool._release(self.connection, error)
+
+
+class GeminiTransport:
+    """A fixed pool of long-lived gRPC (HTTP/2) channels shared by every request thread.
+
+    Each lease goes to the connection with the fewest calls in flight, so
+    concurrent calls multiplex over a handful of warm connections instead of
+    whatever the SDK's default client happens to open.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        api_key: str = "",
+        target: str = DEFAULT_TARGET,
+        insecure: bool = False,
+        streams_per_connection: int = 100,
+    ) -> None:
+        options = channel_options(streams_per_connection)
+        if not insecure:
+            # Without API-key credentials the channel would quietly fall back to application default credentials.
+            if not api_key:
+                raise ValueError("GEMINI_TRANSPORT=pool needs a Gemini API key")
+            if api_key_credentials is None:
+                raise ValueError(
+                    "GEMINI_TRANSPORT=pool needs google.auth.api_key; upgrade google-auth or set GEMINI_TRANSPORT=sdk"
+                )
+        self.target = target
+        self._lock = threading.Lock()
+        self._connections: List[PooledConnection] = []
+        for index in range(max(1, size)):
+            if insecure:
+                channel = grpc.insecure_channel(target, options=options)
+            else:
+                credentials = api_key_credentials.Credentials(api_key)
+                channel = GenerativeServiceGrpcTransport.create_channel(target, credentials=credentials, options=options)
+            self._connections.append(PooledConnection(index, channel))
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+
+    def warm(self, timeout: float = 5.0) -> int:
+        """Open every connection now (TCP + TLS + HTTP/2 preface) so the first real calls don't pay for it."""
+        ready = 0
+        for connection in self._connections:
+            try:
+                grpc.channel_ready_future(connection.channel).result(timeout=timeout)
+            except grpc.FutureTimeoutError:
+                continue
+            connection.ready = True
+            ready += 1
+        return ready
+
+    def warm_in_background(self, timeout: float = 5.0) -> threading.Thread:
+        thread = threading.Thread(target=self.warm, args=(timeout,), name="gemini-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def lease(self) -> Lease:
+        with self._lock:
+            connection = min(self._connections, key=lambda conn: (conn.in_flight, conn.requests))
+            connection.in_flight += 1
+            connection.requests += 1
+            connection.max_in_flight = max(connection.max_in_flight, connection.in_flight)
+        return Lease(self, connection)
+
+    def _release(self, connection: PooledConnection, error: bool) -> None:
+        with self._lock:
+            connection.in_flight -= 1
+            if error:
+                connection.errors += 1
+            else:
+                connection.ready = True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            connections = [connection.snapshot() for connection in self._connections]
+        requests = sum(item["requests"] for item in connections)
+        reused = sum(item["reused"] for item in connections)
+        return {
+            "target": self.target,
+            "size": len(connections),
+            "requests": requests,
+            "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+            "connections": connections,
+        }
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.channel.close()
+
+
+def transport_from_config(config, api_key: str) -> Optional[GeminiTransport]:
+    if config.gemini_transport != "pool":
+        return None
+    admission = config.gemini_global_concurrency or int(config.gemini_max_concurrency)
+    size = config.gemini_pool_size or pool_size_for(admission, config.gemini_streams_per_connection)
+    return GeminiTransport(
+        size,
+        api_key=api_key,
+        target=config.gemini_target or DEFAULT_TARGET,
+        insecure=config.gemini_target_insecure,
+        streams_per_connection=config.gemini_streams_per_connection,
+    )
@@ -2,6 +2,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
 
 
@@ -18,6 +19,7 @@ class InterviewCoach:
         company_context: str = "",
         projects_context: str = "",
         coding_experience_level: str = "",
+        deadline: Deadline | None = None,
     ) -> Dict[str, Any]:
         user_prompt = (
             f"Mode: interview_1on1\nSubmode: {submode or 'none'}\n\n"
@@ -31,4 +33,4 @@ class InterviewCoach:
             "Resume text:\n"
             f"{resume_text}"
         )
-        return self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt)
+        return self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline)
@@ -1,8 +1,78 @@
+import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
+from services.prompt_json import SIMULATOR_CONSENSUS_FIELDS, compact_json
+from services.serialization import DecodeError, loads
+
+
+_TURNS_RE = re.compile(r'"turns"\s*:\s*\[')
+
+
+class TurnStreamParser:
+    """Pulls complete objects out of the ``turns`` array of a partially received JSON document."""
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self._scan = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_start = 0
+        self._turns_done = False
+        self._turn_index = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.buffer += chunk
+        events: List[Dict[str, Any]] = []
+        if self._scan < 0:
+            match = _TURNS_RE.search(self.buffer)
+            if not match:
+                return events
+            self._scan = match.end()
+            head = self.buffer[: match.start()].rstrip().rstrip(",")
+            try:
+                meta = loads(head + "}")
+            except DecodeError:
+                meta = {}
+            if isinstance(meta, dict) and meta:
+                events.append({"type": "meta", **meta})
+
+        buffer = self.buffer
+        idx = self._scan
+        while idx < len(buffer) and not self._turns_done:
+            ch = buffer[idx]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._obj_start = idx
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        turn = loads(buffer[self._obj_start: idx + 1])
+                    except DecodeError:
+                        turn = None
+                    if isinstance(turn, dict):
+                        events.append({"type": "turn", "index": self._turn_index, "turn": turn})
+                        self._turn_index += 1
+            elif ch == "]" and self._depth == 0:
+                self._turns_done = True
+            idx += 1
+        self._scan = idx
+        return events
 
 
 class InterviewSimulator:
@@ -10,7 +80,7 @@ class InterviewSimulator:
         self.gemini = gemini
         self.prompt = Path("prompts/system_interview_simulator.txt").read_text(encoding="utf-8")
 
-    def generate(
+    def _user_prompt(
         self,
         mode: str,
         transcript: str,
@@ -18,8 +88,9 @@ class InterviewSimulator:
         projects_context: str,
         resume_text: str,
         consensus: Dict[str, Any],
-    ) -> Dict[str, Any]:
-        user_prompt = (
+        bank_questions: List[str] | None = None,
+    ) -> str:
+        prompt = (
             f"Session mode: {mode}\n\n"
             "Founder transcript:\n"
             f"{transcript}\n\n"
@@ -30,6 +101,62 @@ class InterviewSimulator:
             "Resume text:\n"
             f"{resume_text}\n\n"
             "Consensus summary JSON:\n"
-            f"{consensus}\n"
+            f"{compact_json(consensus, SIMULATOR_CONSENSUS_FIELDS)}\n"
+        )
+        if bank_questions:
+            numbered = "\n".join(f"{idx}. {question}" for idx, question in enumerate(bank_questions, start=1))
+            prompt += (
+                "\nStandard interviewer questions (ask these as the main questions, in order; "
+                "spend your effort on personalized candidate answers and follow-up challenges):\n"
+                f"{numbered}\n"
+            )
+        return prompt
+
+    def generate(
+        self,
+        mode: str,
+        transcript: str,
+        company_context: str,
+        projects_context: str,
+        resume_text: str,
+        consensus: Dict[str, Any],
+        deadline: Deadline | None = None,
+        bank_questions: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        user_prompt = self._user_prompt(
+            mode, transcript, company_context, projects_context, resume_text, consensus, bank_questions
+        )
+        interview = self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline)
+        if bank_questions and not interview.get("degraded"):
+            interview["bank_questions"] = list(bank_questions)
+        return interview
+
+    def generate_stream(
+        self,
+        mode: str,
+        transcript: str,
+        company_context: str,
+        projects_context: str,
+        resume_text: str,
+        consensus: Dict[str, Any],
+        deadline: Deadline | None = None,
+        bank_questions: List[str] | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield ``meta`` and ``turn`` events as they complete, then one ``mock_interview`` event with the full object."""
+        user_prompt = self._user_prompt(
+            mode, transcript, company_context, projects_context, resume_text, consensus, bank_questions
         )
-        return self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt)
+        parser = TurnStreamParser()
+        for chunk in self.gemini.stream_text(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline):
+            yield from parser.feed(chunk)
+        text = parser.buffer.strip()
+        if not text:
+            interview: Dict[str, Any] = {"raw": "", "error": "Empty response"}
+        else:
+            try:
+                interview = loads(text)
+            except DecodeError:
+                interview = {"raw": text, "error": "Invalid JSON from model"}
+        if bank_questions and not interview.get("degraded"):
+            interview["bank_questions"] = list(bank_questions)
+        yield {"type": "mock_interview", "mock_interview": interview}
@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
 
 
@@ -17,7 +18,10 @@ class InvestorPrep:
         projects_context: str = "",
         resume_text: str = "",
         coding_experience_level: str = "",
+        deadline: Deadline | None = None,
+        generic_questions: List[str] | None = None,
     ) -> Dict[str, Any]:
+        """``generic_questions`` come from the question bank; the model only adds founder-specific ones."""
         user_prompt = (
             "Mode: investor_pitch_prep\n\n"
             f"Coding experience level: {coding_experience_level or 'not provided'}\n\n"
@@ -30,4 +34,17 @@ class InvestorPrep:
             "Resume text (optional):\n"
             f"{resume_text}"
         )
-        return self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt)
+        if generic_questions:
+            numbered = "\n".join(f"{idx}. {question}" for idx, question in enumerate(generic_questions, start=1))
+            user_prompt += (
+                "\n\nStandard investor questions (already selected, do not repeat them):\n"
+                f"{numbered}\n\n"
+                "Put only up to 3 founder-specific questions in realistic_investor_questions. "
+                "Write suggested_strong_answers for the standard questions first, in order, then for yours."
+            )
+        result = self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline)
+        if generic_questions and not result.get("degraded"):
+            specific = [q for q in result.get("realistic_investor_questions") or [] if q not in generic_questions]
+            result["realistic_investor_questions"] = [*generic_questions, *specific]
+            result["bank_questions"] = list(generic_questions)
+        return result
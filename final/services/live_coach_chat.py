@@ -1,6 +1,8 @@
 from pathlib import Path
+from typing import Any, Dict
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
 
 
@@ -18,7 +20,8 @@ class LiveCoachChat:
         company_context: str = "",
         projects_context: str = "",
         resume_text: str = "",
-    ) -> str:
+        deadline: Deadline | None = None,
+    ) -> Dict[str, Any]:
         user_prompt = (
             f"Mode: {mode}\n"
             f"Coding experience level: {coding_experience_level or 'not provided'}\n\n"
@@ -33,5 +36,5 @@ class LiveCoachChat:
             "Resume context:\n"
             f"{resume_text}\n"
         )
-        raw = self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt)
-        return str(raw.get("coach_reply", "")).strip()
+        raw = self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline)
+        return {"coach_reply": str(raw.get("coach_reply", "")).strip(), "degraded": bool(raw.get("degraded"))}
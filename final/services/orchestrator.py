@@ -1,48 +1,144 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 from uuid import uuid4
 
+from config import config
 from services.gemini_client import GeminiClient
+from services.analytics import CohortAnalytics
 from services.board_live_chat import BoardLiveChat
+from services.consensus_index import SimilarityIndex
+from services.context_index import ContextRetriever
+from services.context_store import CONTEXT_FIELDS, ContextStore, UnknownContextHash
+from services.deadline import Deadline
+from services.document_store import DocumentStore
 from services.interview_coach import InterviewCoach
 from services.interview_simulator import InterviewSimulator
 from services.investor_prep import InvestorPrep
 from services.live_coach_chat import LiveCoachChat
 from services.output_writer import OutputWriter
 from services.pitch_builder import PitchBuilder
+from services.question_bank import INTERVIEWER, INVESTOR, QUESTION_SOURCE, QuestionBank, topic_tags
+from services.response_utils import project_fields
 from services.reviewer_agents import ReviewerAgents
+from services.serialization import dumps
+from services.session_index import SessionRegistry, is_finalized
+from services.transcript import Transcript
 
 
 VALID_MODES = {"board_investors", "interview_1on1", "investor_pitch_prep"}
+# Finalize stages per mode, in execution order; unfinished ones are reported as pending.
+MODE_STAGES = {
+    "board_investors": ("deck", "reviewers", "mock_interview"),
+    "interview_1on1": ("interview_coach", "mock_interview"),
+    "investor_pitch_prep": ("investor_prep", "mock_interview"),
+}
+# Retrieval queries used to pick company/projects chunks for each finalize stage.
+STAGE_QUERIES = {
+    "deck": "problem customer solution product market competition business model pricing traction team roadmap ask",
+    "interview_coach": "role responsibilities projects experience skills technologies architecture impact results team",
+    "investor_prep": "traction revenue growth customers market size competition funding round use of funds risks unit economics",
+    "mock_interview": "customers traction product technical risks go-to-market pricing team",
+}
 
 
-@dataclass
+def _is_degraded(value: Any) -> bool:
+    """True if a stage output, or any reviewer response nested in it, came from the local fallback."""
+    if not isinstance(value, dict):
+        return False
+    return bool(value.get("degraded")) or any(_is_degraded(item) for item in value.values())
+
+
+def _combine_consensus(by_mode: Dict[str, Dict[str, Any]], modes: List[str], max_items: int = 8) -> Dict[str, Any]:
+    """One consensus for a multi-mode finalize: lists are merged without duplicates, scalars come from the first mode that has them."""
+    combined: Dict[str, Any] = {}
+    for mode in modes:
+        for key, value in (by_mode.get(mode) or {}).items():
+            if isinstance(value, list):
+                items = combined.setdefault(key, [])
+                for item in value:
+                    if item not in items and len(items) < max_items:
+                        items.append(item)
+            elif value and key not in combined:
+                combined[key] = value
+    return combined
+
+
+@dataclass(slots=True)
 class Session:
     session_id: str
     mode: str
     submode: str = ""
-    messages: List[str] = field(default_factory=list)
+    transcript: Transcript = field(default_factory=Transcript)
     resume_text: str = ""
+    resume_doc_id: str = ""
     company_context: str = ""
     projects_context: str = ""
     coding_experience_level: str = ""
     phone_number: str = ""
     selected_boss: str = "boss_1"
     final_payload: Dict[str, Any] = field(default_factory=dict)
+    # Payload field name (resume_text, company_context, projects_text) -> content hash of the current value.
+    context_hashes: Dict[str, str] = field(default_factory=dict)
+    # Client message id -> reply (None until generated), so a replayed message is neither re-appended nor re-answered.
+    delivered: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    # Bumped on every change so result() can reuse its last response.
+    version: int = 0
+    result_cache: Tuple[int, Dict[str, Any]] | None = field(default=None, repr=False, compare=False)
+    # (version, {(fields, pretty): bytes}) for a complete final payload; see Orchestrator.encoded_final.
+    encoded_cache: Tuple[int, Dict[Tuple[Tuple[str, ...], bool], bytes]] | None = field(default=None, repr=False, compare=False)
+    # Set by the session registry so its finalized index follows payload changes.
+    listener: Callable[["Session"], None] | None = field(default=None, repr=False, compare=False)
+    # Request threads and background stages both call touch(); the increment is not atomic on its own.
+    version_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def touch(self) -> None:
+        with self.version_lock:
+            self.version += 1
+        if self.listener is not None:
+            self.listener(self)
 
 
 class Orchestrator:
-    def __init__(self) -> None:
-        self.sessions: Dict[str, Session] = {}
+    def __init__(self, persist_outputs: bool = True) -> None:
+        self.sessions = SessionRegistry()
         self.gemini = GeminiClient()
-        self.board_live_chat = BoardLiveChat(self.gemini)
+        self.reviewers = ReviewerAgents(self.gemini)
+        # Live chat answers as the same panel that reviews at finalize.
+        self.board_live_chat = BoardLiveChat(self.gemini, self.reviewers.panel)
         self.live_coach_chat = LiveCoachChat(self.gemini)
         self.pitch_builder = PitchBuilder(self.gemini)
-        self.reviewers = ReviewerAgents(self.gemini)
+        self.similarity_index = SimilarityIndex(threshold=config.consensus_similarity_threshold)
         self.interview_coach = InterviewCoach(self.gemini)
         self.interview_simulator = InterviewSimulator(self.gemini)
         self.investor_prep = InvestorPrep(self.gemini)
-        self.writer = OutputWriter()
+        self.writer = OutputWriter(persist=persist_outputs)
+        self.documents = DocumentStore()
+        self.contexts = ContextStore(max_items=config.context_store_max_items)
+        self.retriever = ContextRetriever(
+            token_budget=config.context_token_budget,
+            chunk_tokens=config.context_chunk_tokens,
+            max_indexes=config.context_store_max_items,
+        )
+        self.analytics = CohortAnalytics(
+            capacity=config.analytics_topk_capacity,
+            max_sessions=config.analytics_replace_max_sessions,
+            session_ttl_seconds=config.analytics_replace_window_seconds,
+        )
+        self._background = ThreadPoolExecutor(max_workers=config.finalize_workers, thread_name_prefix="finalize")
+        self.question_bank = QuestionBank(
+            config.question_bank_path or str(Path(config.outputs_dir) / "question_bank.sqlite3"),
+            min_seen=config.question_bank_min_seen,
+        )
+        if self.question_bank.is_empty() and self.writer.store is not None:
+            self._background.submit(self.question_bank.rebuild_from_store, self.writer.store)
+        self._payload_lock = threading.Lock()
+        self.chat_pool = ThreadPoolExecutor(max_workers=config.chat_workers, thread_name_prefix="chat")
 
     def start_session(
         self,
@@ -53,57 +149,86 @@ class Orchestrator:
         company_context: str = "",
         projects_context: str = "",
         coding_experience_level: str = "",
+        resume_doc_id: str = "",
+        context_hashes: Dict[str, str] | None = None,
     ) -> Session:
         if mode not in VALID_MODES:
             raise ValueError(f"Invalid mode: {mode}")
+        if resume_doc_id and not self.documents.exists(resume_doc_id):
+            raise ValueError(f"Unknown resume_doc_id: {resume_doc_id}")
         sid = str(uuid4())
         session = Session(
             session_id=sid,
             mode=mode,
             submode=submode,
             phone_number=phone_number,
-            resume_text=resume_text,
-            company_context=company_context,
-            projects_context=projects_context,
+            resume_doc_id=resume_doc_id,
             coding_experience_level=coding_experience_level,
+            # The configured panel may not use the default ids.
+            selected_boss=self.reviewers.boss_ids[0],
+        )
+        context = self._resolve_context(
+            session,
+            {"resume_text": resume_text, "company_context": company_context, "projects_text": projects_context},
+            context_hashes or {},
         )
+        self._apply_context(session, context)
         self.sessions[sid] = session
         return session
 
-    def respond_to_message(self, session_id: str, message: str) -> Dict[str, object]:
+    def delivered_reply(self, session_id: str, message_id: str) -> Dict[str, object] | None:
+        """The reply already generated for ``message_id``, if the client is replaying it."""
+        if session_id not in self.sessions:
+            raise KeyError("Session not found")
+        return self.sessions[session_id].delivered.get(message_id) if message_id else None
+
+    def respond_to_message(
+        self, session_id: str, message: str, deadline: Deadline | None = None, message_id: str = ""
+    ) -> Dict[str, object]:
         if session_id not in self.sessions:
             raise KeyError("Session not found")
         session = self.sessions[session_id]
-        transcript = "\n".join(session.messages)
+        transcript = session.transcript.text
+        resume_text = self._resume_text(session)
+        company_context, projects_context = self._focused_context(session, message)
 
         if session.mode == "board_investors":
             boss_responses = self.board_live_chat.respond(
                 latest_message=message,
                 transcript=transcript,
                 coding_experience_level=session.coding_experience_level,
-                company_context=session.company_context,
-                projects_context=session.projects_context,
-                resume_text=session.resume_text,
+                company_context=company_context,
+                projects_context=projects_context,
+                resume_text=resume_text,
+                deadline=deadline,
             )
             responses = [
-                {"boss_id": "boss_1", "label": "Panel 1", "message": boss_responses.get("boss_1", "")},
-                {"boss_id": "boss_2", "label": "Panel 2", "message": boss_responses.get("boss_2", "")},
-                {"boss_id": "boss_3", "label": "Panel 3", "message": boss_responses.get("boss_3", "")},
+                {"boss_id": spec.boss_id, "label": spec.label, "message": boss_responses.get(spec.boss_id, "")}
+                for spec in self.reviewers.panel
             ]
+            degraded = boss_responses["degraded"]
         else:
-            coach_reply = self.live_coach_chat.respond(
+            coach = self.live_coach_chat.respond(
                 mode=session.mode,
                 latest_message=message,
                 transcript=transcript,
                 coding_experience_level=session.coding_experience_level,
-                company_context=session.company_context,
-                projects_context=session.projects_context,
-                resume_text=session.resume_text,
+                company_context=company_context,
+                projects_context=projects_context,
+                resume_text=resume_text,
+                deadline=deadline,
             )
             label = "Interview Coach" if session.mode == "interview_1on1" else "Pitch Coach"
-            responses = [{"boss_id": "coach", "label": label, "message": coach_reply}]
+            responses = [{"boss_id": "coach", "label": label, "message": coach["coach_reply"]}]
+            degraded = coach["degraded"]
 
-        return {"session_id": session_id, "mode": session.mode, "responses": responses}
+        result: Dict[str, object] = {"session_id": session_id, "mode": session.mode, "responses": responses}
+        if degraded:
+            result["degraded"] = True
+        elif message_id in session.delivered:
+            # Degraded replies are not kept, so a replay after recovery gets a real answer.
+            session.delivered[message_id] = result
+        return result
 
     def add_message(
         self,
@@ -113,81 +238,552 @@ class Orchestrator:
         company_context: str = "",
         projects_context: str = "",
         coding_experience_level: str = "",
+        resume_doc_id: str = "",
+        context_hashes: Dict[str, str] | None = None,
+        message_id: str = "",
     ) -> Session:
         if session_id not in self.sessions:
             raise KeyError("Session not found")
+        if resume_doc_id and not self.documents.exists(resume_doc_id):
+            raise ValueError(f"Unknown resume_doc_id: {resume_doc_id}")
         session = self.sessions[session_id]
-        if message:
-            session.messages.append(message)
-        if resume_text:
-            session.resume_text = resume_text
-        if company_context:
-            session.company_context = company_context
-        if projects_context:
-            session.projects_context = projects_context
+        # Resolve hashes before mutating anything so a 409 retry does not append the message twice.
+        context = self._resolve_context(
+            session,
+            {"resume_text": resume_text, "company_context": company_context, "projects_text": projects_context},
+            context_hashes or {},
+        )
+        if message and message_id not in session.delivered:
+            session.transcript.append(message)
+            if message_id:
+                session.delivered[message_id] = None
+                while len(session.delivered) > config.chat_replay_window:
+                    session.delivered.pop(next(iter(session.delivered)))
+        if resume_doc_id:
+            session.resume_doc_id = resume_doc_id
+            session.resume_text = ""
+            session.context_hashes.pop("resume_text", None)
+            context.pop("resume_text", None)
+        elif context.get("resume_text"):
+            session.resume_doc_id = ""
+        self._apply_context(session, context)
         if coding_experience_level:
             session.coding_experience_level = coding_experience_level
+        session.touch()
         return session
 
+    def _resolve_context(self, session: Session, bodies: Dict[str, str], hashes: Dict[str, str]) -> Dict[str, str]:
+        """Return the context fields that change, as ``{payload_field: text}``.
+
+        A field sent with its body always wins. A field sent only as a hash is a
+        no-op when it matches the session's current version, otherwise it is
+        looked up in the shared context store.
+        """
+        changed: Dict[str, str] = {}
+        missing = []
+        for name in CONTEXT_FIELDS:
+            body = bodies.get(name, "")
+            digest = hashes.get(name, "")
+            if body:
+                changed[name] = body
+            elif digest and digest != session.context_hashes.get(name):
+                try:
+                    changed[name] = self.contexts.get(digest)
+                except KeyError:
+                    missing.append(name)
+        if missing:
+            raise UnknownContextHash(missing)
+        return changed
+
+    def _apply_context(self, session: Session, context: Dict[str, str]) -> None:
+        for name, text in context.items():
+            digest, canonical = self.contexts.intern(text)
+            if session.context_hashes.get(name) == digest:
+                continue
+            setattr(session, CONTEXT_FIELDS[name], canonical)
+            session.context_hashes[name] = digest
+
+    def _focused_context(self, session: Session, query: str) -> Tuple[str, str]:
+        """Company and projects context trimmed to the chunks most relevant to ``query``."""
+        company = self.retriever.select(
+            session.company_context, query, session.context_hashes.get("company_context", "")
+        )
+        projects = self.retriever.select(
+            session.projects_context, query, session.context_hashes.get("projects_text", "")
+        )
+        return company, projects
+
+    def _stage_query(self, session: Session, stage: str) -> str:
+        recent = list(session.transcript)[-3:]
+        return " ".join([STAGE_QUERIES[stage], session.submode, *recent])
+
+    def _resume_text(self, session: Session) -> str:
+        if session.resume_doc_id:
+            return self.documents.get_text(session.resume_doc_id)
+        return session.resume_text
+
     def select_boss(self, session_id: str, boss_id: str) -> Session:
         if session_id not in self.sessions:
             raise KeyError("Session not found")
-        if boss_id not in {"boss_1", "boss_2", "boss_3"}:
-            raise ValueError("boss_id must be one of: boss_1, boss_2, boss_3")
+        if boss_id not in self.reviewers.boss_ids:
+            raise ValueError(f"boss_id must be one of: {', '.join(self.reviewers.boss_ids)}")
         session = self.sessions[session_id]
         session.selected_boss = boss_id
+        payload = session.final_payload
+        if payload.get("reviewers") and payload.get("selected_boss") != boss_id:
+            self._rebase_consensus(session, payload)
+        session.touch()
         return session
 
-    def finalize(self, session_id: str) -> Dict[str, Any]:
+    def finalize(
+        self, session_id: str, budget_seconds: float | None = None, modes: List[str] | None = None
+    ) -> Dict[str, Any]:
+        """Run the finalize pipeline, answering within ``budget_seconds``.
+
+        Stages that have not finished by then are listed in ``pending`` and keep
+        running in the background; they fill into ``session.final_payload`` so a
+        later ``result`` call sees them. ``modes`` asks for several mode reports
+        from this one session (see ``_run_combined_stages``).
+        """
         if session_id not in self.sessions:
             raise KeyError("Session not found")
 
         session = self.sessions[session_id]
-        transcript = "\n".join(session.messages)
+        budget = config.finalize_budget_seconds if budget_seconds is None else budget_seconds
+        deadline = Deadline(budget, config.finalize_abandon_seconds)
+        payload = self._begin_final_payload(session, modes=modes)
+        future = self._background.submit(self._finalize_pipeline, session, payload, deadline)
+        try:
+            future.result(timeout=deadline.respond_remaining())
+        except FutureTimeout:
+            return self._payload_snapshot(payload)
+        return payload
 
-        if session.mode == "board_investors":
+    def finalize_blocking(
+        self, session_id: str, deadline: Deadline | None = None, modes: List[str] | None = None
+    ) -> Dict[str, Any]:
+        """Run the whole finalize pipeline in the calling thread (used by batch runs)."""
+        if session_id not in self.sessions:
+            raise KeyError("Session not found")
+        session = self.sessions[session_id]
+        payload = self._begin_final_payload(session, modes=modes)
+        return self._finalize_pipeline(session, payload, deadline or Deadline(config.finalize_abandon_seconds))
+
+    def finalize_stream(self, session_id: str, modes: List[str] | None = None) -> Iterator[Dict[str, Any]]:
+        """Same pipeline as ``finalize``, yielding progress events and mock interview turns as they arrive."""
+        if session_id not in self.sessions:
+            raise KeyError("Session not found")
+
+        session = self.sessions[session_id]
+        deadline = Deadline(config.finalize_abandon_seconds)
+        transcript = session.transcript.text
+        resume_text = self._resume_text(session)
+        payload = self._begin_final_payload(session, modes=modes)
+        yield {"type": "stage", "stage": "analysis", "status": "running"}
+        self._run_stages(session, payload, transcript, resume_text, deadline)
+        yield {"type": "stage", "stage": "analysis", "status": "done"}
+        yield {"type": "stage", "stage": "mock_interview", "status": "running"}
+        company_context, projects_context = self._focused_context(session, self._stage_query(session, "mock_interview"))
+
+        consensus = payload.get("consensus", {})
+        interview_simulation: Dict[str, Any] = {}
+        for event in self.interview_simulator.generate_stream(
+            mode=self._simulator_mode(session, payload),
+            transcript=transcript,
+            company_context=company_context,
+            projects_context=projects_context,
+            resume_text=resume_text,
+            consensus=consensus,
+            deadline=deadline,
+            bank_questions=self._bank_questions(session, INTERVIEWER, consensus),
+        ):
+            if event["type"] == "mock_interview":
+                interview_simulation = event["mock_interview"]
+            else:
+                yield event
+        self._attach_mock_interview(session, payload, interview_simulation, consensus)
+        if payload.get("degraded"):
+            self._schedule_upgrade(session, payload)
+        yield {"type": "result", "payload": payload}
+
+    def _finalize_pipeline(self, session: Session, payload: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+        try:
+            transcript = session.transcript.text
+            resume_text = self._resume_text(session)
+            self._run_stages(session, payload, transcript, resume_text, deadline)
+            consensus = payload.get("consensus", {})
+            interview_simulation = self._generate_mock_interview(
+                session, transcript, resume_text, consensus, deadline, self._simulator_mode(session, payload)
+            )
+            self._attach_mock_interview(session, payload, interview_simulation, consensus)
+            if payload.get("degraded"):
+                self._schedule_upgrade(session, payload)
+            return payload
+        except Exception as exc:
+            with self._payload_lock:
+                payload["status"] = "failed"
+                payload["error"] = str(exc)
+            session.touch()
+            raise
+
+    def _begin_final_payload(
+        self, session: Session, attach: bool = True, modes: List[str] | None = None
+    ) -> Dict[str, Any]:
+        modes = list(dict.fromkeys(modes or [session.mode]))
+        unknown = [mode for mode in modes if mode not in VALID_MODES]
+        if unknown:
+            raise ValueError(f"Invalid mode: {', '.join(unknown)}")
+        payload: Dict[str, Any] = {"mode": session.mode, "submode": session.submode}
+        if modes != [session.mode]:
+            payload["modes"] = modes
+            payload["consensus_by_mode"] = {}
+        if "board_investors" in modes:
+            payload["selected_boss"] = session.selected_boss
+        # Large context blobs are referenced by content hash; result() carries the text once.
+        payload["context_refs"] = {
+            name: session.context_hashes[name]
+            for name in ("company_context", "projects_text")
+            if name in session.context_hashes
+        }
+        if any(mode != "board_investors" for mode in modes):
+            payload["coding_experience_level"] = session.coding_experience_level
+        payload["status"] = "running"
+        # Every mode ends with the mock interview; a combined finalize runs it once, last.
+        payload["pending"] = list(dict.fromkeys(stage for mode in modes for stage in MODE_STAGES[mode] if stage != "mock_interview"))
+        payload["pending"].append("mock_interview")
+        payload["files"] = {}
+        if attach:
+            session.final_payload = payload
+            session.touch()
+        return payload
+
+    def _publish_stage(self, session: Session, payload: Dict[str, Any], stage: str, files: Dict[str, str], **parts: Any) -> None:
+        with self._payload_lock:
+            payload.update(parts)
+            payload["files"].update(files)
+            if any(_is_degraded(value) for value in parts.values()):
+                payload.setdefault("degraded", []).append(stage)
+            if stage in payload["pending"]:
+                payload["pending"].remove(stage)
+            if not payload["pending"]:
+                payload["status"] = "complete"
+            session.touch()
+
+    def _payload_snapshot(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._payload_lock:
+            snapshot = dict(payload)
+            snapshot["pending"] = list(payload["pending"])
+            snapshot["files"] = dict(payload["files"])
+        return snapshot
+
+    def _generate_mock_interview(
+        self,
+        session: Session,
+        transcript: str,
+        resume_text: str,
+        consensus: Dict[str, Any],
+        deadline: Deadline | None = None,
+        mode: str = "",
+    ) -> Dict[str, Any]:
+        company_context, projects_context = self._focused_context(session, self._stage_query(session, "mock_interview"))
+        return self.interview_simulator.generate(
+            mode=mode or session.mode,
+            transcript=transcript,
+            company_context=company_context,
+            projects_context=projects_context,
+            resume_text=resume_text,
+            consensus=consensus,
+            deadline=deadline,
+            bank_questions=self._bank_questions(session, INTERVIEWER, consensus),
+        )
+
+    def _simulator_mode(self, session: Session, payload: Dict[str, Any]) -> str:
+        # A combined finalize runs one interview covering every requested mode.
+        return "+".join(payload["modes"]) if payload.get("modes") else session.mode
+
+    def _bank_questions(self, session: Session, kind: str, focus: Any, mode: str = "") -> List[str]:
+        """Recurring questions for this mode, preferring topics that show up in ``focus`` (transcript or consensus)."""
+        if config.question_bank_generic_count <= 0:
+            return []
+        if isinstance(focus, dict):
+            focus = " ".join(str(item) for item in focus.get("top_gaps", []) or [])
+        return self.question_bank.generic(
+            kind, mode or session.mode, session.submode, topic_tags(focus), limit=config.question_bank_generic_count
+        )
+
+    def _observe_final(self, session: Session, payload: Dict[str, Any]) -> None:
+        self.analytics.observe(session.mode, payload, session.session_id)
+        # The session's own text, so questions echoing it are not banked as generic.
+        context = "\n".join((session.transcript.text, session.company_context, session.projects_context, self._resume_text(session)))
+        if payload.get("modes"):
+            # A combined interview mixes modes, so only investor questions are banked, under their own mode.
+            if not payload.get("investor_prep"):
+                return
+            mode, submode, payload = "investor_pitch_prep", "", {"investor_prep": payload["investor_prep"]}
+        else:
+            mode, submode = session.mode, session.submode
+        banked = self.question_bank.observe(mode, submode, payload, session.session_id, context)
+        if banked:
+            # What was banked, so a rebuilt bank matches this one without the session's text.
+            self.writer.write_json(
+                QUESTION_SOURCE, {"mode": mode, "submode": submode, "questions": banked}, session.session_id, mode
+            )
+
+    def _attach_mock_interview(
+        self,
+        session: Session,
+        payload: Dict[str, Any],
+        interview_simulation: Dict[str, Any],
+        consensus: Dict[str, Any],
+        observe: bool = True,
+    ) -> Dict[str, Any]:
+        if consensus is not payload.get("consensus"):
+            # The panel was switched while this interview was generating; don't publish it for the new one.
+            self._mark_mock_interview_stale(session, payload)
+            return payload
+        interview_key = self.writer.write_json("mock_interview", interview_simulation, session.session_id, session.mode)
+        self._publish_stage(session, payload, "mock_interview", {"mock_interview": interview_key}, mock_interview=interview_simulation)
+        if observe and not payload.get("degraded"):
+            self._observe_final(session, payload)
+        return payload
+
+    def _mark_mock_interview_stale(self, session: Session, payload: Dict[str, Any]) -> None:
+        with self._payload_lock:
+            payload.pop("mock_interview", None)
+            payload["files"].pop("mock_interview", None)
+            payload["stale"] = ["mock_interview"]
+            if "mock_interview" in payload["pending"]:
+                payload["pending"].remove("mock_interview")
+            if not payload["pending"]:
+                payload["status"] = "complete"
+            session.touch()
+
+    def _rebase_consensus(self, session: Session, payload: Dict[str, Any]) -> None:
+        """Re-merge the stored reviewer outputs for the newly selected panel without calling the model.
+
+        A finished mock interview was built from the old consensus, so it is
+        dropped and marked stale; ``refresh_stale`` regenerates it on demand.
+        """
+        consensus = self._merge_reviewer_consensus(payload["reviewers"], payload["deck"], session.selected_boss)
+        if payload.get("modes"):
+            # Combined finalize: swap in the board's part and re-combine with the other modes' consensus.
+            board_key = self.writer.write_talking_points("board_investors", consensus, session.session_id)
+            with self._payload_lock:
+                by_mode = {**payload["consensus_by_mode"], "board_investors": consensus}
+            combined = _combine_consensus(by_mode, payload["modes"])
+            talking_key = self.writer.write_talking_points(self._simulator_mode(session, payload), combined, session.session_id)
+            with self._payload_lock:
+                payload["selected_boss"] = session.selected_boss
+                payload["consensus_by_mode"] = by_mode
+                payload["consensus"] = combined
+                payload["files"]["talking_points_board_investors"] = board_key
+                payload["files"]["talking_points"] = talking_key
+                in_flight = "mock_interview" in payload["pending"]
+            if not in_flight:
+                self._mark_mock_interview_stale(session, payload)
+            return
+        talking_key = self.writer.write_talking_points(session.mode, consensus, session.session_id)
+        with self._payload_lock:
+            payload["selected_boss"] = session.selected_boss
+            payload["consensus"] = consensus
+            payload["files"]["talking_points"] = talking_key
+            in_flight = "mock_interview" in payload["pending"]
+        if not in_flight:
+            self._mark_mock_interview_stale(session, payload)
+
+    def refresh_stale(self, session_id: str, budget_seconds: float | None = None) -> Dict[str, Any]:
+        """Regenerate a stale mock interview, answering within ``budget_seconds`` like ``finalize``."""
+        if session_id not in self.sessions:
+            raise KeyError("Session not found")
+        session = self.sessions[session_id]
+        payload = session.final_payload
+        with self._payload_lock:
+            if "mock_interview" not in payload.get("stale", []):
+                return payload
+            payload.pop("stale")
+            payload["pending"].append("mock_interview")
+            payload["status"] = "running"
+            session.touch()
+        budget = config.finalize_budget_seconds if budget_seconds is None else budget_seconds
+        deadline = Deadline(budget, config.finalize_abandon_seconds)
+        future = self._background.submit(self._regenerate_mock_interview, session, payload, deadline)
+        try:
+            future.result(timeout=deadline.respond_remaining())
+        except FutureTimeout:
+            return self._payload_snapshot(payload)
+        return payload
+
+    def _regenerate_mock_interview(self, session: Session, payload: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+        consensus = payload.get("consensus", {})
+        try:
+            interview_simulation = self._generate_mock_interview(
+                session,
+                session.transcript.text,
+                self._resume_text(session),
+                consensus,
+                deadline,
+                self._simulator_mode(session, payload),
+            )
+        except Exception:
+            self._mark_mock_interview_stale(session, payload)
+            raise
+        self._attach_mock_interview(session, payload, interview_simulation, consensus, observe=False)
+        if payload.get("degraded"):
+            self._schedule_upgrade(session, payload)
+        return payload
+
+    def _schedule_upgrade(self, session: Session, payload: Dict[str, Any], attempt: int = 0) -> None:
+        """Retry a degraded finalize against the provider later, with exponential spacing."""
+        if attempt >= config.degraded_upgrade_attempts:
+            return
+        delay = config.degraded_upgrade_interval_seconds * (2 ** attempt)
+        timer = threading.Timer(delay, self._background.submit, args=(self._upgrade_degraded, session, payload, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _upgrade_degraded(self, session: Session, payload: Dict[str, Any], attempt: int) -> None:
+        if session.final_payload is not payload:
+            return
+        deadline = Deadline(config.finalize_abandon_seconds)
+        transcript = session.transcript.text
+        resume_text = self._resume_text(session)
+        fresh = self._begin_final_payload(session, attach=False, modes=payload.get("modes"))
+        try:
+            self._run_stages(session, fresh, transcript, resume_text, deadline)
+            if not fresh.get("degraded"):
+                consensus = fresh.get("consensus", {})
+                interview_simulation = self._generate_mock_interview(
+                    session, transcript, resume_text, consensus, deadline, self._simulator_mode(session, fresh)
+                )
+                self._attach_mock_interview(session, fresh, interview_simulation, consensus, observe=False)
+        except Exception:
+            fresh["degraded"] = ["error"]
+        if fresh.get("degraded"):
+            # The provider is still failing; the local fallback answered again.
+            self._schedule_upgrade(session, payload, attempt + 1)
+            return
+        with self._payload_lock:
+            if session.final_payload is not payload:
+                return
+            session.final_payload = fresh
+        if session.mode == "board_investors" and fresh.get("selected_boss") != session.selected_boss:
+            self._rebase_consensus(session, fresh)
+        self._observe_final(session, fresh)
+        session.touch()
+
+    def _run_stages(
+        self,
+        session: Session,
+        payload: Dict[str, Any],
+        transcript: str,
+        resume_text: str,
+        deadline: Deadline | None = None,
+    ) -> None:
+        if payload.get("modes"):
+            self._run_combined_stages(session, payload, transcript, resume_text, deadline)
+        else:
+            self._run_mode_stages(session, payload, transcript, resume_text, deadline)
+
+    def _run_combined_stages(
+        self,
+        session: Session,
+        payload: Dict[str, Any],
+        transcript: str,
+        resume_text: str,
+        deadline: Deadline | None = None,
+    ) -> None:
+        """Several mode reports from one session.
+
+        Transcript, resume and the retrieval index are built once and shared;
+        each mode's stages run in their own thread. Stage outputs land at the
+        top level as in a single-mode payload (their keys don't overlap), each
+        mode's consensus goes to ``consensus_by_mode``, and ``consensus`` is
+        the combination that feeds the single mock interview.
+        """
+        modes = payload["modes"]
+
+        def publisher(mode: str) -> Callable[..., None]:
+            def publish(stage: str, files: Dict[str, str], consensus: Dict[str, Any] | None = None, **parts: Any) -> None:
+                files = {(f"{name}_{mode}" if name == "talking_points" else name): path for name, path in files.items()}
+                if consensus is not None:
+                    with self._payload_lock:
+                        payload["consensus_by_mode"][mode] = consensus
+                self._publish_stage(session, payload, stage, files, **parts)
+
+            return publish
+
+        with ThreadPoolExecutor(max_workers=len(modes), thread_name_prefix="mode") as pool:
+            futures = [
+                pool.submit(self._run_mode_stages, session, payload, transcript, resume_text, deadline, mode, publisher(mode))
+                for mode in modes
+            ]
+            for future in futures:
+                future.result()
+        with self._payload_lock:
+            by_mode = dict(payload["consensus_by_mode"])
+        consensus = _combine_consensus(by_mode, modes)
+        talking_key = self.writer.write_talking_points(self._simulator_mode(session, payload), consensus, session.session_id)
+        with self._payload_lock:
+            payload["consensus"] = consensus
+            payload["files"]["talking_points"] = talking_key
+            session.touch()
+
+    def _run_mode_stages(
+        self,
+        session: Session,
+        payload: Dict[str, Any],
+        transcript: str,
+        resume_text: str,
+        deadline: Deadline | None = None,
+        mode: str = "",
+        publish: Callable[..., None] | None = None,
+    ) -> None:
+        mode = mode or session.mode
+        if publish is None:
+
+            def publish(stage: str, files: Dict[str, str], **parts: Any) -> None:
+                self._publish_stage(session, payload, stage, files, **parts)
+
+        if mode == "board_investors":
+            company_context, projects_context = self._focused_context(session, self._stage_query(session, "deck"))
             deck = self.pitch_builder.build(
                 transcript,
-                session.resume_text,
-                session.company_context,
-                session.projects_context,
+                resume_text,
+                company_context,
+                projects_context,
+                deadline=deadline,
             )
+            deck_key = self.writer.write_json("deck_outline", deck, session.session_id, mode)
+            publish("deck", {"deck_outline": deck_key}, deck=deck)
+
             reviewers = self.reviewers.run(
                 deck,
                 transcript,
-                session.resume_text,
+                resume_text,
                 session.company_context,
                 session.projects_context,
+                deadline=deadline,
+                context_for=lambda focus: self._focused_context(session, f"{focus} {session.submode}"),
             )
             consensus = self._merge_reviewer_consensus(reviewers, deck, session.selected_boss)
-
-            deck_path = self.writer.write_json("deck_outline", deck)
-            reviewers_path = self.writer.write_json("reviewer_board_report", {"reviewers": reviewers, "consensus": consensus})
-            talking_path = self.writer.write_talking_points(session.mode, consensus)
-
-            payload = {
-                "mode": session.mode,
-                "submode": session.submode,
-                "selected_boss": session.selected_boss,
-                "company_context": session.company_context,
-                "projects_context": session.projects_context,
-                "deck": deck,
-                "reviewers": reviewers,
-                "consensus": consensus,
-                "files": {
-                    "deck_outline": deck_path,
-                    "reviewer_board_report": reviewers_path,
-                    "talking_points": talking_path,
-                },
-            }
-        elif session.mode == "interview_1on1":
+            reviewers_key = self.writer.write_json("reviewer_board_report", {"reviewers": reviewers, "consensus": consensus}, session.session_id, mode)
+            talking_key = self.writer.write_talking_points(mode, consensus, session.session_id)
+            publish(
+                "reviewers",
+                {"reviewer_board_report": reviewers_key, "talking_points": talking_key},
+                reviewers=reviewers,
+                consensus=consensus,
+            )
+        elif mode == "interview_1on1":
+            company_context, projects_context = self._focused_context(session, self._stage_query(session, "interview_coach"))
             coach = self.interview_coach.coach(
                 transcript,
-                session.resume_text,
+                resume_text,
                 session.submode,
-                session.company_context,
-                session.projects_context,
+                company_context,
+                projects_context,
                 session.coding_experience_level,
+                deadline=deadline,
             )
             consensus = {
                 "top_strengths": coach.get("top_strengths", []),
@@ -199,29 +795,24 @@ class Orchestrator:
                 "customer_requested_changes": coach.get("customer_requested_changes", []),
                 "website_change_recommendations": coach.get("website_change_recommendations", []),
             }
-            coach_path = self.writer.write_json("interview_coach_report", coach)
-            talking_path = self.writer.write_talking_points(session.mode, consensus)
-
-            payload = {
-                "mode": session.mode,
-                "submode": session.submode,
-                "company_context": session.company_context,
-                "projects_context": session.projects_context,
-                "coding_experience_level": session.coding_experience_level,
-                "interview_coach": coach,
-                "consensus": consensus,
-                "files": {
-                    "interview_report": coach_path,
-                    "talking_points": talking_path,
-                },
-            }
+            coach_key = self.writer.write_json("interview_coach_report", coach, session.session_id, mode)
+            talking_key = self.writer.write_talking_points(mode, consensus, session.session_id)
+            publish(
+                "interview_coach",
+                {"interview_report": coach_key, "talking_points": talking_key},
+                interview_coach=coach,
+                consensus=consensus,
+            )
         else:
+            company_context, projects_context = self._focused_context(session, self._stage_query(session, "investor_prep"))
             investor_prep = self.investor_prep.prepare(
                 transcript,
-                session.company_context,
-                session.projects_context,
-                session.resume_text,
+                company_context,
+                projects_context,
+                resume_text,
                 session.coding_experience_level,
+                deadline=deadline,
+                generic_questions=self._bank_questions(session, INVESTOR, transcript, mode),
             )
             consensus = {
                 "top_strengths": investor_prep.get("top_strengths", []),
@@ -234,42 +825,26 @@ class Orchestrator:
                 "diligence_red_flags": investor_prep.get("diligence_red_flags", []),
                 "funding_use_plan": investor_prep.get("funding_use_plan", []),
             }
-            prep_path = self.writer.write_json("investor_prep_report", investor_prep)
-            talking_path = self.writer.write_talking_points(session.mode, consensus)
-            payload = {
-                "mode": session.mode,
-                "submode": session.submode,
-                "company_context": session.company_context,
-                "projects_context": session.projects_context,
-                "coding_experience_level": session.coding_experience_level,
-                "investor_prep": investor_prep,
-                "consensus": consensus,
-                "files": {
-                    "investor_prep_report": prep_path,
-                    "talking_points": talking_path,
-                },
-            }
-
-        interview_simulation = self.interview_simulator.generate(
-            mode=session.mode,
-            transcript=transcript,
-            company_context=session.company_context,
-            projects_context=session.projects_context,
-            resume_text=session.resume_text,
-            consensus=payload.get("consensus", {}),
-        )
-        interview_path = self.writer.write_json("mock_interview", interview_simulation)
-        payload["mock_interview"] = interview_simulation
-        payload.setdefault("files", {})["mock_interview"] = interview_path
-
-        session.final_payload = payload
-        return payload
+            prep_key = self.writer.write_json("investor_prep_report", investor_prep, session.session_id, mode)
+            talking_key = self.writer.write_talking_points(mode, consensus, session.session_id)
+            publish(
+                "investor_prep",
+                {"investor_prep_report": prep_key, "talking_points": talking_key},
+                investor_prep=investor_prep,
+                consensus=consensus,
+            )
 
     def result(self, session_id: str) -> Dict[str, Any]:
         if session_id not in self.sessions:
             raise KeyError("Session not found")
         session = self.sessions[session_id]
-        return {
+        # Read once, before the snapshot: a stage published meanwhile bumps the version past this one,
+        # so the cached entry is rebuilt instead of serving a stale payload under the new version.
+        version = session.version
+        cached = session.result_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        data = {
             "session_id": session.session_id,
             "mode": session.mode,
             "submode": session.submode,
@@ -277,25 +852,92 @@ class Orchestrator:
             "company_context": session.company_context,
             "projects_context": session.projects_context,
             "coding_experience_level": session.coding_experience_level,
-            "messages_count": len(session.messages),
+            "messages_count": len(session.transcript),
+            "version": version,
             "has_final": bool(session.final_payload),
-            "final": session.final_payload,
+            "final": self._payload_snapshot(session.final_payload) if session.final_payload else {},
+        }
+        session.result_cache = (version, data)
+        return data
+
+    def encoded_final(self, data: Dict[str, Any], fields: List[str] | None = None, pretty: bool = False) -> bytes:
+        """JSON bytes of ``data["final"]`` for a ``result()`` response, projected to ``fields``.
+
+        Taking the caller's ``result()`` keeps the bytes on the same version as
+        any ETag or version field sent with them. A complete payload only
+        changes through ``touch()``, so its bytes are kept for that version and
+        shared by the result, finalize and result page responses. Payloads
+        still filling in are encoded each time.
+        """
+        session = self.sessions[data["session_id"]]
+        key = (tuple(fields or ()), pretty)
+        cached = session.encoded_cache
+        if cached is not None and cached[0] == data["version"] and key in cached[1]:
+            return cached[1][key]
+        encoded = dumps(project_fields(data["final"], key[0]), pretty=pretty)
+        if data["final"].get("status") == "complete":
+            if cached is None or cached[0] != data["version"]:
+                cached = (data["version"], {})
+                session.encoded_cache = cached
+            cached[1][key] = encoded
+        return encoded
+
+    def list_sessions(
+        self,
+        phone_number: str | None = None,
+        mode: str | None = None,
+        finalized: bool | None = None,
+        created_after: float | None = None,
+        created_before: float | None = None,
+        cursor: int | None = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        if mode is not None and mode not in VALID_MODES:
+            raise ValueError(f"Invalid mode: {mode}")
+        sessions, next_cursor = self.sessions.page(
+            {"phone_number": phone_number, "mode": mode, "finalized": finalized},
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
+        return {
+            "sessions": [
+                {
+                    "session_id": session.session_id,
+                    "mode": session.mode,
+                    "submode": session.submode,
+                    "phone_number": session.phone_number,
+                    "created_at": session.created_at,
+                    "finalized": is_finalized(session),
+                    "status": session.final_payload.get("status", "open") if session.final_payload else "open",
+                    "messages_count": len(session.transcript),
+                    "version": session.version,
+                }
+                for session in sessions
+            ],
+            "next_cursor": str(next_cursor) if next_cursor is not None else None,
         }
 
     def _merge_reviewer_consensus(self, reviewers: Dict[str, Any], deck: Dict[str, Any], selected_boss: str) -> Dict[str, Any]:
-        strengths = []
-        gaps = []
-        next_steps = []
-        customer_changes = []
-        website_changes = []
-
-        for _, boss_data in reviewers.items():
-            response = boss_data.get("response", {})
-            strengths.extend(response.get("top_strengths", []))
-            gaps.extend(response.get("top_gaps", []))
-            next_steps.extend(response.get("highest_roi_next_steps_30d", []))
-            customer_changes.extend(response.get("customer_requested_changes", []))
-            website_changes.extend(response.get("website_change_recommendations", []))
+        list_keys = [
+            "top_strengths",
+            "top_gaps",
+            "highest_roi_next_steps_30d",
+            "customer_requested_changes",
+            "website_change_recommendations",
+        ]
+        merged: Dict[str, List[Dict[str, Any]]] = {}
+        for key in list_keys:
+            items = []
+            for boss_id, boss_data in reviewers.items():
+                for item in boss_data.get("response", {}).get(key, []) or []:
+                    items.append((boss_id, str(item)))
+            clusters = self.similarity_index.cluster(items, preferred_reviewer=selected_boss)
+            merged[key] = [
+                {"text": cluster.text, "agreement": cluster.agreement, "reviewers": cluster.reviewers}
+                for cluster in clusters[:5]
+            ]
 
         selected = reviewers.get(selected_boss, {})
         selected_response = selected.get("response", {})
@@ -313,20 +955,15 @@ class Orchestrator:
             "website_change_recommendations": selected_response.get("website_change_recommendations", []),
         }
 
-        prioritized_strengths = selected_response.get("top_strengths", []) or strengths
-        prioritized_gaps = selected_response.get("top_gaps", []) or gaps
-        prioritized_next_steps = selected_response.get("highest_roi_next_steps_30d", []) or next_steps
-        prioritized_customer_changes = selected_response.get("customer_requested_changes", []) or customer_changes
-        prioritized_website_changes = selected_response.get("website_change_recommendations", []) or website_changes
-
         return {
             "selected_boss_path": selected_path,
-            "top_strengths": prioritized_strengths[:5],
-            "top_gaps": prioritized_gaps[:5],
+            "top_strengths": [item["text"] for item in merged["top_strengths"]],
+            "top_gaps": [item["text"] for item in merged["top_gaps"]],
             "investor_narrative_60s": deck.get("investor_narrative_60s", ""),
             "interview_narrative_60s": deck.get("interview_narrative_60s", ""),
             "past_work_leverage": deck.get("past_work_leverage", []),
-            "highest_roi_next_steps_30d": prioritized_next_steps[:5],
-            "customer_requested_changes": prioritized_customer_changes[:5],
-            "website_change_recommendations": prioritized_website_changes[:5],
+            "highest_roi_next_steps_30d": [item["text"] for item in merged["highest_roi_next_steps_30d"]],
+            "customer_requested_changes": [item["text"] for item in merged["customer_requested_changes"]],
+            "website_change_recommendations": [item["text"] for item in merged["website_change_recommendations"]],
+            "agreement": merged,
         }
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import uuid4
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    path TEXT NOT NULL,
+    archive TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_session ON artifacts (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_mode ON artifacts (mode, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_created ON artifacts (created_at);
+"""
+
+
+class OutputStore:
+    """Hash-sharded artifact store with a SQLite index and zip-archive compaction.
+
+    Loose artifacts live at ``<root>/<aa>/<bb>/<file>`` where ``aabb`` is the
+    start of the session id hash, so one session's files share a directory and
+    no directory grows unbounded. Old artifacts are packed into per-day zip
+    archives under ``<root>/archive`` and stay readable through ``read(key)``.
+    """
+
+    def __init__(
+        self,
+        root: str = "outputs",
+        retention_days: float = 0,
+        compact_after_hours: float = 24,
+        compact_interval_seconds: float = 0,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.archive_dir = self.root / "archive"
+        self.archive_dir.mkdir(exist_ok=True)
+        self.retention_days = retention_days
+        self.compact_after_hours = compact_after_hours
+        self._lock = threading.Lock()
+        # One compaction at a time, since each rewrites whole day archives.
+        self._compact_lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        if compact_interval_seconds > 0:
+            self.start_compactor(compact_interval_seconds)
+
+    def _shard_dir(self, session_id: str) -> Path:
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest[2:4]
+
+    def put(self, session_id: str, mode: str, kind: str, suffix: str, data: bytes) -> Dict[str, str]:
+        key = uuid4().hex
+        created_at = time.time()
+        stamp = datetime.fromtimestamp(created_at).strftime("%Y%m%d_%H%M%S")
+        shard = self._shard_dir(session_id or key)
+        shard.mkdir(parents=True, exist_ok=True)
+        path = shard / f"{kind}_{stamp}_{key[:8]}{suffix}"
+        # Written aside and renamed into place, so a crash never leaves a partial file behind an index row.
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO artifacts (key, session_id, mode, kind, created_at, path) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, session_id, mode, kind, created_at, str(path)),
+            )
+        return {"key": key, "path": str(path)}
+
+    def read(self, key: str) -> bytes:
+        with self._lock:
+            row = self._db.execute("SELECT path, archive FROM artifacts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        if row["archive"]:
+            with zipfile.ZipFile(row["archive"]) as archive:
+                return archive.read(key)
+        return Path(row["path"]).read_bytes()
+
+    def list_session(self, session_id: str) -> List[Dict[str, Any]]:
+        # Storage locations stay internal; artifacts are fetched by key.
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, mode, kind, created_at FROM artifacts "
+                "WHERE session_id = ? ORDER BY created_at",
+                (session_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_kinds(self, kinds: Iterable[str]) -> List[Dict[str, Any]]:
+        kinds = list(kinds)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, session_id, mode, kind, created_at FROM artifacts "
+                f"WHERE kind IN ({','.join('?' * len(kinds))}) ORDER BY created_at",
+                kinds,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Pack loose artifacts older than the compaction age into per-day archives and apply retention."""
+        now = now or time.time()
+        packed = 0
+        cutoff = now - self.compact_after_hours * 3600
+        with self._compact_lock:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT key, path, created_at FROM artifacts WHERE archive IS NULL AND created_at < ? ORDER BY created_at",
+                    (cutoff,),
+                ).fetchall()
+            by_day: Dict[str, List[sqlite3.Row]] = {}
+            for row in rows:
+                day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
+                by_day.setdefault(day, []).append(row)
+            for day, day_rows in by_day.items():
+                packed += self._pack_day(self.archive_dir / f"{day}.zip", day_rows)
+
+        return {"packed": packed, "expired": self.expire(now)}
+
+    def _pack_day(self, archive_path: Path, rows: List[sqlite3.Row]) -> int:
+        """Rewrite ``archive_path`` with ``rows`` added, then point the index at it and drop the loose files.
+
+        The new archive is built aside and renamed over the old one, so readers
+        and a crash mid-write only ever see a complete archive, and loose files
+        are deleted only once the archive holding them is in place and indexed.
+        """
+        tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+        archived_keys = []
+        try:
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as new:
+                existing = set()
+                if archive_path.exists():
+                    with zipfile.ZipFile(archive_path) as old:
+                        for info in old.infolist():
+                            with old.open(info) as src, new.open(info, "w") as dst:
+                                shutil.copyfileobj(src, dst)
+                            existing.add(info.filename)
+                for row in rows:
+                    if row["key"] not in existing:
+                        loose = Path(row["path"])
+                        if not loose.exists():
+                            continue
+                        new.write(loose, arcname=row["key"])
+                    archived_keys.append(row["key"])
+            os.replace(tmp_path, archive_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE artifacts SET archive = ? WHERE key = ?",
+                [(str(archive_path), key) for key in archived_keys],
+            )
+        archived = set(archived_keys)
+        for row in rows:
+            if row["key"] in archived:
+                Path(row["path"]).unlink(missing_ok=True)
+        return len(archived_keys)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        if self.retention_days <= 0:
+            return 0
+        cutoff = (now or time.time()) - self.retention_days * 86400
+        with self._lock, self._db:
+            rows = self._db.execute(
+                "SELECT key, path, archive FROM artifacts WHERE created_at < ?", (cutoff,)
+            ).fetchall()
+            self._db.execute("DELETE FROM artifacts WHERE created_at < ?", (cutoff,))
+            live_archives = {
+                row["archive"]
+                for row in self._db.execute("SELECT DISTINCT archive FROM artifacts WHERE archive IS NOT NULL")
+            }
+        for row in rows:
+            if not row["archive"]:
+                Path(row["path"]).unlink(missing_ok=True)
+        # Zip members cannot be removed in place, so an archive goes once nothing references it.
+        for archive in {row["archive"] for row in rows if row["archive"]} - live_archives:
+            Path(archive).unlink(missing_ok=True)
+        return len(rows)
+
+    def start_compactor(self, interval_seconds: float) -> None:
+        if self._compactor is not None:
+            return
+
+        def loop() -> None:
+            while not self._stop.wait(interval_seconds):
+                try:
+                    self.compact()
+                except Exception:
+                    # Compaction is best effort; the next tick retries.
+                    pass
+
+        self._compactor = threading.Thread(target=loop, name="output-compactor", daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            self._db.close()
@@ -1,23 +1,41 @@
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict
-import json
 
+from config import config
+from services.output_store import OutputStore
+from services.serialization import dumps
 
-class OutputWriter:
-    def __init__(self, output_dir: str = "outputs") -> None:
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-
-    def _timestamp(self) -> str:
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    def write_json(self, prefix: str, payload: Dict[str, Any]) -> str:
-        path = self.output_dir / f"{prefix}_{self._timestamp()}.json"
-        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-        return str(path)
-
-    def write_talking_points(self, mode: str, consensus: Dict[str, Any]) -> str:
+class OutputWriter:
+    """Persists artifacts to the outputs store and returns their keys (served by ``GET /api/artifacts/<key>``).
+
+    Keys stay valid after compaction moves a file into an archive, unlike paths.
+    With ``persist=False`` writes are skipped and keys are empty.
+    """
+
+    def __init__(self, output_dir: str = "", persist: bool = True) -> None:
+        self.store = None
+        if persist:
+            self.store = OutputStore(
+                root=output_dir or config.outputs_dir,
+                retention_days=config.output_retention_days,
+                compact_after_hours=config.output_compact_after_hours,
+                compact_interval_seconds=config.output_compact_interval_seconds,
+            )
+
+    def write_json(self, prefix: str, payload: Dict[str, Any], session_id: str = "", mode: str = "") -> str:
+        if self.store is None:
+            return ""
+        data = dumps(payload, pretty=True)
+        return self.store.put(session_id, mode, prefix, ".json", data)["key"]
+
+    def write_talking_points(self, mode: str, consensus: Dict[str, Any], session_id: str = "") -> str:
+        if self.store is None:
+            return ""
+        out = self.render_talking_points(mode, consensus)
+        return self.store.put(session_id, mode, "talking_points", ".txt", out.encode("utf-8"))["key"]
+
+    def render_talking_points(self, mode: str, consensus: Dict[str, Any]) -> str:
         ts = datetime.now().strftime("%Y-%m-%d %H:%M")
         strengths = consensus.get("top_strengths", [])
         gaps = consensus.get("top_gaps", [])
@@ -100,7 +118,4 @@ class OutputWriter:
             for idx, item in enumerate(funding_use_plan, start=1):
                 lines.append(f"{idx}. {item}")
 
-        out = "\n".join(lines)
-        path = self.output_dir / f"talking_points_{self._timestamp()}.txt"
-        path.write_text(out, encoding="utf-8")
-        return str(path)
+        return "\n".join(lines)
@@ -2,6 +2,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
 
 
@@ -16,6 +17,7 @@ class PitchBuilder:
         resume_text: str = "",
         company_context: str = "",
         projects_context: str = "",
+        deadline: Deadline | None = None,
     ) -> Dict[str, Any]:
         user_prompt = (
             "Founder transcript:\n"
@@ -27,4 +29,4 @@ class PitchBuilder:
             "Resume text (optional):\n"
             f"{resume_text}"
         )
-        return self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt)
+        return self.gemini.generate_json(config.gemini_model_main, self.prompt, user_prompt, deadline=deadline)
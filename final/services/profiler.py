@@ -0,0 +1,227 @@
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+_POOL_WORKER_FILE = os.path.join("concurrent", "futures", "thread.py")
+_WAIT_FILES = (os.sep + "threading.py", os.sep + "queue.py")
+
+
+def _thread_cpu_clock(ident: int) -> Optional[int]:
+    getter = getattr(time, "pthread_getcpuclockid", None)
+    if getter is None:
+        return None
+    try:
+        return getter(ident)
+    except (OSError, OverflowError):
+        return None
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle_worker(frame) -> bool:
+    # Pool threads parked on their work queue are not doing anything for the request.
+    while frame is not None and frame.f_code.co_filename.endswith(_WAIT_FILES):
+        frame = frame.f_back
+    return frame is not None and frame.f_code.co_name == "_worker" and frame.f_code.co_filename.endswith(_POOL_WORKER_FILE)
+
+
+class Profile:
+    """Collapsed stacks for one request: wall time per stack and, where the OS exposes per-thread clocks, CPU time."""
+
+    def __init__(self, profile_id: int, label: str, interval: float) -> None:
+        self.profile_id = profile_id
+        self.label = label
+        self.interval = interval
+        self.started_at = time.time()
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.samples = 0
+        self.status = 0
+        self.cpu_supported = hasattr(time, "pthread_getcpuclockid")
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.profile_id,
+            "label": self.label,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000, 2),
+            "cpu_supported": self.cpu_supported,
+        }
+
+    def collapsed(self, kind: str = "wall") -> str:
+        """Brendan Gregg collapsed format, weights in microseconds."""
+        stacks = self.cpu if kind == "cpu" else self.wall
+        return "\n".join(f"{stack} {int(weight * 1e6)}" for stack, weight in stacks.most_common())
+
+    def speedscope(self) -> Dict[str, Any]:
+        frames: List[Dict[str, str]] = []
+        index: Dict[str, int] = {}
+        profiles = []
+        for kind, stacks in (("wall", self.wall), ("cpu", self.cpu)):
+            samples = []
+            weights = []
+            for stack, weight in stacks.items():
+                indices = []
+                for name in stack.split(";"):
+                    if name not in index:
+                        index[name] = len(frames)
+                        frames.append({"name": name})
+                    indices.append(index[name])
+                samples.append(indices)
+                weights.append(round(weight * 1000, 3))
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": f"{self.label} ({kind})",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.label,
+            "exporter": "chartroom-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: Profile, origin: int = 0) -> None:
+        super().__init__(name="profiler", daemon=True)
+        self.profile = profile
+        # The request's own thread, and pool threads seen running a task, belong in the wall profile even with no CPU.
+        self._working = {origin}
+        self._stop_event = threading.Event()
+        self._cpu_last: Dict[int, float] = {}
+        self._thread_cpu: Counter = Counter()
+        self._thread_stacks: Dict[int, Dict[str, float]] = {}
+
+    def _cpu_delta(self, ident: int) -> float:
+        clock = _thread_cpu_clock(ident)
+        if clock is None:
+            return 0.0
+        try:
+            now = time.clock_gettime(clock)
+        except OSError:
+            return 0.0
+        previous = self._cpu_last.get(ident, now)
+        self._cpu_last[ident] = now
+        return max(0.0, now - previous)
+
+    def run(self) -> None:
+        profile = self.profile
+        names = {}
+        last = time.perf_counter()
+        while not self._stop_event.wait(profile.interval):
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident or _is_idle_worker(frame):
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    if frame.f_code.co_name == "run" and frame.f_code.co_filename.endswith(_POOL_WORKER_FILE):
+                        self._working.add(ident)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                key = ";".join(reversed(stack))
+                walls = self._thread_stacks.setdefault(ident, {})
+                walls[key] = walls.get(key, 0.0) + elapsed
+                cpu = self._cpu_delta(ident)
+                if cpu:
+                    self._thread_cpu[ident] += cpu
+                    profile.cpu[key] += cpu
+            profile.samples += 1
+        for ident, walls in self._thread_stacks.items():
+            # Background loops (timers, the compactor) that never ran are noise. A request or pool thread blocked
+            # on Gemini the whole time uses no CPU either, but that wait is exactly what the wall profile is for.
+            if profile.cpu_supported and not self._thread_cpu[ident] and ident not in self._working:
+                continue
+            profile.wall.update(walls)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileHandle:
+    def __init__(self, recorder: "ProfileRecorder", profile: Profile) -> None:
+        self._recorder = recorder
+        self.profile = profile
+        self._sampler = _Sampler(profile, threading.get_ident())
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._done = False
+        self._sampler.start()
+
+    def stop(self, status: int = 0) -> Profile:
+        if not self._done:
+            self._done = True
+            self._sampler.stop()
+            self.profile.wall_s = time.perf_counter() - self._wall_start
+            self.profile.cpu_s = time.process_time() - self._cpu_start
+            self.profile.status = status
+            self._recorder._keep(self.profile)
+        return self.profile
+
+
+class ProfileRecorder:
+    """Opt-in sampling profiler with a ring buffer of the last ``capacity`` profiles.
+
+    Samples every thread's stack each ``interval`` seconds while a request is
+    profiled. Idle pool workers are skipped so Gemini waits in worker threads
+    show up as wall time but not CPU time. Concurrent requests share the
+    process, so their stacks can appear in each other's profiles.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, capacity: int = 50, interval: float = 0.005) -> None:
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._profiles: deque = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def should_sample(self, forced: bool = False) -> bool:
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self, label: str) -> ProfileHandle:
+        return ProfileHandle(self, Profile(next(self._ids), label, self.interval))
+
+    def _keep(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles)
+        return [profile.summary() for profile in reversed(profiles)]
+
+    def get(self, profile_id: int) -> Profile:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.profile_id == profile_id:
+                    return profile
+        raise KeyError(profile_id)
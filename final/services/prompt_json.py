@@ -0,0 +1,51 @@
+from typing import Any, Iterable
+
+from config import config
+from services.response_utils import project_fields
+from services.serialization import dumps_text
+
+
+# Consensus fields the interview simulator actually reads; ``agreement`` and the per-reviewer bookkeeping are left out.
+SIMULATOR_CONSENSUS_FIELDS = (
+    "top_strengths",
+    "top_gaps",
+    "investor_narrative_60s",
+    "interview_narrative_60s",
+    "highest_roi_next_steps_30d",
+    "past_work_leverage",
+    "customer_requested_changes",
+    "realistic_investor_questions",
+    "likely_follow_up_questions",
+    "diligence_red_flags",
+    "selected_boss_path.focus",
+    "selected_boss_path.key_questions",
+)
+
+# Spoken 60-second narratives run past any per-string cap and are useless cut mid-sentence; they are passed whole.
+UNCAPPED_FIELDS = frozenset({"investor_narrative_60s", "interview_narrative_60s"})
+
+
+def _capped(value: Any, max_chars: int) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[: max_chars - 1].rstrip() + "…"
+    if isinstance(value, dict):
+        return {str(key): item if key in UNCAPPED_FIELDS else _capped(item, max_chars) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_capped(item, max_chars) for item in value]
+    return value
+
+
+def compact_json(value: Any, fields: Iterable[str] = (), max_chars: int = 0) -> str:
+    """Minified, key-sorted JSON of ``value`` for embedding in a prompt.
+
+    ``fields`` projects a dict down to the keys a stage uses (dotted names
+    reach into nested dicts) and every string is cut to ``max_chars``, except
+    the ``UNCAPPED_FIELDS`` narratives, so the same stage output always
+    renders to the same bytes.
+    """
+    if isinstance(value, dict):
+        value = project_fields(value, fields)
+    limit = max_chars or config.prompt_json_max_chars
+    if limit > 0:
+        value = _capped(value, limit)
+    return dumps_text(value, sort_keys=True, default=str, ensure_ascii=False)
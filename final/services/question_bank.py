@@ -0,0 +1,262 @@
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from services.context_index import tokenize
+from services.serialization import loads
+
+
+TOPIC_KEYWORDS = {
+    "traction": ("traction", "revenue", "growth", "grow", "customers", "users", "retention", "churn", "mrr", "arr", "pilot", "paying"),
+    "gtm": ("go-to-market", "gtm", "channel", "marketing", "sales", "acquire", "acquisition", "cac", "pricing", "distribution", "first hundred", "reach"),
+    "technical": ("technical", "architecture", "scale", "scaling", "stack", "infrastructure", "security", "data", "feasib", "build", "bug", "design", "test"),
+    "market": ("market", "tam", "competition", "competitor", "incumbent", "opportunity", "why now"),
+    "team": ("team", "founder", "hire", "hiring", "why you", "yourself", "cofounder", "co-founder"),
+    "funding": ("raise", "raising", "round", "valuation", "use of funds", "runway", "investor", "unit economics", "burn"),
+    "fit": ("role", "project", "experience", "proud", "disagree", "learn", "strength", "weakness", "career"),
+}
+_NORMALIZE_RE = re.compile(r"[^a-z0-9 ]+")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'&-]*|\d")
+# Capitalised words that still read as generic mid-sentence; anything else capitalised is taken as a name.
+_GENERIC_CAPITALISED = {"I", "I'm", "I've", "I'd", "Series", "Seed", "Pre-seed"}
+# Consecutive content words a question may share with its own session before it counts as lifted from it.
+_SHINGLE_WORDS = 3
+# Bumped when stored counts stop meaning the same thing; older banks are cleared and re-seeded.
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    submode TEXT NOT NULL,
+    norm TEXT NOT NULL,
+    text TEXT NOT NULL,
+    seen INTEGER NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (kind, mode, submode, norm)
+);
+CREATE TABLE IF NOT EXISTS question_sessions (
+    question_id INTEGER NOT NULL,
+    session_id TEXT NOT NULL,
+    PRIMARY KEY (question_id, session_id)
+);
+CREATE TABLE IF NOT EXISTS question_tags (
+    tag TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    submode TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, kind, mode, submode, question_id)
+);
+"""
+
+# Question kinds: what investors ask in prep, and what the mock interviewer asks.
+INVESTOR = "investor"
+INTERVIEWER = "interviewer"
+# Artifact kind recording what one finalize banked, replayed by ``rebuild_from_store``.
+QUESTION_SOURCE = "question_bank_source"
+# Artifacts that identify the mode(s) a legacy session was finalized in.
+_STAGE_ARTIFACTS = ("deck_outline", "reviewer_board_report", "interview_coach_report", "investor_prep_report")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_NORMALIZE_RE.sub(" ", text.lower()).split())
+
+
+def topic_tags(text: str) -> List[str]:
+    lowered = text.lower()
+    tags = [tag for tag, words in TOPIC_KEYWORDS.items() if any(word in lowered for word in words)]
+    return tags or ["general"]
+
+
+def _shingles(text: str) -> set:
+    words = tokenize(text)
+    return {tuple(words[idx: idx + _SHINGLE_WORDS]) for idx in range(len(words) - _SHINGLE_WORDS + 1)}
+
+
+def is_specific(text: str, context_shingles: set = frozenset()) -> bool:
+    """True for questions tied to one founder: naming a company, product or person, quoting figures, or lifted from the session.
+
+    Acronyms (CAC, ARR, TAM) and the first word of the question are not taken as names.
+    """
+    words = _WORD_RE.findall(text)
+    for word in words[1:]:
+        if word.isdigit():
+            return True
+        if word[0].isupper() and not word.isupper() and word not in _GENERIC_CAPITALISED:
+            return True
+    return bool(context_shingles and _shingles(text) & context_shingles)
+
+
+def extract_questions(payload: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(kind, question) pairs worth banking from a final payload."""
+    found: List[Tuple[str, str]] = []
+    investor_prep = payload.get("investor_prep") or {}
+    # Questions the bank itself supplied are skipped so reuse doesn't inflate their counts.
+    supplied = set(investor_prep.get("bank_questions") or [])
+    for field in ("realistic_investor_questions", "likely_follow_up_questions"):
+        for item in investor_prep.get(field) or []:
+            if item not in supplied:
+                found.append((INVESTOR, str(item)))
+    mock_interview = payload.get("mock_interview") or {}
+    supplied = set(mock_interview.get("bank_questions") or [])
+    for turn in mock_interview.get("turns") or []:
+        if isinstance(turn, dict) and turn.get("speaker") == "Interviewer" and turn.get("message") not in supplied:
+            found.append((INTERVIEWER, str(turn.get("message", ""))))
+    return [(kind, text.strip()) for kind, text in found if text.strip()]
+
+
+class QuestionBank:
+    """Questions seen in past finalize outputs, in an inverted index keyed by (tag, kind, mode, submode).
+
+    A question counts as generic once it has been produced for ``min_seen``
+    distinct sessions (after normalisation); ``seen`` is that session count.
+    Questions naming an entity or echoing their own session are never banked. ``generic`` returns the most frequent such
+    questions, spread across topic tags and ordered by the tags the caller
+    cares about, so finalize can reuse them and ask the model only for the
+    personalised part.
+    """
+
+    def __init__(self, path: str, min_seen: int = 2) -> None:
+        self.min_seen = min_seen
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Several processes (batch_run --processes) may share the file: WAL lets readers run alongside the
+        # writer, and writers wait for each other's lock instead of failing with "database is locked".
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Earlier banks counted observations rather than sessions; start over and re-seed from the store.
+                self._db.execute("DELETE FROM questions")
+                self._db.execute("DELETE FROM question_tags")
+                self._db.execute("DELETE FROM question_sessions")
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def add(self, kind: str, mode: str, submode: str, questions: Iterable[str], session_id: str) -> int:
+        """Record that ``session_id`` produced ``questions``; each session counts once per question."""
+        now = time.time()
+        added = 0
+        with self._lock, self._db:
+            for text in questions:
+                norm = normalize(text)
+                if not norm:
+                    continue
+                row = self._db.execute(
+                    "SELECT id FROM questions WHERE kind = ? AND mode = ? AND submode = ? AND norm = ?",
+                    (kind, mode, submode, norm),
+                ).fetchone()
+                if row is None:
+                    question_id = self._db.execute(
+                        "INSERT INTO questions (kind, mode, submode, norm, text, seen, last_seen) VALUES (?, ?, ?, ?, ?, 0, ?)",
+                        (kind, mode, submode, norm, text, now),
+                    ).lastrowid
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO question_tags (tag, kind, mode, submode, question_id) VALUES (?, ?, ?, ?, ?)",
+                        [(tag, kind, mode, submode, question_id) for tag in topic_tags(text)],
+                    )
+                    added += 1
+                else:
+                    question_id = row["id"]
+                new_session = self._db.execute(
+                    "INSERT OR IGNORE INTO question_sessions (question_id, session_id) VALUES (?, ?)",
+                    (question_id, session_id),
+                ).rowcount
+                self._db.execute(
+                    "UPDATE questions SET seen = seen + ?, last_seen = ? WHERE id = ?", (new_session, now, question_id)
+                )
+        return added
+
+    def observe(
+        self, mode: str, submode: str, payload: Dict[str, Any], session_id: str, context: str = ""
+    ) -> Dict[str, List[str]]:
+        """Bank the questions in ``payload``; ``context`` is the session's own text (transcript, resume, company).
+
+        Returns the questions banked, by kind, for the caller to record as a ``QUESTION_SOURCE``.
+        """
+        context_shingles = _shingles(context) if context else set()
+        by_kind: Dict[str, List[str]] = {}
+        for kind, text in extract_questions(payload):
+            if not is_specific(text, context_shingles) and text not in by_kind.get(kind, []):
+                by_kind.setdefault(kind, []).append(text)
+        for kind, questions in by_kind.items():
+            self.add(kind, mode, submode, questions, session_id)
+        return by_kind
+
+    def generic(self, kind: str, mode: str, submode: str = "", tags: Iterable[str] = (), limit: int = 5) -> List[str]:
+        """Up to ``limit`` recurring questions, round-robin over ``tags`` first and then the rest."""
+        preferred = [tag for tag in tags if tag in TOPIC_KEYWORDS]
+        order = preferred + [tag for tag in (*TOPIC_KEYWORDS, "general") if tag not in preferred]
+        submodes = (submode, "") if submode else ("",)
+        per_tag: Dict[str, List[Tuple[int, str]]] = {}
+        with self._lock:
+            for tag in order:
+                rows = self._db.execute(
+                    "SELECT q.id, q.text FROM question_tags t JOIN questions q ON q.id = t.question_id "
+                    f"WHERE t.tag = ? AND t.kind = ? AND t.mode = ? AND t.submode IN ({','.join('?' * len(submodes))}) "
+                    "AND q.seen >= ? ORDER BY q.seen DESC, q.last_seen DESC LIMIT ?",
+                    (tag, kind, mode, *submodes, self.min_seen, limit),
+                ).fetchall()
+                per_tag[tag] = [(row["id"], row["text"]) for row in rows]
+        chosen: Dict[int, str] = {}
+        while len(chosen) < limit and any(per_tag.values()):
+            for tag in order:
+                while per_tag[tag] and per_tag[tag][0][0] in chosen:
+                    per_tag[tag].pop(0)
+                if per_tag[tag]:
+                    question_id, text = per_tag[tag].pop(0)
+                    chosen[question_id] = text
+                    if len(chosen) >= limit:
+                        break
+        return list(chosen.values())
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM questions LIMIT 1").fetchone() is None
+
+    def rebuild_from_store(self, store) -> int:
+        """Seed the bank from the outputs store; returns the number of sessions replayed.
+
+        ``QUESTION_SOURCE`` records hold exactly what a finalize banked, after
+        the context filter, so they are replayed as is. Sessions finalized
+        before those were written contribute only investor prep questions, and
+        only when the session ran a single mode and was not degraded: their own
+        text was never stored, so interviewer questions cannot be checked
+        against it.
+        """
+        recorded = set()
+        sessions = 0
+        for row in store.list_kinds((QUESTION_SOURCE,)):
+            try:
+                data = loads(store.read(row["key"]))
+            except (KeyError, OSError, ValueError):
+                continue
+            recorded.add(row["session_id"])
+            for kind, questions in (data.get("questions") or {}).items():
+                self.add(kind, data.get("mode", row["mode"]), data.get("submode", ""), questions, row["session_id"])
+            sessions += 1
+
+        modes: Dict[str, set] = {}
+        prep_rows = []
+        for row in store.list_kinds(_STAGE_ARTIFACTS):
+            modes.setdefault(row["session_id"], set()).add(row["mode"])
+            if row["kind"] == "investor_prep_report":
+                prep_rows.append(row)
+        for row in prep_rows:
+            if row["session_id"] in recorded or len(modes[row["session_id"]]) > 1:
+                continue
+            try:
+                data = loads(store.read(row["key"]))
+            except (KeyError, OSError, ValueError):
+                continue
+            if data.get("degraded"):
+                continue
+            self.observe(row["mode"], "", {"investor_prep": data}, row["session_id"])
+            sessions += 1
+        return sessions
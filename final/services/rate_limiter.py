@@ -0,0 +1,142 @@
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+_RETRY_IN_RE = re.compile(r"retry in ([0-9.]+)\s*s", re.IGNORECASE)
+_RETRY_DELAY_RE = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+
+SUCCESS = "success"
+THROTTLED = "throttled"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+def classify_error(exc: Exception) -> str:
+    code = getattr(exc, "code", None)
+    if callable(code):
+        code = None
+    if code == 429 or type(exc).__name__ in {"ResourceExhausted", "TooManyRequests"}:
+        return THROTTLED
+    if code in {503, 504} or isinstance(exc, TimeoutError) or type(exc).__name__ in {
+        "DeadlineExceeded",
+        "ServiceUnavailable",
+    }:
+        return TIMEOUT
+    return ERROR
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+    # Gemini usually puts the hint in the error text rather than a header.
+    message = str(exc)
+    match = _RETRY_IN_RE.search(message) or _RETRY_DELAY_RE.search(message)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class LimiterTimeout(TimeoutError):
+    pass
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one model.
+
+    Each success adds ``1 / limit`` (about +1 per full window of requests);
+    a 429 or timeout multiplies the limit by ``decrease_factor``. Only calls
+    admitted after the last decrease can cause another, so a burst of
+    concurrent 429s from one overloaded window halves the limit once rather
+    than once per call. A 429 with a Retry-After also closes the gate until
+    that time.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float, decrease_factor: float = 0.5) -> None:
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.last_decrease = float("-inf")
+        self.counts = {SUCCESS: 0, THROTTLED: 0, TIMEOUT: 0, ERROR: 0}
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float) -> float:
+        """Take a slot; returns the admission time to hand back to ``release``."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now >= self.blocked_until and self.in_flight < max(1, int(self.limit)):
+                    self.in_flight += 1
+                    return now
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise LimiterTimeout("Timed out waiting for a model concurrency slot")
+                wait = remaining
+                if self.blocked_until > now:
+                    wait = min(wait, self.blocked_until - now)
+                self._cond.wait(wait)
+
+    def release(self, outcome: str, retry_after: Optional[float] = None, admitted_at: Optional[float] = None) -> None:
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            if outcome == SUCCESS:
+                self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            elif outcome in {THROTTLED, TIMEOUT}:
+                # A call admitted before the last decrease saw the old limit; that decrease already covers it.
+                if admitted_at is None or admitted_at >= self.last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self.last_decrease = time.monotonic()
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+                **self.counts,
+            }
+
+
+class LimiterRegistry:
+    def __init__(self, initial: float, minimum: float, maximum: float) -> None:
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> AdaptiveLimiter:
+        with self._lock:
+            limiter = self._limiters.get(model_name)
+            if limiter is None:
+                limiter = self._limiters[model_name] = AdaptiveLimiter(self.initial, self.minimum, self.maximum)
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {name: limiter.snapshot() for name, limiter in limiters.items()}
@@ -0,0 +1,92 @@
+import gzip
+from typing import Any, Dict, Iterable, List
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+from config import config
+
+
+def parse_fields(raw: str) -> List[str]:
+    return [part.strip() for part in (raw or "").split(",") if part.strip()]
+
+
+def project_fields(payload: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the requested keys. Dotted names (``consensus.top_gaps``) select nested keys.
+
+    Always builds new dicts, never touching ``payload``; a bare key takes precedence over dotted names under it.
+    """
+    fields = list(fields)
+    if not fields:
+        return payload
+    whole: Dict[str, bool] = {}
+    nested: Dict[str, List[str]] = {}
+    for name in fields:
+        head, _, rest = name.partition(".")
+        if head not in payload:
+            continue
+        if rest and isinstance(payload[head], dict):
+            nested.setdefault(head, []).append(rest)
+            whole.setdefault(head, False)
+        else:
+            whole[head] = True
+    projected: Dict[str, Any] = {}
+    for head, complete in whole.items():
+        if complete:
+            projected[head] = payload[head]
+            continue
+        value = project_fields(payload[head], nested[head])
+        if value:
+            projected[head] = value
+    return projected
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return ""
+
+
+def compress_response(response, accept_encoding: str):
+    """Compress a JSON response in place when the client supports it."""
+    if response.direct_passthrough or response.status_code < 200 or response.status_code >= 300:
+        return response
+    if response.mimetype != "application/json" or "Content-Encoding" in response.headers:
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < config.compression_min_bytes:
+        return response
+    encoding = choose_encoding(accept_encoding)
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=config.brotli_quality)
+    elif encoding == "gzip":
+        compressed = gzip.compress(body, compresslevel=config.gzip_level)
+    else:
+        return response
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
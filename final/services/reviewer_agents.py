@@ -1,16 +1,53 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Tuple
 
 from config import config
+from services.deadline import Deadline
 from services.gemini_client import GeminiClient
+from services.prompt_json import compact_json
+
+
+@dataclass
+class ReviewerSpec:
+    boss_id: str
+    label: str
+    focus: str
+    model: str
+    prompt: str
+    outline_fields: Tuple[str, ...] = ()
 
 
 class ReviewerAgents:
-    def __init__(self, gemini: GeminiClient) -> None:
+    def __init__(self, gemini: GeminiClient, panel_path: str = "") -> None:
         self.gemini = gemini
-        self.pmfit_prompt = Path("prompts/system_reviewer_pmfit.txt").read_text(encoding="utf-8")
-        self.tech_prompt = Path("prompts/system_reviewer_tech.txt").read_text(encoding="utf-8")
-        self.gtm_prompt = Path("prompts/system_reviewer_gtm.txt").read_text(encoding="utf-8")
+        self.panel = self._load_panel(panel_path or config.reviewer_panel_path)
+        self.boss_ids = [spec.boss_id for spec in self.panel]
+
+    def _load_panel(self, panel_path: str) -> List[ReviewerSpec]:
+        entries = json.loads(Path(panel_path).read_text(encoding="utf-8"))
+        panel: List[ReviewerSpec] = []
+        for entry in entries:
+            # "model" is either a Config alias (reviewer_a -> gemini_model_reviewer_a) or a literal model name.
+            model = entry.get("model", "") or "main"
+            model = getattr(config, f"gemini_model_{model}", model)
+            prompt_path = Path(panel_path).parent / entry["prompt"]
+            panel.append(
+                ReviewerSpec(
+                    boss_id=entry["boss_id"],
+                    label=entry.get("label", entry["boss_id"]),
+                    focus=entry.get("focus", ""),
+                    model=model,
+                    prompt=prompt_path.read_text(encoding="utf-8"),
+                    # Pitch outline keys this reviewer reads; empty keeps the whole outline.
+                    outline_fields=tuple(entry.get("outline_fields", ())),
+                )
+            )
+        if not panel:
+            raise ValueError(f"Reviewer panel is empty: {panel_path}")
+        return panel
 
     def run(
         self,
@@ -19,33 +56,37 @@ class ReviewerAgents:
         resume_text: str = "",
         company_context: str = "",
         projects_context: str = "",
+        deadline: Deadline | None = None,
+        context_for: Callable[[str], Tuple[str, str]] | None = None,
     ) -> Dict[str, Any]:
-        user_prompt = (
-            "Pitch outline JSON:\n"
-            f"{pitch_outline}\n\n"
-            "Founder transcript:\n"
-            f"{transcript}\n\n"
-            "Company context (optional):\n"
-            f"{company_context}\n\n"
-            "Projects context (optional, startups or personal projects):\n"
-            f"{projects_context}\n\n"
-            "Resume text:\n"
-            f"{resume_text}"
-        )
-        return {
-            "boss_1": {
-                "label": "Customer Panel 1",
-                "focus": "Customer Value and Problem Fit",
-                "response": self.gemini.generate_json(config.gemini_model_reviewer_a, self.pmfit_prompt, user_prompt),
-            },
-            "boss_2": {
-                "label": "Customer Panel 2",
-                "focus": "Product Usability and Technical Friction",
-                "response": self.gemini.generate_json(config.gemini_model_reviewer_b, self.tech_prompt, user_prompt),
-            },
-            "boss_3": {
-                "label": "Customer Panel 3",
-                "focus": "Adoption, Messaging, and Trust Signals",
-                "response": self.gemini.generate_json(config.gemini_model_reviewer_c, self.gtm_prompt, user_prompt),
-            },
-        }
+        """``context_for(focus)`` may narrow company/projects context per reviewer."""
+
+        def user_prompt(spec: ReviewerSpec) -> str:
+            company, projects = context_for(spec.focus) if context_for else (company_context, projects_context)
+            return (
+                "Pitch outline JSON:\n"
+                f"{compact_json(pitch_outline, spec.outline_fields)}\n\n"
+                "Founder transcript:\n"
+                f"{transcript}\n\n"
+                "Company context (optional):\n"
+                f"{company}\n\n"
+                "Projects context (optional, startups or personal projects):\n"
+                f"{projects}\n\n"
+                "Resume text:\n"
+                f"{resume_text}"
+            )
+
+        workers = max(1, min(len(self.panel), config.reviewer_max_workers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reviewer") as pool:
+            futures = {
+                spec.boss_id: pool.submit(self.gemini.generate_json, spec.model, spec.prompt, user_prompt(spec), deadline=deadline)
+                for spec in self.panel
+            }
+            return {
+                spec.boss_id: {
+                    "label": spec.label,
+                    "focus": spec.focus,
+                    "response": futures[spec.boss_id].result(),
+                }
+                for spec in self.panel
+            }
@@ -0,0 +1,118 @@
+import dataclasses
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+
+from config import config
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+# orjson when installed, unless JSON_BACKEND=stdlib. Both parse back to the same values for the payloads this app builds.
+BACKEND = "orjson" if orjson is not None and config.json_backend != "stdlib" else "stdlib"
+
+# orjson's decode error subclasses this one, so callers catch a single type whichever backend parsed.
+DecodeError = json.JSONDecodeError
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(
+    value: Any,
+    pretty: bool = False,
+    sort_keys: bool = False,
+    default: Callable[[Any], Any] | None = None,
+    ensure_ascii: bool = True,
+) -> bytes:
+    """UTF-8 JSON of ``value``: compact by default, two-space indented with ``pretty``.
+
+    orjson always writes non-ASCII text as UTF-8. The stdlib fallback escapes it
+    unless ``ensure_ascii`` is off, since its escaped output encodes faster.
+    """
+    if BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(value, default=default or _default, option=option)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits and the like; the stdlib encoder handles (or reports) them.
+            pass
+    text = json.dumps(
+        value,
+        indent=2 if pretty else None,
+        separators=(",", ": ") if pretty else (",", ":"),
+        sort_keys=sort_keys,
+        ensure_ascii=ensure_ascii,
+        default=default or _default,
+    )
+    return text.encode("utf-8")
+
+
+def dumps_text(
+    value: Any,
+    pretty: bool = False,
+    sort_keys: bool = False,
+    default: Callable[[Any], Any] | None = None,
+    ensure_ascii: bool = True,
+) -> str:
+    return dumps(value, pretty=pretty, sort_keys=sort_keys, default=default, ensure_ascii=ensure_ascii).decode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_with(value: Dict[str, Any], encoded: Dict[str, bytes]) -> bytes:
+    """Compact JSON of ``value`` with already-encoded members spliced in, so large values are not encoded again."""
+    head = dumps(value)
+    parts = [head[:-1]]
+    for key, raw in encoded.items():
+        parts.append(b"," if len(parts) > 1 or len(head) > 2 else b"")
+        parts.append(dumps(key) + b":" + raw)
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider on top of ``dumps``/``loads``, used by ``jsonify``, ``request.get_json`` and ``tojson``."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_text(
+            obj,
+            pretty=bool(kwargs.get("indent")),
+            sort_keys=kwargs.get("sort_keys", False),
+            default=kwargs.get("default"),
+            ensure_ascii=kwargs.get("ensure_ascii", True),
+        )
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return json.loads(s, **kwargs) if kwargs else loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(dumps(obj, pretty=pretty) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,155 @@
+import threading
+from bisect import bisect_left, insort
+from collections.abc import MutableMapping
+from itertools import combinations, count
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+# Attributes with a secondary index. Every combination of them gets its own list, so any filter set is one lookup.
+INDEXED_FIELDS = ("phone_number", "mode", "finalized")
+
+
+def is_finalized(session) -> bool:
+    return (session.final_payload or {}).get("status") == "complete"
+
+
+class SessionRegistry(MutableMapping):
+    """``session_id -> Session`` map with secondary indexes for listing.
+
+    Sessions are numbered in creation order. Each index maps a filter
+    combination (phone number, mode, finalized state) to the ascending list
+    of matching sequence numbers, so a page is a bisect to the cursor plus a
+    slice, whatever the number of sessions. Registered sessions call
+    ``refresh`` from ``touch()``, which moves them between the finalized and
+    unfinalized lists when their final payload completes or restarts.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._sessions: Dict[str, Any] = {}
+        self._counter = count(1)
+        self._seq_of: Dict[str, int] = {}
+        self._id_of: Dict[int, str] = {}
+        self._keys_of: Dict[int, Dict[str, Any]] = {}
+        # All sessions in creation order, with created_at alongside for time-range bounds.
+        self._order: List[int] = []
+        self._created: List[float] = []
+        self._indexes: Dict[Tuple[Tuple[str, Any], ...], List[int]] = {}
+
+    def __getitem__(self, session_id: str):
+        return self._sessions[session_id]
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __setitem__(self, session_id: str, session) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                del self[session_id]
+            seq = next(self._counter)
+            self._sessions[session_id] = session
+            self._seq_of[session_id] = seq
+            self._id_of[seq] = session_id
+            self._order.append(seq)
+            # Kept non-decreasing so it can be bisected even if two threads register out of order.
+            self._created.append(max(session.created_at, self._created[-1]) if self._created else session.created_at)
+            keys = {"phone_number": session.phone_number, "mode": session.mode, "finalized": is_finalized(session)}
+            self._keys_of[seq] = keys
+            for key in self._index_keys(keys):
+                # Sequence numbers only grow, so a new session always goes at the end.
+                self._indexes.setdefault(key, []).append(seq)
+            session.listener = self.refresh
+
+    def __delitem__(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id)
+            session.listener = None
+            seq = self._seq_of.pop(session_id)
+            del self._id_of[seq]
+            idx = bisect_left(self._order, seq)
+            del self._order[idx]
+            del self._created[idx]
+            for key in self._index_keys(self._keys_of.pop(seq)):
+                self._remove(key, seq)
+
+    @staticmethod
+    def _index_keys(keys: Dict[str, Any]) -> List[Tuple[Tuple[str, Any], ...]]:
+        # Web sessions have no phone number; they are not indexed under an empty one.
+        present = [name for name in INDEXED_FIELDS if name != "phone_number" or keys[name]]
+        return [
+            tuple((name, keys[name]) for name in combo)
+            for size in range(1, len(present) + 1)
+            for combo in combinations(present, size)
+        ]
+
+    def _remove(self, key: Tuple[Tuple[str, Any], ...], seq: int) -> None:
+        seqs = self._indexes.get(key)
+        if not seqs:
+            return
+        idx = bisect_left(seqs, seq)
+        if idx < len(seqs) and seqs[idx] == seq:
+            del seqs[idx]
+        if not seqs:
+            del self._indexes[key]
+
+    def refresh(self, session) -> None:
+        """Re-index a session whose finalized state may have changed."""
+        finalized = is_finalized(session)
+        with self._lock:
+            seq = self._seq_of.get(session.session_id)
+            if seq is None or self._keys_of[seq]["finalized"] == finalized:
+                return
+            keys = self._keys_of[seq]
+            for key in self._index_keys(keys):
+                if any(name == "finalized" for name, _ in key):
+                    self._remove(key, seq)
+            keys["finalized"] = finalized
+            for key in self._index_keys(keys):
+                if any(name == "finalized" for name, _ in key):
+                    insort(self._indexes.setdefault(key, []), seq)
+
+    def latest_for_phone(self, phone_number: str):
+        with self._lock:
+            seqs = self._indexes.get((("phone_number", phone_number),))
+            return self._sessions[self._id_of[seqs[-1]]] if seqs else None
+
+    def page(
+        self,
+        filters: Dict[str, Any] | None = None,
+        created_after: float | None = None,
+        created_before: float | None = None,
+        cursor: int | None = None,
+        limit: int = 50,
+    ) -> Tuple[List[Any], int | None]:
+        """Newest-first sessions matching ``filters``, starting below ``cursor``; returns (sessions, next_cursor)."""
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown session filters: {', '.join(sorted(unknown))}")
+        with self._lock:
+            if filters:
+                seqs = self._indexes.get(tuple((name, filters[name]) for name in INDEXED_FIELDS if name in filters), [])
+            else:
+                seqs = self._order
+            upper = len(seqs)
+            if cursor is not None:
+                upper = bisect_left(seqs, cursor)
+            if created_before is not None:
+                bound = bisect_left(self._created, created_before)
+                if bound < len(self._order):
+                    upper = min(upper, bisect_left(seqs, self._order[bound]))
+            lower = 0
+            if created_after is not None:
+                bound = bisect_left(self._created, created_after)
+                lower = bisect_left(seqs, self._order[bound]) if bound < len(self._order) else len(seqs)
+            start = max(lower, upper - limit)
+            chosen = seqs[start:upper][::-1]
+            sessions = [self._sessions[self._id_of[seq]] for seq in chosen]
+            next_cursor = chosen[-1] if chosen and start > lower else None
+        return sessions, next_cursor
@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+import mimetypes
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+
+@dataclass
+class Asset:
+    name: str
+    fingerprinted: str
+    mimetype: str
+    etag: str
+    mtime: float
+    body: bytes
+    gzip_body: bytes
+    br_body: Optional[bytes]
+
+
+class AssetManifest:
+    """Fingerprints and precompresses everything under ``static/`` once at startup.
+
+    ``url("app.js")`` returns ``/assets/app.<hash>.js``; the hash changes with
+    the content, so those URLs can be cached forever. With ``auto_reload`` the
+    manifest re-reads a file whose mtime changed (for ``debug`` runs).
+    """
+
+    def __init__(self, static_dir: str, url_prefix: str = "/assets", auto_reload: bool = False) -> None:
+        self.static_dir = Path(static_dir)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.auto_reload = auto_reload
+        self._by_name: Dict[str, Asset] = {}
+        self._by_fingerprint: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+        for path in sorted(self.static_dir.rglob("*")):
+            if path.is_file():
+                self._add(path)
+
+    def _add(self, path: Path) -> Asset:
+        name = path.relative_to(self.static_dir).as_posix()
+        body = path.read_bytes()
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        stem, dot, suffix = name.rpartition(".")
+        fingerprinted = f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+        asset = Asset(
+            name=name,
+            fingerprinted=fingerprinted,
+            mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream",
+            etag=digest,
+            mtime=path.stat().st_mtime,
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            br_body=brotli.compress(body, quality=11) if brotli is not None else None,
+        )
+        with self._lock:
+            previous = self._by_name.get(name)
+            if previous is not None:
+                self._by_fingerprint.pop(previous.fingerprinted, None)
+            self._by_name[name] = asset
+            self._by_fingerprint[fingerprinted] = asset
+        return asset
+
+    def _current(self, name: str) -> Asset:
+        asset = self._by_name[name]
+        if self.auto_reload:
+            path = self.static_dir / name
+            if path.stat().st_mtime != asset.mtime:
+                asset = self._add(path)
+        return asset
+
+    def url(self, name: str) -> str:
+        return f"{self.url_prefix}/{self._current(name).fingerprinted}"
+
+    def lookup(self, fingerprinted: str) -> Asset:
+        with self._lock:
+            return self._by_fingerprint[fingerprinted]
@@ -0,0 +1,54 @@
+from typing import Iterator, List
+
+
+def estimate_tokens(text: str) -> int:
+    # Gemini averages roughly four characters per token for English prose.
+    return (len(text) + 3) // 4
+
+
+class Transcript:
+    """Append-only message log.
+
+    Messages live in one list with their start offsets into the joined text;
+    the ``"\\n"``-joined transcript and the token estimate are maintained
+    incrementally instead of being rebuilt on every prompt.
+    """
+
+    __slots__ = ("_parts", "_offsets", "_length", "_joined", "_tokens")
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._offsets: List[int] = []
+        self._length = 0
+        self._joined: str | None = ""
+        self._tokens = 0
+
+    def append(self, message: str) -> None:
+        offset = self._length + (1 if self._parts else 0)
+        self._parts.append(message)
+        self._offsets.append(offset)
+        self._length = offset + len(message)
+        self._tokens += estimate_tokens(message)
+        self._joined = None
+
+    @property
+    def text(self) -> str:
+        if self._joined is None:
+            self._joined = "\n".join(self._parts)
+        return self._joined
+
+    @property
+    def token_count(self) -> int:
+        return self._tokens
+
+    def offset(self, index: int) -> int:
+        return self._offsets[index]
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parts)
+
+    def __getitem__(self, index: int) -> str:
+        return self._parts[index]
@@ -1,7 +1,23 @@
 let sessionId = null;
 let selectedMode = "board_investors";
 let selectedSubmode = "";
-let selectedBoss = "boss_1";
+let selectedBoss = "";
+let resumeDocId = "";
+// Context blobs are sent once; afterwards only the server-acknowledged hash is sent.
+const CONTEXT_FIELDS = ["resume_text", "company_context", "projects_text"];
+let contextAck = {};
+// Live chat socket; sendMessage falls back to HTTP whenever it is not open.
+let chatSocket = null;
+let clientSeq = 0;
+const socketPending = new Map();
+// Outgoing messages live in the IndexedDB outbox until the server answers; these are their on-page reply nodes.
+const queuedNodes = new Map();
+let flushing = false;
+let flushTimer = null;
+const FLUSH_RETRY_MS = 5000;
+// Messages answered since the page last saw a finalized payload; zero means finalize would redo the same work.
+let messagesSinceFinal = 0;
+let persistScheduled = false;
 
 function setActiveButton(selector, activeEl) {
   document.querySelectorAll(selector).forEach((el) => el.classList.remove("active"));
@@ -36,10 +52,12 @@ function appendChatMessage({ speaker, label, text, status = "", pending = false
   return item;
 }
 
-function updatePendingMessage(node, { status = "", text = "", pending = false }) {
+function updatePendingMessage(node, { status = "", text = "", pending = false, label = "" }) {
   if (!node) return;
+  const labelNode = node.querySelector(".chat-label");
   const statusNode = node.querySelector(".chat-status");
   const textNode = node.querySelector(".chat-text");
+  if (label && labelNode) labelNode.textContent = label;
   if (statusNode) statusNode.textContent = status;
   if (textNode) textNode.textContent = text;
   node.classList.toggle("chat-pending", pending);
@@ -116,13 +134,152 @@ function getSetupPayload() {
   }
 
   return {
-    resume_text: document.getElementById("resume").value || "",
+    resume_text: resumeDocId ? "" : document.getElementById("resume").value || "",
+    resume_doc_id: resumeDocId,
     company_context: document.getElementById("companyContext").value || "",
     projects_text: document.getElementById("projectsText").value || "",
     coding_experience_level: codingExperience,
   };
 }
 
+function withContextHashes(setup, forceFull = false) {
+  const payload = { ...setup };
+  if (forceFull) return payload;
+  CONTEXT_FIELDS.forEach((field) => {
+    const ack = contextAck[field];
+    if (setup[field] && ack && ack.text === setup[field]) {
+      delete payload[field];
+      payload[`${field}_hash`] = ack.hash;
+    }
+  });
+  return payload;
+}
+
+function rememberContext(setup, hashes) {
+  CONTEXT_FIELDS.forEach((field) => {
+    if (setup[field] && hashes && hashes[field]) {
+      contextAck[field] = { text: setup[field], hash: hashes[field] };
+    }
+  });
+}
+
+function newMessageId() {
+  if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+function snapshotChat() {
+  return [...document.getElementById("chatFeed").children]
+    .filter((node) => !node.classList.contains("chat-pending"))
+    .map((node) => ({
+      speaker: node.classList.contains("chat-user") ? "user" : "ai",
+      label: node.querySelector(".chat-label")?.textContent || "",
+      status: node.querySelector(".chat-status")?.textContent || "",
+      text: node.querySelector(".chat-text")?.textContent || "",
+    }));
+}
+
+function persistSession() {
+  // Coalesce bursts of chat updates into one write.
+  if (!sessionId || persistScheduled) return;
+  persistScheduled = true;
+  setTimeout(() => {
+    persistScheduled = false;
+    if (!sessionId) return;
+    OfflineStore.saveSession({
+      session_id: sessionId,
+      mode: selectedMode,
+      submode: selectedSubmode,
+      selected_boss: selectedBoss,
+      resume_doc_id: resumeDocId,
+      context_ack: contextAck,
+      messages_since_final: messagesSinceFinal,
+      form: {
+        resume: document.getElementById("resume").value,
+        companyContext: document.getElementById("companyContext").value,
+        projectsText: document.getElementById("projectsText").value,
+        experienceLevel: document.getElementById("experienceLevel").value,
+        softwareYears: document.getElementById("softwareYears").value,
+      },
+      chat: snapshotChat(),
+      session_info: document.getElementById("sessionInfo").innerText,
+    }).catch(() => {});
+  }, 250);
+}
+
+function renderFinal(final) {
+  if (!final || !final.mock_interview) return;
+  document.getElementById("finalOutputWrap").style.display = "block";
+  document.getElementById("finalOutput").textContent = renderMockInterview(final.mock_interview) || "No interview output.";
+}
+
+async function revalidateResult(cached) {
+  // Render-from-cache first, then ask the server whether that payload version is still current.
+  if (!sessionId || !navigator.onLine) return;
+  const id = sessionId;
+  let res;
+  try {
+    res = await fetch(`/api/session/${id}/result?fields=mock_interview,status`, {
+      headers: cached && cached.etag ? { "If-None-Match": cached.etag } : {},
+      cache: "no-store",
+    });
+  } catch (err) {
+    return;
+  }
+  if (id !== sessionId || res.status === 304) return;
+  if (res.status === 404) {
+    // The server restarted or expired the session; local state can't be replayed into a new one.
+    await OfflineStore.forgetSession(id);
+    OfflineStore.setCurrentSessionId("");
+    sessionId = null;
+    setChatEnabled(false);
+    document.getElementById("sessionInfo").innerText = "This session is no longer on the server. Start a new session.";
+    return;
+  }
+  if (!res.ok) return;
+  const data = await res.json();
+  if (!data.has_final) return;
+  await OfflineStore.savePayload(id, data.version, res.headers.get("ETag") || "", data).catch(() => {});
+  renderFinal(data.final);
+}
+
+async function restoreSession() {
+  const storedId = OfflineStore.currentSessionId();
+  if (!storedId) return;
+  const state = await OfflineStore.loadSession(storedId).catch(() => null);
+  if (!state) return;
+
+  sessionId = state.session_id;
+  selectedMode = state.mode;
+  selectedSubmode = state.submode || "";
+  selectedBoss = state.selected_boss || firstBossId();
+  resumeDocId = state.resume_doc_id || "";
+  contextAck = state.context_ack || {};
+  messagesSinceFinal = state.messages_since_final || 0;
+  if (modeSelect) modeSelect.value = selectedMode;
+  const submodeBtn = document.querySelector(`.submode-btn[data-submode="${selectedSubmode}"]`);
+  if (submodeBtn) setActiveButton(".submode-btn", submodeBtn);
+  const bossBtn = document.querySelector(`[data-boss="${selectedBoss}"]`);
+  if (bossBtn) setActiveButton(".boss-btn", bossBtn);
+  const form = state.form || {};
+  ["resume", "companyContext", "projectsText", "experienceLevel", "softwareYears"].forEach((id) => {
+    if (form[id] !== undefined) document.getElementById(id).value = form[id];
+  });
+  syncPanels();
+
+  const feed = document.getElementById("chatFeed");
+  feed.innerHTML = "";
+  (state.chat || []).forEach((item) => appendChatMessage(item));
+  document.getElementById("sessionInfo").innerText = state.session_info || `Restored session ${sessionId}.`;
+  setChatEnabled(true);
+
+  const cached = await OfflineStore.latestPayload(sessionId).catch(() => null);
+  if (cached) renderFinal(cached.data.final);
+  openChatSocket();
+  await revalidateResult(cached);
+  flushOutbox();
+}
+
 async function startSession() {
   setButtonsDisabled(true);
   try {
@@ -140,8 +297,16 @@ async function startSession() {
       return;
     }
 
+    const previousId = sessionId || OfflineStore.currentSessionId();
+    if (previousId) OfflineStore.forgetSession(previousId).catch(() => {});
     sessionId = data.session_id;
-    selectedBoss = data.selected_boss || "boss_1";
+    OfflineStore.setCurrentSessionId(sessionId);
+    contextAck = {};
+    messagesSinceFinal = 0;
+    queuedNodes.clear();
+    rememberContext(setup, data.context_hashes);
+    openChatSocket();
+    selectedBoss = data.selected_boss || firstBossId();
     const bossBtn = document.querySelector(`[data-boss="${selectedBoss}"]`);
     if (bossBtn) setActiveButton(".boss-btn", bossBtn);
 
@@ -160,6 +325,7 @@ async function startSession() {
       text: "Session is live. Your setup context is loaded. Start chatting below.",
       status: "ready",
     });
+    persistSession();
   } catch (err) {
     document.getElementById("sessionInfo").innerText = `Start failed: ${err}`;
     setChatEnabled(false);
@@ -169,6 +335,181 @@ async function startSession() {
   }
 }
 
+function firstBossId() {
+  return document.querySelector("#bossPanel [data-boss]")?.dataset.boss || "";
+}
+
+function appendPendingReplies() {
+  // One placeholder per configured reviewer, in panel order, matching the server's responses.
+  const labels = selectedMode === "board_investors"
+    ? Array.from(document.querySelectorAll("#bossPanel [data-boss]"), (btn) => btn.dataset.label || btn.dataset.boss)
+    : ["Coach"];
+  return labels.map((label) => appendChatMessage({ speaker: "ai", label, text: "thinking...", status: "thinking", pending: true }));
+}
+
+async function revealResponses(pendingNodes, responses) {
+  // The server's labels win, so a panel changed since this page loaded still reads correctly.
+  const count = Math.max(pendingNodes.length, responses.length);
+  for (let i = 0; i < count; i += 1) {
+    const response = responses[i];
+    const node = pendingNodes[i] || appendChatMessage({ speaker: "ai", label: response.label, text: "", pending: true });
+    updatePendingMessage(node, { status: "speaking", text: "speaking...", pending: true, label: response?.label });
+    await sleep(220);
+    updatePendingMessage(node, {
+      status: "done",
+      text: response?.message || "No response generated.",
+      pending: false,
+      label: response?.label,
+    });
+  }
+  persistSession();
+}
+
+function markQueued(nodes) {
+  nodes.forEach((node) => updatePendingMessage(node, { status: "queued", text: "Offline. Will send when the connection is back.", pending: true }));
+  if (!flushTimer) flushTimer = setTimeout(flushOutbox, FLUSH_RETRY_MS);
+}
+
+function failEntry(entry, nodes, text) {
+  OfflineStore.dequeue(entry.seq).catch(() => {});
+  queuedNodes.delete(entry.seq);
+  nodes.forEach((node) => updatePendingMessage(node, { status: "error", text, pending: false }));
+  persistSession();
+}
+
+async function completeEntry(entry, nodes, responses) {
+  await OfflineStore.dequeue(entry.seq).catch(() => {});
+  queuedNodes.delete(entry.seq);
+  messagesSinceFinal += 1;
+  await revealResponses(nodes, responses);
+}
+
+// Send one queued message over HTTP. Returns false if the network failed and the entry stays queued.
+async function deliverOverHttp(entry, nodes) {
+  const postRespond = (forceFull) => fetch("/api/session/message/respond", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      session_id: entry.session_id,
+      client_message_id: entry.client_message_id,
+      message: entry.message,
+      ...withContextHashes(entry.setup, forceFull),
+    }),
+  });
+  let data;
+  try {
+    let res = await postRespond(false);
+    if (res.status === 409) {
+      // Server no longer knows a hash we sent; re-upload the full context once.
+      res = await postRespond(true);
+    }
+    data = await res.json();
+  } catch (err) {
+    markQueued(nodes);
+    return false;
+  }
+  if (!data.ok) {
+    failEntry(entry, nodes, data.error || "Request failed");
+    return true;
+  }
+  rememberContext(entry.setup, data.context_hashes);
+  await completeEntry(entry, nodes, Array.isArray(data.responses) ? data.responses : []);
+  return true;
+}
+
+async function flushOutbox() {
+  clearTimeout(flushTimer);
+  flushTimer = null;
+  if (flushing || !sessionId || !navigator.onLine) return;
+  flushing = true;
+  try {
+    const entries = await OfflineStore.pending(sessionId);
+    // Messages still in flight over the socket are completed by its reply (or requeued when it closes).
+    const inFlight = new Set([...socketPending.values()].map((pending) => pending.queued.seq));
+    for (const entry of entries) {
+      if (inFlight.has(entry.seq)) continue;
+      if (entry.kind === "finalize") {
+        if (inFlight.size) {
+          // Finalize only after the socket has answered the messages before it.
+          flushTimer = setTimeout(flushOutbox, FLUSH_RETRY_MS);
+          return;
+        }
+        await OfflineStore.dequeue(entry.seq);
+        flushing = false;
+        await finalizeSession();
+        return;
+      }
+      // Replays go one at a time over HTTP: the socket would supersede all but the newest.
+      let nodes = queuedNodes.get(entry.seq);
+      if (!nodes) {
+        nodes = appendPendingReplies();
+        queuedNodes.set(entry.seq, nodes);
+      }
+      nodes.forEach((node) => updatePendingMessage(node, { status: "thinking", text: "thinking...", pending: true }));
+      if (!(await deliverOverHttp(entry, nodes))) break;
+    }
+  } finally {
+    flushing = false;
+  }
+}
+
+function openChatSocket() {
+  if (chatSocket) chatSocket.close();
+  chatSocket = null;
+  socketPending.clear();
+  if (!window.WebSocket || !sessionId) return;
+  const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+  const socket = new WebSocket(`${protocol}//${window.location.host}/ws/session/${sessionId}`);
+  socket.addEventListener("open", () => {
+    chatSocket = socket;
+  });
+  socket.addEventListener("message", (event) => handleSocketEvent(JSON.parse(event.data)));
+  socket.addEventListener("close", () => {
+    if (chatSocket === socket) chatSocket = null;
+    // Unanswered messages are still in the outbox; they are replayed over HTTP.
+    socketPending.forEach((entry) => markQueued(entry.nodes));
+    socketPending.clear();
+  });
+}
+
+function sendOverSocket(entry, forceFull) {
+  chatSocket.send(JSON.stringify({
+    client_seq: entry.clientSeq,
+    client_message_id: entry.queued.client_message_id,
+    message: entry.message,
+    ...withContextHashes(entry.setup, forceFull),
+  }));
+}
+
+function handleSocketEvent(event) {
+  const entry = socketPending.get(event.client_seq);
+  if (!entry) return;
+  if (event.type === "accepted") {
+    rememberContext(entry.setup, event.context_hashes);
+  } else if (event.type === "responses") {
+    socketPending.delete(event.client_seq);
+    completeEntry(entry.queued, entry.nodes, Array.isArray(event.responses) ? event.responses : []);
+  } else if (event.type === "superseded") {
+    socketPending.delete(event.client_seq);
+    OfflineStore.dequeue(entry.queued.seq).catch(() => {});
+    queuedNodes.delete(entry.queued.seq);
+    messagesSinceFinal += 1;
+    entry.nodes.forEach((node) => {
+      updatePendingMessage(node, { status: "skipped", text: "Replaced by your newer message.", pending: false });
+    });
+    persistSession();
+  } else if (event.type === "error") {
+    if (event.status === 409 && !entry.retried && chatSocket) {
+      // Server no longer knows a hash we sent; re-upload the full context once.
+      entry.retried = true;
+      sendOverSocket(entry, true);
+      return;
+    }
+    socketPending.delete(event.client_seq);
+    failEntry(entry.queued, entry.nodes, event.error || "Request failed");
+  }
+}
+
 async function sendMessage() {
   if (!sessionId) {
     document.getElementById("sessionInfo").innerText = "Start a session first.";
@@ -187,53 +528,78 @@ async function sendMessage() {
   document.getElementById("finalOutputWrap").style.display = "none";
   document.getElementById("finalOutput").textContent = "";
 
-  const pendingNodes = selectedMode === "board_investors"
-    ? [
-        appendChatMessage({ speaker: "ai", label: "Panel 1", text: "thinking...", status: "thinking", pending: true }),
-        appendChatMessage({ speaker: "ai", label: "Panel 2", text: "thinking...", status: "thinking", pending: true }),
-        appendChatMessage({ speaker: "ai", label: "Panel 3", text: "thinking...", status: "thinking", pending: true }),
-      ]
-    : [appendChatMessage({ speaker: "ai", label: "Coach", text: "thinking...", status: "thinking", pending: true })];
+  const pendingNodes = appendPendingReplies();
+  const queued = { session_id: sessionId, client_message_id: newMessageId(), message, setup };
+  try {
+    queued.seq = await OfflineStore.enqueue(queued);
+  } catch (err) {
+    queued.seq = -1;
+  }
+  queuedNodes.set(queued.seq, pendingNodes);
+  persistSession();
+
+  if (!navigator.onLine || flushing) {
+    // Keep order: anything sent while older messages are still queued waits its turn.
+    markQueued(pendingNodes);
+    return;
+  }
+
+  if (chatSocket && chatSocket.readyState === WebSocket.OPEN) {
+    // Stay interactive: a follow-up message supersedes this one server-side.
+    clientSeq += 1;
+    const entry = { clientSeq, message, setup, nodes: pendingNodes, retried: false, queued };
+    socketPending.set(clientSeq, entry);
+    sendOverSocket(entry, false);
+    return;
+  }
 
   setButtonsDisabled(true);
   try {
-    const res = await fetch("/api/session/message/respond", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ session_id: sessionId, message, ...setup }),
-    });
-    const data = await res.json();
-    if (!data.ok) {
-      pendingNodes.forEach((node) => {
-        updatePendingMessage(node, { status: "error", text: data.error || "Request failed", pending: false });
-      });
-      return;
-    }
-
-    const responses = Array.isArray(data.responses) ? data.responses : [];
-    for (let i = 0; i < pendingNodes.length; i += 1) {
-      const node = pendingNodes[i];
-      const response = responses[i];
-      updatePendingMessage(node, { status: "speaking", text: "speaking...", pending: true });
-      await sleep(220);
-      updatePendingMessage(node, {
-        status: "done",
-        text: response?.message || "No response generated.",
-        pending: false,
-      });
-    }
-  } catch (err) {
-    pendingNodes.forEach((node) => {
-      updatePendingMessage(node, { status: "error", text: `Failed: ${err}`, pending: false });
-    });
+    await deliverOverHttp(queued, pendingNodes);
   } finally {
     setButtonsDisabled(false);
     setChatEnabled(Boolean(sessionId));
   }
 }
 
+async function readNdjson(res, onEvent) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let newline = buffer.indexOf("\n");
+    while (newline >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) onEvent(JSON.parse(line));
+      newline = buffer.indexOf("\n");
+    }
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
 async function finalizeSession() {
   if (!sessionId) return;
+  if (!navigator.onLine) {
+    await OfflineStore.enqueue({ session_id: sessionId, kind: "finalize" }).catch(() => {});
+    appendChatMessage({ speaker: "ai", label: "System", text: "Offline. Finalize will run when the connection is back.", status: "queued" });
+    persistSession();
+    return;
+  }
+  if (messagesSinceFinal === 0) {
+    // Nothing new since the last finalize: show the saved result and let the server confirm it is current.
+    const cached = await OfflineStore.latestPayload(sessionId).catch(() => null);
+    if (cached && cached.data.final && cached.data.final.status === "complete") {
+      renderFinal(cached.data.final);
+      appendChatMessage({ speaker: "ai", label: "System", text: "No new messages since the last finalize. Showing the saved result.", status: "cached" });
+      persistSession();
+      revalidateResult(cached);
+      return;
+    }
+  }
   setButtonsDisabled(true);
   try {
     const finalPending = appendChatMessage({
@@ -244,16 +610,48 @@ async function finalizeSession() {
       pending: true,
     });
 
-    const res = await fetch(`/api/session/${sessionId}/finalize`, { method: "POST" });
-    const data = await res.json();
-    if (data.error) {
-      updatePendingMessage(finalPending, { status: "error", text: data.error, pending: false });
+    const res = await fetch(`/api/session/${sessionId}/finalize?stream=1&fields=mock_interview,status`, { method: "POST" });
+    if (!res.ok || !res.body) {
+      const data = await res.json();
+      updatePendingMessage(finalPending, { status: "error", text: data.error || "Finalize failed", pending: false });
+      return;
+    }
+
+    const outputNode = document.getElementById("finalOutput");
+    const partial = { turns: [] };
+    let finalData = null;
+    let finalVersion = 0;
+    let finalError = "";
+    await readNdjson(res, (event) => {
+      if (event.type === "stage" && event.stage === "mock_interview" && event.status === "running") {
+        updatePendingMessage(finalPending, { status: "thinking", text: "Writing mock interview...", pending: true });
+        document.getElementById("finalOutputWrap").style.display = "block";
+      } else if (event.type === "meta") {
+        partial.interview_title = event.interview_title;
+        partial.scenario = event.scenario;
+        outputNode.textContent = renderMockInterview(partial);
+      } else if (event.type === "turn") {
+        partial.turns.push(event.turn);
+        outputNode.textContent = renderMockInterview(partial);
+      } else if (event.type === "result") {
+        finalData = event.payload;
+        finalVersion = event.version;
+      } else if (event.type === "error") {
+        finalError = event.error;
+      }
+    });
+
+    if (finalError || !finalData) {
+      updatePendingMessage(finalPending, { status: "error", text: finalError || "Finalize failed", pending: false });
       return;
     }
 
     updatePendingMessage(finalPending, { status: "done", text: "Final interview output ready.", pending: false });
     document.getElementById("finalOutputWrap").style.display = "block";
-    document.getElementById("finalOutput").textContent = renderMockInterview(data.mock_interview) || "No interview output.";
+    outputNode.textContent = renderMockInterview(finalData.mock_interview) || "No interview output.";
+    messagesSinceFinal = 0;
+    await OfflineStore.savePayload(sessionId, finalVersion, "", { version: finalVersion, has_final: true, final: finalData }).catch(() => {});
+    persistSession();
   } finally {
     setButtonsDisabled(false);
     setChatEnabled(Boolean(sessionId));
@@ -281,6 +679,11 @@ async function setBossPath() {
         text: `Board path switched to ${data.selected_boss}.`,
         status: "updated",
       });
+      persistSession();
+      // A new panel re-merges the consensus and regenerates the mock interview on the next result fetch.
+      if (document.getElementById("finalOutputWrap").style.display !== "none") {
+        revalidateResult(await OfflineStore.latestPayload(sessionId).catch(() => null));
+      }
     }
   } finally {
     setButtonsDisabled(false);
@@ -326,24 +729,45 @@ document.getElementById("resumeFile").addEventListener("change", async (event) =
   const file = event.target.files && event.target.files[0];
   if (!file) return;
   const lower = file.name.toLowerCase();
-  if (!lower.endsWith(".txt") && !lower.endsWith(".md")) {
+  if (![".txt", ".md", ".pdf", ".docx"].some((ext) => lower.endsWith(ext))) {
     appendChatMessage({
       speaker: "ai",
       label: "System",
-      text: "Unsupported resume format. Use .txt or .md, or paste text directly.",
+      text: "Unsupported resume format. Use .txt, .md, .pdf or .docx, or paste text directly.",
       status: "error",
     });
     return;
   }
-  const text = await file.text();
-  document.getElementById("resume").value = text;
-  appendChatMessage({
-    speaker: "ai",
-    label: "System",
-    text: `Resume loaded: ${file.name}`,
-    status: "ready",
-  });
+  try {
+    const res = await fetch(`/api/documents?filename=${encodeURIComponent(file.name)}`, {
+      method: "POST",
+      headers: { "Content-Type": file.type || "application/octet-stream" },
+      body: file,
+    });
+    const data = await res.json();
+    if (!data.ok) {
+      appendChatMessage({ speaker: "ai", label: "System", text: data.error || "Resume upload failed.", status: "error" });
+      return;
+    }
+    resumeDocId = data.doc_id;
+    document.getElementById("resume").value = "";
+    document.getElementById("resume").placeholder = `Using uploaded resume: ${file.name} (type here to replace it)`;
+    appendChatMessage({
+      speaker: "ai",
+      label: "System",
+      text: `Resume loaded: ${file.name}`,
+      status: "ready",
+    });
+  } catch (err) {
+    appendChatMessage({ speaker: "ai", label: "System", text: `Resume upload failed: ${err}`, status: "error" });
+  }
+});
+document.getElementById("resume").addEventListener("input", () => {
+  resumeDocId = "";
 });
 
+window.addEventListener("online", flushOutbox);
+
 setChatEnabled(false);
 syncPanels();
+restoreSession();
@@ -0,0 +1,169 @@
+// Local persistence for the live page: session state, final payloads and the outgoing message queue.
+// Uses IndexedDB when available and falls back to in-memory maps (private windows, old browsers).
+const OfflineStore = (() => {
+  const DB_NAME = "chartroom";
+  const DB_VERSION = 1;
+  // Older payload versions kept per session; the newest one is what gets rendered.
+  const PAYLOADS_KEPT = 3;
+  const CURRENT_SESSION_KEY = "chartroom.sessionId";
+
+  const memory = { sessions: new Map(), payloads: new Map(), outbox: new Map() };
+  let memorySeq = 0;
+  let dbPromise = null;
+
+  function openDb() {
+    if (dbPromise) return dbPromise;
+    dbPromise = new Promise((resolve) => {
+      if (!window.indexedDB) {
+        resolve(null);
+        return;
+      }
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        db.createObjectStore("sessions", { keyPath: "session_id" });
+        const payloads = db.createObjectStore("payloads", { keyPath: ["session_id", "version"] });
+        payloads.createIndex("session_id", "session_id");
+        const outbox = db.createObjectStore("outbox", { keyPath: "seq", autoIncrement: true });
+        outbox.createIndex("session_id", "session_id");
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => resolve(null);
+      request.onblocked = () => resolve(null);
+    });
+    return dbPromise;
+  }
+
+  function done(request) {
+    return new Promise((resolve, reject) => {
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+
+  async function run(storeName, mode, fn) {
+    const db = await openDb();
+    if (!db) return fn(null);
+    const tx = db.transaction(storeName, mode);
+    const complete = new Promise((resolve, reject) => {
+      tx.oncomplete = resolve;
+      tx.onerror = () => reject(tx.error);
+      tx.onabort = () => reject(tx.error);
+    });
+    const result = await fn(tx.objectStore(storeName));
+    await complete;
+    return result;
+  }
+
+  function currentSessionId() {
+    try {
+      return localStorage.getItem(CURRENT_SESSION_KEY) || "";
+    } catch (err) {
+      return "";
+    }
+  }
+
+  function setCurrentSessionId(sessionId) {
+    try {
+      if (sessionId) localStorage.setItem(CURRENT_SESSION_KEY, sessionId);
+      else localStorage.removeItem(CURRENT_SESSION_KEY);
+    } catch (err) {
+      // Storage disabled; the session just won't survive a refresh.
+    }
+  }
+
+  async function saveSession(state) {
+    return run("sessions", "readwrite", (store) => {
+      if (!store) return memory.sessions.set(state.session_id, state);
+      return done(store.put(state));
+    });
+  }
+
+  async function loadSession(sessionId) {
+    return run("sessions", "readonly", (store) => {
+      if (!store) return memory.sessions.get(sessionId) || null;
+      return done(store.get(sessionId)).then((value) => value || null);
+    });
+  }
+
+  async function forgetSession(sessionId) {
+    await run("sessions", "readwrite", (store) => {
+      if (!store) return memory.sessions.delete(sessionId);
+      return done(store.delete(sessionId));
+    });
+    await run("payloads", "readwrite", (store) => {
+      if (!store) return memory.payloads.delete(sessionId);
+      return done(store.delete(IDBKeyRange.bound([sessionId, -Infinity], [sessionId, Infinity])));
+    });
+    const queued = await pending(sessionId);
+    await Promise.all(queued.map((entry) => dequeue(entry.seq)));
+  }
+
+  // Payloads are keyed by [session_id, version]; the server's result version changes whenever the payload does.
+  async function savePayload(sessionId, version, etag, data) {
+    return run("payloads", "readwrite", async (store) => {
+      const record = { session_id: sessionId, version, etag, data, saved_at: Date.now() };
+      if (!store) {
+        const versions = memory.payloads.get(sessionId) || [];
+        versions.push(record);
+        memory.payloads.set(sessionId, versions.slice(-PAYLOADS_KEPT));
+        return record;
+      }
+      await done(store.put(record));
+      const keys = await done(store.getAllKeys(IDBKeyRange.bound([sessionId, -Infinity], [sessionId, Infinity])));
+      await Promise.all(keys.slice(0, Math.max(0, keys.length - PAYLOADS_KEPT)).map((key) => done(store.delete(key))));
+      return record;
+    });
+  }
+
+  async function latestPayload(sessionId) {
+    return run("payloads", "readonly", async (store) => {
+      if (!store) {
+        const versions = memory.payloads.get(sessionId) || [];
+        return versions[versions.length - 1] || null;
+      }
+      const range = IDBKeyRange.bound([sessionId, -Infinity], [sessionId, Infinity]);
+      const cursor = await done(store.openCursor(range, "prev"));
+      return cursor ? cursor.value : null;
+    });
+  }
+
+  async function enqueue(entry) {
+    return run("outbox", "readwrite", (store) => {
+      if (!store) {
+        memorySeq += 1;
+        memory.outbox.set(memorySeq, { ...entry, seq: memorySeq });
+        return memorySeq;
+      }
+      return done(store.add(entry));
+    });
+  }
+
+  async function dequeue(seq) {
+    return run("outbox", "readwrite", (store) => {
+      if (!store) return memory.outbox.delete(seq);
+      return done(store.delete(seq));
+    });
+  }
+
+  // Queued entries for a session, oldest first.
+  async function pending(sessionId) {
+    return run("outbox", "readonly", (store) => {
+      if (!store) return [...memory.outbox.values()].filter((entry) => entry.session_id === sessionId);
+      return done(store.index("session_id").getAll(sessionId)).then((entries) => entries.sort((a, b) => a.seq - b.seq));
+    });
+  }
+
+  return {
+    currentSessionId,
+    setCurrentSessionId,
+    saveSession,
+    loadSession,
+    forgetSession,
+    savePayload,
+    latestPayload,
+    enqueue,
+    dequeue,
+    pending,
+  };
+})();